@@ -0,0 +1,680 @@
+"""Bancs de proves de rendiment de l'Analitzador SUS
+
+Ús: python benchmark.py [nom_prova ...] [--n N]
+"""
+import argparse
+import contextlib
+import http.client
+import http.server
+import io
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import requests
+
+from main import (AcumuladorSUS, ActiusInforme, AnalitzadorSUS, AnalitzadorSUSIncremental, AnalitzadorSUSStreaming,
+                  BootstrapSUS, CacheDadesNetes, EsquemaQuestionari, ExportadorDades, ExportadorJSON, ExtractorDades,
+                  ExtractorMultiFont,
+                  GeneradorInformeHTML, GeneradorLots, PlantillaInforme, ProvesAparellades, PYARROW_DISPONIBLE,
+                  ResolutorColumnes, ServidorInformes)
+
+COLUMNES_GALERIA = [f'G{i:02d}' for i in range(1, 11)]
+COLUMNES_MAPA = [f'M{i:02d}' for i in range(1, 11)]
+
+
+def generar_respostes(n, llavor=0, fraccio_invalida=0.01):
+    """Generar un DataFrame sintètic de respostes SUS amb algunes files no vàlides"""
+    rng = np.random.default_rng(llavor)
+    respostes = rng.integers(1, 6, size=(n, 20)).astype(np.float64)
+    invalides = rng.random(n) < fraccio_invalida
+    respostes[invalides, rng.integers(0, 20, size=invalides.sum())] = np.nan
+    return pd.DataFrame(respostes, columns=COLUMNES_GALERIA + COLUMNES_MAPA)
+
+
+def cronometrar(funcio, repeticions=3):
+    """Retornar el millor temps (s) i el resultat d'una funció"""
+    millor, resultat = float('inf'), None
+    for _ in range(repeticions):
+        inici = time.perf_counter()
+        resultat = funcio()
+        millor = min(millor, time.perf_counter() - inici)
+    return millor, resultat
+
+
+def prova_puntuacio(n):
+    """Puntuació fila a fila (iterrows) vs motor vectoritzat (N, 10)"""
+    df = generar_respostes(n)
+    analitzador = AnalitzadorSUS(df, COLUMNES_GALERIA, COLUMNES_MAPA)
+
+    def per_fila():
+        puntuacions = []
+        for _, fila in analitzador.df.iterrows():
+            puntuacio, _ = analitzador.calcular_puntuacio_sus([fila[col] for col in COLUMNES_GALERIA])
+            puntuacions.append(puntuacio)
+        return np.array(puntuacions, dtype=np.float64)
+
+    def vectoritzat():
+        return analitzador.calcular_puntuacions_lot(analitzador._matriu_respostes(COLUMNES_GALERIA))
+
+    t_fila, ref = cronometrar(per_fila, repeticions=1)
+    t_vec, res = cronometrar(vectoritzat)
+    assert np.array_equal(ref, res, equal_nan=True), "Les puntuacions no coincideixen"
+    print(f"   Per fila:     {t_fila * 1000:10.1f} ms")
+    print(f"   Vectoritzat:  {t_vec * 1000:10.1f} ms  (x{t_fila / t_vec:.0f})")
+
+
+def prova_estadistiques(n):
+    """Estadístiques amb llista + NumPy vs acumulador d'histograma de 41 valors"""
+    puntuacions = np.random.default_rng(0).integers(0, 41, size=n) * 2.5
+    llista = puntuacions.tolist()
+
+    def amb_llista():
+        return (np.mean(llista), np.median(llista), np.std(llista, ddof=1), np.min(llista), np.max(llista))
+
+    def amb_acumulador():
+        acumulador = AcumuladorSUS().actualitzar(puntuacions)
+        return (acumulador.mitjana(), acumulador.mediana(), acumulador.desviacio_tipica(),
+                acumulador.minim(), acumulador.maxim())
+
+    t_llista, ref = cronometrar(amb_llista)
+    t_acum, res = cronometrar(amb_acumulador)
+    assert np.allclose(ref, res), "Les estadístiques no coincideixen"
+    print(f"   Llista + NumPy: {t_llista * 1000:8.1f} ms  ({len(llista) * 8 / 1024:.0f} KiB de punters)")
+    print(f"   Acumulador:     {t_acum * 1000:8.1f} ms  ({AcumuladorSUS().comptatges.nbytes} bytes d'estat)")
+
+
+def pic_memoria(funcio):
+    """Retornar el pic de memòria (bytes) reservada durant una funció, sense sortida per pantalla"""
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            funcio()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def prova_streaming(n, mida_fragment=10_000):
+    """Pic de memòria: càrrega completa vs streaming per fragments (mida de fitxer x1 i x4)"""
+    with tempfile.TemporaryDirectory() as directori:
+        pics = {}
+        for factor in (1, 4):
+            fitxer = os.path.join(directori, f'respostes_{factor}.csv')
+            generar_respostes(n * factor).dropna().astype(int).to_csv(fitxer, index=False)
+
+            def complet():
+                extractor = ExtractorDades()
+                AnalitzadorSUS(*extractor._validar_i_netejar(pd.read_csv(fitxer))).analitzar()
+
+            def streaming():
+                AnalitzadorSUSStreaming(ExtractorDades(fitxer), mida_fragment, conservar_puntuacions=False).analitzar()
+
+            pics[factor] = pic_memoria(streaming)
+            print(f"   N={n * factor:>9}: complet {pic_memoria(complet) / 2**20:8.1f} MiB | "
+                  f"streaming {pics[factor] / 2**20:8.1f} MiB")
+        assert pics[4] < pics[1] * 1.5, "El pic de memòria en streaming creix amb la mida del fitxer"
+
+
+@contextlib.contextmanager
+def servidor_local(cos, retards=None):
+    """Servidor HTTP local que imita els endpoints d'exportació de Google Sheets
+
+    `retards` assigna un retard (s) a cada fragment de ruta, p. ex. {'/export': 1.0}.
+    """
+    retards = retards or {}
+
+    class Gestor(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            for fragment, retard in retards.items():
+                if fragment in self.path:
+                    time.sleep(retard)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/csv; charset=utf-8')
+            self.send_header('Content-Length', str(len(cos)))
+            self.end_headers()
+            self.wfile.write(cos)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Gestor)
+    fil = threading.Thread(target=servidor.serve_forever, daemon=True)
+    fil.start()
+    try:
+        yield f'http://127.0.0.1:{servidor.server_port}'
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def prova_descarrega(n, peticions=100, retard_lent=1.0):
+    """Connexions persistents i competició d'endpoints contra un servidor local"""
+    cos = generar_respostes(min(n, 2_000)).dropna().astype(int).to_csv(index=False).encode('utf-8')
+    with servidor_local(cos, {'/export': retard_lent}) as url_base:
+        url_rapida = f'{url_base}/spreadsheets/d/PROVA/gviz/tq?tqx=out:csv'
+
+        def sense_sessio():
+            for _ in range(peticions):
+                requests.get(url_rapida, timeout=10).content
+
+        sessio = ExtractorDades.crear_sessio()
+
+        def amb_sessio():
+            for _ in range(peticions):
+                sessio.get(url_rapida, timeout=10).content
+
+        t_sense, _ = cronometrar(sense_sessio, repeticions=1)
+        t_amb, _ = cronometrar(amb_sessio, repeticions=1)
+        print(f"   {peticions} peticions sense sessió: {t_sense * 1000:8.1f} ms | amb sessió: {t_amb * 1000:8.1f} ms")
+
+        url_full = 'https://docs.google.com/spreadsheets/d/PROVA/edit'
+        for nom, opcions in [('Seqüencial', {}), ('Competició', {'competir': True})]:
+            extractor = ExtractorDades(url_full, url_base=url_base, **opcions)
+            with contextlib.redirect_stdout(io.StringIO()):
+                temps, _ = cronometrar(extractor.obtenir_dades, repeticions=1)
+            print(f"   {nom:<11} (endpoint principal lent {retard_lent:.1f} s): {temps * 1000:8.1f} ms")
+
+
+def prova_multifont(n, fonts=8, retard=0.3):
+    """Extracció de diverses fonts: una darrere l'altra vs en paral·lel"""
+    cos = generar_respostes(min(n, 2_000)).dropna().astype(int).to_csv(index=False).encode('utf-8')
+    with servidor_local(cos, {'/spreadsheets/d/': retard}) as url_base:
+        urls = [f'https://docs.google.com/spreadsheets/d/FONT{i}/edit' for i in range(fonts)]
+        for nom, max_fils in [('Seqüencial', 1), ('Paral·lel', fonts)]:
+            extractor = ExtractorMultiFont(urls, max_fils=max_fils, url_base=url_base)
+            with contextlib.redirect_stdout(io.StringIO()):
+                temps, (df, _, _) = cronometrar(extractor.obtenir_dades, repeticions=1)
+            print(f"   {nom:<10} {fonts} fonts (retard {retard:.1f} s cadascuna): "
+                  f"{temps * 1000:8.1f} ms, {len(df)} respostes, {df['Font'].nunique()} fonts")
+
+
+def prova_memoria_descarrega(n):
+    """Pic de memòria de l'extracció: text + StringIO vs flux de bytes directe al parser"""
+    cos = generar_respostes(n).dropna().astype(int).to_csv(index=False).encode('utf-8')
+    with servidor_local(cos) as url_base:
+        url = f'{url_base}/spreadsheets/d/PROVA/export?format=csv'
+
+        def amb_text():
+            resposta = requests.get(url, timeout=30)
+            if resposta.status_code == 200 and len(resposta.text.strip()) > 0:
+                return pd.read_csv(io.StringIO(resposta.text))
+
+        extractor = ExtractorDades(url_base=url_base, timeout=30)
+
+        def amb_flux():
+            return extractor._provar_metode('PROVA', 'export', url)
+
+        print(f"   Cos de {len(cos) / 2**20:.1f} MiB")
+        for nom, funcio in [('Text + StringIO', amb_text), ('Flux de bytes', amb_flux)]:
+            temps, pic = cronometrar(lambda: pic_memoria(funcio), repeticions=1)
+            print(f"   {nom:<16} pic {pic / 2**20:8.1f} MiB  ({temps * 1000:.0f} ms)")
+
+
+def prova_cache_dades(n):
+    """Lectura + neteja vs recuperació de la memòria cau de dades netes (Feather / .npz)"""
+    with tempfile.TemporaryDirectory() as directori:
+        fitxer = os.path.join(directori, 'respostes.csv')
+        df = generar_respostes(n).fillna(9).astype(int)
+        df.insert(0, 'Edat:', np.where(np.arange(n) % 2, '18 a 23', '24 a 28'))
+        df.to_csv(fitxer, index=False)
+
+        formats = ['feather', 'npz'] if PYARROW_DISPONIBLE else ['npz']
+        for format_desat in formats:
+            cache_dades = CacheDadesNetes(os.path.join(directori, format_desat), format_desat=format_desat)
+            extractor = ExtractorDades(fitxer, cache_dades=cache_dades)
+            with contextlib.redirect_stdout(io.StringIO()):
+                t_fred, (fred, _, _) = cronometrar(extractor.obtenir_dades, repeticions=1)
+                t_calent, (calent, _, _) = cronometrar(extractor.obtenir_dades)
+            assert fred.equals(calent), "Les dades recuperades no coincideixen"
+            print(f"   {format_desat:<8} primera execució {t_fred * 1000:8.1f} ms | "
+                  f"repetida {t_calent * 1000:8.1f} ms")
+
+
+def netejar_per_columnes(df, columnes_sus):
+    """Neteja de referència: bucle per columna amb pd.to_numeric, màscares i df.loc"""
+    comptatges_invalids = {}
+    for col in columnes_sus:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+        mascara_valida = (df[col] >= 1) & (df[col] <= 5)
+        comptatge_invalid = (~mascara_valida & df[col].notna()).sum()
+        if comptatge_invalid > 0:
+            comptatges_invalids[col] = int(comptatge_invalid)
+            df.loc[~mascara_valida, col] = np.nan
+    return df.dropna(subset=columnes_sus), comptatges_invalids
+
+
+def prova_validacio(n):
+    """Validació per columnes (bucle) vs validació en bloc (matriu única)"""
+    rng = np.random.default_rng(1)
+    numeriques = generar_respostes(n).fillna(3).astype(int)
+    numeriques.iloc[rng.integers(0, n, n // 100), rng.integers(0, 20, n // 100)] = 7
+    amb_text = numeriques.copy()
+    amb_text['G04'] = amb_text['G04'].astype(object)
+    amb_text.iloc[rng.integers(0, n, n // 200), 3] = 'x'
+    extractor = ExtractorDades()
+    columnes = COLUMNES_GALERIA + COLUMNES_MAPA
+
+    for nom, df in [('Columnes numèriques', numeriques), ('Una columna amb text', amb_text)]:
+        t_columnes, (ref, ref_invalids) = cronometrar(lambda: netejar_per_columnes(df.copy(), columnes))
+        t_bloc, (res, res_invalids, _) = cronometrar(lambda: extractor._netejar_respostes(df.copy(), columnes))
+        assert ref.equals(res) and ref_invalids == res_invalids, "La validació en bloc no coincideix"
+        print(f"   {nom:<21} per columnes {t_columnes * 1000:8.1f} ms | "
+              f"en bloc {t_bloc * 1000:8.1f} ms  (x{t_columnes / t_bloc:.1f})")
+
+
+def generar_enquesta(n, llavor=0):
+    """Respostes sintètiques amb les columnes demogràfiques i la marca temporal del formulari"""
+    rng = np.random.default_rng(llavor)
+    df = generar_respostes(n, llavor).fillna(3).astype(int).astype(object)
+    inici = pd.Timestamp('2025-05-22 17:00:00')
+    segons = pd.to_timedelta(np.sort(rng.integers(0, 30 * 24 * 3600, n)), unit='s')
+    df.insert(0, 'Marca temporal', (inici + segons).strftime('%d/%m/%Y %H:%M:%S'))
+    df.insert(1, 'Edat:', rng.choice(['18 a 23', '24 a 28', '29 a 33', '34 a 39'], n))
+    df.insert(2, "Familiaritat amb l'ús de la tecnologia:", rng.integers(1, 6, n))
+    df.insert(3, 'Has estat alumne/treballador de la UAB?', rng.choice(['SI', 'NO'], n))
+    return df
+
+
+def prova_memoria_compacta(n):
+    """Mida de dades_en_brut: tipus per defecte vs representació compacta (uint8 + category)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        df, _, _ = ExtractorDades()._validar_i_netejar(generar_enquesta(n))
+    mides = {}
+    for compacte in (False, True):
+        with contextlib.redirect_stdout(io.StringIO()):
+            analitzador = AnalitzadorSUS(df, COLUMNES_GALERIA, COLUMNES_MAPA, compacte=compacte)
+            t, resultats = cronometrar(analitzador.analitzar, repeticions=1)
+        mides[compacte] = resultats['dades_en_brut'].memory_usage(deep=True).sum()
+        print(f"   {'Compacte' if compacte else 'Per defecte':<12} {mides[compacte] / 2**20:8.2f} MiB | "
+              f"{t * 1000:8.1f} ms")
+    print(f"   Reducció x{mides[False] / mides[True]:.1f}")
+
+
+def prova_instruments(n):
+    """Puntuació de K instruments: un bloc (N, 10) per instrument vs un sol tensor (N, K, 10)"""
+    prefixos = 'ABCDEFGH'
+    rng = np.random.default_rng(2)
+    columnes = [f'{prefix}{i:02d}' for prefix in prefixos for i in range(1, 11)]
+    df_complet = pd.DataFrame(rng.integers(1, 6, size=(n, len(columnes))).astype(np.float64), columns=columnes)
+
+    for k in (2, 4, 8):
+        esquema = EsquemaQuestionari.de_prefixos(prefixos[:k])
+        columnes_instruments = esquema.detectar(df_complet.columns)
+        analitzador = AnalitzadorSUS(df_complet[sum(columnes_instruments, [])], *columnes_instruments, esquema=esquema)
+
+        def per_instrument():
+            return np.column_stack([analitzador.calcular_puntuacions_lot(analitzador._matriu_respostes(columnes_instrument))
+                                    for columnes_instrument in columnes_instruments])
+
+        def tensor():
+            respostes, _ = analitzador._tensor_respostes(analitzador.df)
+            return analitzador.calcular_puntuacions_lot(respostes)
+
+        t_bucle, ref = cronometrar(per_instrument)
+        t_tensor, res = cronometrar(tensor)
+        assert np.array_equal(ref, res, equal_nan=True), "Les puntuacions no coincideixen"
+        print(f"   K={k}: per instrument {t_bucle * 1000:8.1f} ms | tensor {t_tensor * 1000:8.1f} ms "
+              f"({t_tensor * 1e9 / (n * k):.1f} ns per puntuació)")
+
+
+def prova_bootstrap(n, replicats=10_000):
+    """Bootstrap de la mitjana i la mediana: remostreig d'índexs vs comptatges multinomials de l'histograma"""
+    rng = np.random.default_rng(3)
+    puntuacions = rng.integers(0, 41, size=n) * 2.5
+    comptatges = AcumuladorSUS().actualitzar(puntuacions).comptatges
+
+    # Referència: remostrejar índexs, extrapolada a partir de 50 rèpliques
+    mostra = 50
+    t_index, _ = cronometrar(lambda: [(puntuacions[idx].mean(), np.median(puntuacions[idx]))
+                                      for idx in rng.integers(0, n, size=(mostra, n))], repeticions=1)
+    print(f"   Remostreig d'índexs: {t_index * replicats / mostra * 1000:10.1f} ms (estimat per {replicats} rèpliques)")
+
+    bootstrap = BootstrapSUS(replicats)
+    t_hist, interval = cronometrar(lambda: bootstrap.interval(comptatges, AcumuladorSUS.VALORS))
+    print(f"   Histograma:          {t_hist * 1000:10.1f} ms  (IC mitjana BCa "
+          f"{interval['mitjana']['bca'][0]:.2f} - {interval['mitjana']['bca'][1]:.2f})")
+
+    moltes = replicats * 100
+    for processos in (1, None):
+        bootstrap = BootstrapSUS(moltes, processos=processos, llindar_processos=1)
+        t, resultat = cronometrar(lambda: bootstrap.interval(comptatges, AcumuladorSUS.VALORS), repeticions=1)
+        print(f"   {moltes} rèpliques, {'1 procés' if processos == 1 else 'tots els nuclis':<15} {t * 1000:10.1f} ms")
+
+
+def prova_permutacio(n, permutacions=10_000):
+    """Prova de canvi de signe: una permutació per iteració vs matrius de signes per blocs"""
+    rng = np.random.default_rng(4)
+    diferencies = (rng.integers(-8, 10, size=n) * 2.5).astype(np.float64)
+    diferencies = diferencies[diferencies != 0]
+    observat = abs(diferencies.sum())
+
+    # Referència: un vector de signes per iteració, extrapolada a partir de 200 permutacions
+    mostra = 200
+    def per_iteracio():
+        return sum(abs(rng.choice([-1.0, 1.0], size=len(diferencies)) @ diferencies) >= observat for _ in range(mostra))
+    t_iteracio, _ = cronometrar(per_iteracio, repeticions=1)
+    print(f"   Per iteració: {t_iteracio * permutacions / mostra * 1000:10.1f} ms (estimat per {permutacions} permutacions)")
+
+    proves = ProvesAparellades(permutacions=permutacions)
+    t_blocs, resultat = cronometrar(lambda: proves.prova_permutacio(diferencies), repeticions=1)
+    pic = pic_memoria(lambda: proves.prova_permutacio(diferencies))
+    print(f"   Per blocs:    {t_blocs * 1000:10.1f} ms | pic {pic / 2**20:.1f} MiB "
+          f"(matriu completa: {permutacions * len(diferencies) * 8 / 2**20:.0f} MiB) | p={resultat['p']:.4g}")
+
+
+def prova_segments(n):
+    """Segmentació demogràfica: un groupby per dimensió i creuament vs un sol bincount per cel·la"""
+    for mida in (n, 4 * n):
+        with contextlib.redirect_stdout(io.StringIO()):
+            df, _, _ = ExtractorDades()._validar_i_netejar(generar_enquesta(mida))
+            analitzador = AnalitzadorSUS(df, COLUMNES_GALERIA, COLUMNES_MAPA)
+            puntuat = analitzador.analitzar()['dades_en_brut']
+        puntuacions = puntuat[['SUS_Galeria', 'SUS_Mapa']].to_numpy()
+        unitats = np.where(np.isnan(puntuacions), -1, np.rint(np.nan_to_num(puntuacions) / 2.5)).astype(np.int16)
+        rols = analitzador.columnes_demografiques
+        columnes = [rols[rol] for rol in AnalitzadorSUS.ROLS_SEGMENTACIO]
+
+        # Referència: una agregació agrupada per a cada dimensió i cada parell de dimensions
+        def per_dimensio():
+            dimensions = [[c] for c in columnes] + [[a, b] for i, a in enumerate(columnes) for b in columnes[i + 1:]]
+            return [puntuat.groupby(d, observed=True, dropna=False)[['SUS_Galeria', 'SUS_Mapa']]
+                    .agg(['mean', 'median', 'std', 'count']) for d in dimensions]
+        t_groupby, _ = cronometrar(per_dimensio, repeticions=1)
+
+        def una_passada():
+            with contextlib.redirect_stdout(io.StringIO()):
+                return analitzador._taules_segments(*analitzador._celles_segments(puntuat, unitats))
+        t_celles, segments = cronometrar(una_passada, repeticions=1)
+        print(f"   N={mida:>9}: groupby per dimensió {t_groupby * 1000:8.1f} ms | una passada {t_celles * 1000:8.1f} ms "
+              f"({sum(len(files) for files in segments.values())} segments)")
+
+
+def prova_rols(n, columnes_extra=500):
+    """Rols de columna en un full ample: cerques per subcadena a cada consulta vs resolutor memoritzat"""
+    df = generar_enquesta(10)
+    # Preguntes obertes entre la marca temporal i la demografia, com en un formulari llarg
+    oberts = pd.DataFrame({f'Pregunta oberta {i}': '' for i in range(columnes_extra)}, index=df.index)
+    df = pd.concat([df.iloc[:, :1], oberts, df.iloc[:, 1:]], axis=1)
+    columnes = df.columns
+    consultes = 1_000
+
+    # Referència: tres recorreguts de la capçalera, amb minúscules, a cada consulta
+    def per_consulta():
+        for _ in range(consultes):
+            trobar = lambda condicio: next((col for col in columnes if condicio(str(col).lower())), None)
+            trobar(lambda nom: any(paraula in nom for paraula in ['familiaritat', 'tecnolog', 'technology', 'familiarity']))
+            trobar(lambda nom: 'uab' in nom)
+            trobar(lambda nom: 'edat' in nom or 'age' in nom)
+    t_consulta, _ = cronometrar(per_consulta, repeticions=1)
+
+    resolutor = ResolutorColumnes()
+    t_primera, rols = cronometrar(lambda: ResolutorColumnes().resoldre(columnes), repeticions=1)
+    t_memoritzat, _ = cronometrar(lambda: [resolutor.resoldre(columnes) for _ in range(consultes)], repeticions=1)
+    print(f"   {len(columnes)} columnes, {consultes} consultes: subcadenes {t_consulta * 1000:8.1f} ms | "
+          f"resolutor {t_memoritzat * 1000:8.1f} ms (primera classificació {t_primera * 1000:.2f} ms)")
+    print(f"   Rols: {{{', '.join(f'{rol}: {col!r}' for rol, col in rols.items() if rol not in ('instruments', 'altres'))}}}")
+
+
+def prova_informe(n, informes=200):
+    """Render de l'informe HTML: plantilla recompilada a cada informe vs plantilla precompilada"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        df, _, _ = ExtractorDades()._validar_i_netejar(generar_enquesta(n))
+        resultats = AnalitzadorSUS(df, COLUMNES_GALERIA, COLUMNES_MAPA).analitzar()
+    generador = GeneradorInformeHTML()
+    with open(GeneradorInformeHTML.RUTA_PLANTILLA, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+    plantilla = generador.plantilla()
+    valors = {ranura: '' for ranura in plantilla.ranures}
+
+    t_recompilada, _ = cronometrar(lambda: [PlantillaInforme(text).omplir(**valors) for _ in range(informes)])
+    t_precompilada, _ = cronometrar(lambda: [plantilla.omplir(**valors) for _ in range(informes)])
+    with contextlib.redirect_stdout(io.StringIO()):
+        t_informe, html = cronometrar(lambda: [generador.generar_informe_html(resultats) for _ in range(informes)])
+    print(f"   Plantilla ({len(plantilla.ranures)} ranures): recompilada {t_recompilada / informes * 1e6:8.1f} µs | "
+          f"precompilada {t_precompilada / informes * 1e6:8.1f} µs per informe")
+    print(f"   Informe complet: {t_informe / informes * 1000:8.3f} ms per informe ({len(html[0]) / 1024:.0f} KiB)")
+    estatic = GeneradorInformeHTML(grafics='estatic')
+    with contextlib.redirect_stdout(io.StringIO()):
+        t_estatic, html = cronometrar(lambda: [estatic.generar_informe_html(resultats) for _ in range(informes)])
+    print(f"   Informe estàtic (SVG): {t_estatic / informes * 1000:8.3f} ms per informe ({len(html[0]) / 1024:.0f} KiB)")
+
+
+def prova_actius(n, informes=100):
+    """Mida d'un lot d'informes: estils incrustats a cada informe vs un paquet compartit amb hash"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        df, _, _ = ExtractorDades()._validar_i_netejar(generar_enquesta(n))
+        resultats = AnalitzadorSUS(df, COLUMNES_GALERIA, COLUMNES_MAPA).analitzar()
+    modes = ['cdn', 'compartits', 'incrustat'] if os.path.exists(ActiusInforme.RUTA_CHARTJS) else ['cdn']
+    if len(modes) == 1:
+        print(f"   (sense {ActiusInforme.RUTA_CHARTJS}: només es mesura el mode cdn)")
+    for mode in modes:
+        with tempfile.TemporaryDirectory() as directori:
+            generador = GeneradorInformeHTML(ActiusInforme(mode))
+            def lot():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for i in range(informes):
+                        generador.desar_informe(resultats, os.path.join(directori, f'informe_{i}.html'))
+            t, _ = cronometrar(lot, repeticions=1)
+            mida = sum(os.path.getsize(os.path.join(arrel, nom)) for arrel, _, noms in os.walk(directori) for nom in noms)
+        print(f"   {mode:<11} {informes} informes: {mida / 2**20:8.2f} MiB | {t * 1000:8.1f} ms")
+
+
+def prova_lots(n):
+    """Informes per partició: mida de la partició enviada (DataFrame vs arrays compactes) i escalat amb processos"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        df, _, _ = ExtractorDades()._validar_i_netejar(generar_enquesta(n))
+    arrays, descriptors = GeneradorLots.codificar(df)
+    assert GeneradorLots.descodificar(arrays, descriptors).equals(df.reset_index(drop=True))
+    print(f"   Partició sencera: DataFrame {len(pickle.dumps(df)) / 2**20:8.2f} MiB | "
+          f"arrays compactes {len(pickle.dumps(arrays)) / 2**20:8.2f} MiB")
+
+    for processos in sorted({1, 2, os.cpu_count() or 1}):
+        with tempfile.TemporaryDirectory() as directori:
+            lots = GeneradorLots(proves=ProvesAparellades(permutacions=1_000), processos=processos)
+            with contextlib.redirect_stdout(io.StringIO()):
+                t, resums = cronometrar(lambda: lots.generar(df, ['edat', 'tecnologia'], directori), repeticions=1)
+        print(f"   {processos:>2} processos: {len(resums)} informes en {t:6.2f} s ({len(resums) / t:6.1f} informes/s)")
+
+
+def prova_mida_informe(n):
+    """Mida de l'informe HTML en funció de N: una sola illa de dades amb les puntuacions codificades"""
+    # Cada puntuació ocupa com a màxim un byte abans del gzip i 4/3 de byte en base64:
+    # la mida ha de quedar per sota de la part fixa més 4/3 · N · K bytes
+    generador = GeneradorInformeHTML()
+    mides = {}
+    for mida in (100, n // 10, n):
+        with contextlib.redirect_stdout(io.StringIO()):
+            df, _, _ = ExtractorDades()._validar_i_netejar(generar_enquesta(mida))
+            resultats = AnalitzadorSUS(df, COLUMNES_GALERIA, COLUMNES_MAPA).analitzar()
+            mides[mida] = len(generador.generar_informe_html(resultats).encode('utf-8'))
+    fixa = mides[100]
+    for mida, bytes_informe in mides.items():
+        limit = fixa + 4 / 3 * 2 * mida
+        print(f"   N={mida:>8}: {bytes_informe / 1024:9.1f} KiB | {(bytes_informe - fixa) / (2 * mida):5.2f} bytes per puntuació | "
+              f"límit {limit / 1024:9.1f} KiB {'✅' if bytes_informe <= limit else '❌'}")
+
+
+def prova_vigilancia(n, noves=100):
+    """Mode vigilància: consulta amb poques files noves sobre agregats desats vs tornar-ho a analitzar tot"""
+    df = generar_enquesta(n)
+    with tempfile.TemporaryDirectory() as directori:
+        fitxer = os.path.join(directori, 'respostes.csv')
+        ruta_estat = os.path.join(directori, 'estat.pkl')
+        df.iloc[:n - noves].to_csv(fitxer, index=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            AnalitzadorSUSIncremental(ExtractorDades(fitxer), ruta_estat).actualitzar()
+        df.to_csv(fitxer, index=False)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            incremental = AnalitzadorSUSIncremental(ExtractorDades(fitxer), ruta_estat)
+            t_delta, afegides = cronometrar(incremental.actualitzar, repeticions=1)
+            t_res, resultats = cronometrar(lambda: incremental._resultats_estat(incremental.estat), repeticions=1)
+            t_buida, _ = cronometrar(incremental.actualitzar, repeticions=1)
+            t_complet, complet = cronometrar(lambda: AnalitzadorSUSStreaming(ExtractorDades(fitxer)).analitzar(), repeticions=1)
+        mida_estat = os.path.getsize(ruta_estat)
+    assert afegides == noves
+    assert resultats['demografia'] == complet['demografia']
+    print(f"   Tot de nou {t_complet:6.2f} s | {noves} files noves {t_delta:6.2f} s + resultats {t_res:6.2f} s | "
+          f"sense canvis {t_buida:6.2f} s | estat desat {mida_estat / 1024:.1f} KiB")
+
+
+def prova_servidor(n, peticions=1_000):
+    """Servidor HTTP: primera petició de cada recurs (anàlisi i render) vs peticions repetides des de memòria"""
+    with tempfile.TemporaryDirectory() as directori:
+        fitxer = os.path.join(directori, 'respostes.csv')
+        generar_enquesta(n).to_csv(fitxer, index=False)
+        servidor = ServidorInformes({'prova': fitxer}, proves=ProvesAparellades(permutacions=1_000))
+        with servidor.crear(port=0) as servidor_http, contextlib.redirect_stdout(io.StringIO()):
+            threading.Thread(target=servidor_http.serve_forever, daemon=True).start()
+            connexio = http.client.HTTPConnection('127.0.0.1', servidor_http.server_address[1])
+
+            def demanar(ruta):
+                connexio.request('GET', ruta, headers={'Accept-Encoding': 'gzip'})
+                resposta = connexio.getresponse()
+                return resposta.status, len(resposta.read())
+
+            temps = {}
+            for ruta in ('/prova/', '/prova/api/results', '/prova/api/segments', '/prova/dades_sus.csv'):
+                t_primera, (estat, mida) = cronometrar(lambda: demanar(ruta), repeticions=1)
+                assert estat == 200
+                latencies = []
+                for _ in range(peticions):
+                    inici = time.perf_counter()
+                    demanar(ruta)
+                    latencies.append(time.perf_counter() - inici)
+                temps[ruta] = (t_primera, float(np.median(latencies)), mida)
+            servidor_http.shutdown()
+    for ruta, (t_primera, mediana, mida) in temps.items():
+        print(f"   {ruta:<22} primera {t_primera * 1000:9.1f} ms | repetida (mediana de {peticions}) "
+              f"{mediana * 1000:7.3f} ms | {mida / 1024:8.1f} KiB gzip")
+
+
+def escriure_json_anterior(resultats, f):
+    """Exportació JSON anterior: tot el diccionari amb indent=2 i default=str"""
+    json.dump({'metadades': {'mida_mostra': resultats['demografia']['total_respostes']},
+               'resultats': {clau: valor for clau, valor in resultats.items() if clau != 'instruments'}},
+              f, indent=2, ensure_ascii=False, default=str)
+
+
+def prova_exportacio_json(n):
+    """resultats_sus.json: json.dump(indent=2, default=str) vs exportador per seccions (JSON i NDJSON)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        df, _, _ = ExtractorDades()._validar_i_netejar(generar_enquesta(n))
+        resultats = AnalitzadorSUS(df, COLUMNES_GALERIA, COLUMNES_MAPA).analitzar()
+    # L'exportació anterior amb les respostes completes en lloc del repr truncat del DataFrame
+    complets = dict(resultats, dades_en_brut=AnalitzadorSUS.expandir_puntuacions(resultats['dades_en_brut']).to_dict('records'))
+    with tempfile.TemporaryDirectory() as directori:
+        def desar(nom, escriure):
+            ruta = os.path.join(directori, nom)
+            with open(ruta, 'w', encoding='utf-8') as f:
+                escriure(f)
+            return os.path.getsize(ruta)
+
+        mesures = {
+            'Anterior (repr truncat)': cronometrar(lambda: desar('a.json', lambda f: escriure_json_anterior(resultats, f)), 1),
+            'Anterior amb respostes': cronometrar(lambda: desar('b.json', lambda f: escriure_json_anterior(complets, f)), 1),
+            'Exportador JSON': cronometrar(lambda: desar('c.json', lambda f: ExportadorJSON().escriure(resultats, f))),
+            'Exportador NDJSON': cronometrar(lambda: desar('d.json', lambda f: ExportadorJSON('ndjson').escriure(resultats, f))
+                                             + desar('d.ndjson', lambda f: ExportadorJSON('ndjson').escriure_respostes(resultats, f)))
+        }
+        with open(os.path.join(directori, 'c.json'), encoding='utf-8') as f:
+            document = json.load(f)
+        with open(os.path.join(directori, 'd.ndjson'), encoding='utf-8') as f:
+            files_ndjson = sum(1 for linia in f if json.loads(linia))
+    assert len(document['respostes']['files']) == files_ndjson == len(df)
+    for nom, (t, mida) in mesures.items():
+        print(f"   {nom:<24} {t * 1000:9.1f} ms | {mida / 2**20:8.2f} MiB")
+    t_anterior, mida_anterior = mesures['Anterior amb respostes']
+    t_nou, mida_nou = mesures['Exportador JSON']
+    assert t_nou < t_anterior and mida_nou < mida_anterior, "L'exportador no millora l'exportació anterior"
+    print(f"   Respostes completes: x{t_anterior / t_nou:.1f} més ràpid, x{mida_anterior / mida_nou:.1f} més petit")
+
+
+def llegir_dades(ruta, format_dades):
+    """Llegir un fitxer exportat per ExportadorDades"""
+    if format_dades == 'npz':
+        with np.load(ruta) as vectors:
+            return {nom: vectors[nom] for nom in vectors.files}
+    if format_dades == 'parquet':
+        return pd.read_parquet(ruta)
+    if format_dades == 'feather':
+        return pd.read_feather(ruta)
+    return pd.read_csv(ruta, compression='zstd' if format_dades == 'csv.zst' else 'infer')
+
+
+def prova_formats_dades(n):
+    """Dades processades: escriptura, lectura i mida de cada format; pic de memòria del CSV sencer vs per fragments"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        df, _, _ = ExtractorDades()._validar_i_netejar(generar_enquesta(n))
+        resultats = AnalitzadorSUS(df, COLUMNES_GALERIA, COLUMNES_MAPA, compacte=True).analitzar()
+    exportador = ExportadorDades()
+    with tempfile.TemporaryDirectory() as directori:
+        for format_dades in ExportadorDades.FORMATS:
+            if not ExportadorDades.disponible(format_dades):
+                print(f"   {format_dades:<8} no disponible ({ExportadorDades.DEPENDENCIES[format_dades][0]})")
+                continue
+            ruta = os.path.join(directori, ExportadorDades.FITXERS[format_dades])
+            t_escriptura, _ = cronometrar(lambda: exportador.desar(resultats, ruta, format_dades), repeticions=1)
+            t_lectura, llegit = cronometrar(lambda: llegir_dades(ruta, format_dades), repeticions=1)
+            files = len(llegit['puntuacions'] if format_dades == 'npz' else llegit)
+            assert files == len(df), f"{format_dades}: {files} files llegides de {len(df)}"
+            print(f"   {format_dades:<8} escriptura {t_escriptura * 1000:8.1f} ms | lectura {t_lectura * 1000:8.1f} ms | "
+                  f"{os.path.getsize(ruta) / 2**20:8.2f} MiB")
+
+        ruta = os.path.join(directori, 'pic.csv')
+        sencer = pic_memoria(lambda: AnalitzadorSUS.expandir_puntuacions(resultats['dades_en_brut']).to_csv(ruta, index=False))
+        fragments = pic_memoria(lambda: exportador.desar(resultats, ruta, 'csv'))
+    print(f"   Pic de memòria del CSV: sencer {sencer / 2**20:8.1f} MiB | per fragments {fragments / 2**20:8.1f} MiB")
+
+
+PROVES = {
+    'puntuacio': prova_puntuacio,
+    'estadistiques': prova_estadistiques,
+    'streaming': prova_streaming,
+    'descarrega': prova_descarrega,
+    'multifont': prova_multifont,
+    'memoria_descarrega': prova_memoria_descarrega,
+    'cache_dades': prova_cache_dades,
+    'validacio': prova_validacio,
+    'memoria_compacta': prova_memoria_compacta,
+    'instruments': prova_instruments,
+    'bootstrap': prova_bootstrap,
+    'permutacio': prova_permutacio,
+    'segments': prova_segments,
+    'rols': prova_rols,
+    'informe': prova_informe,
+    'actius': prova_actius,
+    'lots': prova_lots,
+    'mida_informe': prova_mida_informe,
+    'vigilancia': prova_vigilancia,
+    'servidor': prova_servidor,
+    'exportacio_json': prova_exportacio_json,
+    'formats_dades': prova_formats_dades,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bancs de proves de rendiment SUS")
+    parser.add_argument('proves', nargs='*', help=f"Proves a executar (per defecte totes): {', '.join(PROVES)}")
+    parser.add_argument('--n', type=int, default=100_000, help="Nombre de respostes sintètiques")
+    args = parser.parse_args()
+    desconegudes = [nom for nom in args.proves if nom not in PROVES]
+    if desconegudes:
+        parser.error(f"Proves desconegudes: {', '.join(desconegudes)}")
+
+    for nom in args.proves or PROVES:
+        print(f"⏱️ {nom} (N={args.n}): {PROVES[nom].__doc__}")
+        PROVES[nom](args.n)
+
+
+if __name__ == "__main__":
+    main()
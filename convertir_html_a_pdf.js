@@ -18,13 +18,15 @@ const fs = require('fs');
   const page = await browser.newPage();
   await page.goto(filePath, { waitUntil: 'networkidle0' });
 
-  // Esperar que els gràfics s’hagin carregat (opcional)
-  try {
-    await page.waitForFunction(() => {
-      return window.Chart && Object.keys(Chart.instances).length > 0;
-    }, { timeout: 5000 });
-  } catch {
-    console.warn("⚠️ No s'han detectat gràfics Chart.js o timeout.");
+  // Esperar que els gràfics s’hagin carregat (opcional); els informes estàtics ja porten SVG
+  if (await page.$('canvas')) {
+    try {
+      await page.waitForFunction(() => {
+        return window.Chart && Object.keys(Chart.instances).length > 0;
+      }, { timeout: 5000 });
+    } catch {
+      console.warn("⚠️ No s'han detectat gràfics Chart.js o timeout.");
+    }
   }
 
   // Obtenir dimensions totals del contingut
@@ -1,12 +1,30 @@
 import pandas as pd
 import numpy as np
 import requests
-from io import StringIO
+import io
+import base64
+import contextlib
+import gzip
+import http.server
 import json
 from datetime import datetime
 import warnings
 import os
+import pickle
 import sys
+import hashlib
+import html
+import math
+import re
+import tempfile
+import threading
+import time
+import urllib.parse
+import zipfile
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 warnings.filterwarnings('ignore')
 
 # Validar dependències requerides
@@ -24,12 +42,728 @@ if paquets_que_falten:
     print(f"📦 Instal·la amb: pip install {' '.join(paquets_que_falten)}")
     sys.exit(1)
 
+# Dependències opcionals: pyarrow permet desar dades en format columnar (Feather, Parquet)
+# i zstandard, exportar CSV comprimit amb zstd
+import importlib.util
+PYARROW_DISPONIBLE = importlib.util.find_spec('pyarrow') is not None
+ZSTANDARD_DISPONIBLE = importlib.util.find_spec('zstandard') is not None
+
+class LectorFluxBytes(io.RawIOBase):
+    """Fitxer binari de només lectura sobre un iterador de fragments de bytes
+    
+    Permet passar el cos d'una resposta HTTP (o d'un fitxer de la memòria cau)
+    directament a pd.read_csv sense materialitzar-lo sencer en memòria.
+    """
+    
+    MIDA_FRAGMENT = 64 * 1024
+    
+    def __init__(self, fragments, en_tancar=None, empremta=None):
+        self._fragments = iter(fragments)
+        self._pendent = b''
+        self._en_tancar = en_tancar
+        self.empremta = empremta  # Hash SHA-256 del contingut, si es coneix per endavant
+    
+    @classmethod
+    def de_resposta(cls, resposta):
+        """Adaptador sobre el cos d'una resposta de requests obtinguda amb stream=True"""
+        return cls(resposta.iter_content(chunk_size=cls.MIDA_FRAGMENT), en_tancar=resposta.close)
+    
+    @classmethod
+    def de_fitxer(cls, ruta, en_tancar=None, empremta=None):
+        """Adaptador sobre un fitxer local llegit per fragments"""
+        f = open(ruta, 'rb')
+        
+        def tancar():
+            f.close()
+            if en_tancar:
+                en_tancar()
+        
+        return cls(iter(lambda: f.read(cls.MIDA_FRAGMENT), b''), en_tancar=tancar, empremta=empremta)
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, memoria):
+        while not self._pendent:
+            fragment = next(self._fragments, None)
+            if fragment is None:
+                return 0
+            self._pendent = memoryview(fragment)
+        n = min(len(memoria), len(self._pendent))
+        memoria[:n] = self._pendent[:n]
+        self._pendent = self._pendent[n:]
+        return n
+    
+    def es_buit(self):
+        """Comprovar si el cos només conté espais, llegint només fins al primer byte significatiu"""
+        while not bytes(self._pendent).strip():
+            fragment = next(self._fragments, None)
+            if fragment is None:
+                return True
+            self._pendent = memoryview(bytes(self._pendent) + fragment)
+        return False
+    
+    def close(self):
+        if not self.closed and self._en_tancar:
+            self._en_tancar()
+        super().close()
+
+class CacheHTTP:
+    """Memòria cau persistent de descàrregues amb peticions condicionals (ETag / Last-Modified)
+    
+    Cada entrada es desa com a dos fitxers (cos i metadades) amb nom derivat de la clau.
+    Si el servidor respon 304 es reutilitza el cos desat. Les entrades que no s'han
+    fet servir durant `edat_maxima` segons s'eliminen, i si la mida total supera
+    `mida_maxima` bytes s'eliminen les menys usades recentment.
+    """
+    
+    def __init__(self, directori='.cache_sus', mida_maxima=256 * 2**20, edat_maxima=30 * 24 * 3600):
+        self.directori = directori
+        self.mida_maxima = mida_maxima
+        self.edat_maxima = edat_maxima
+        self._bloqueig = threading.Lock()  # L'extracció multi-font comparteix la memòria cau entre fils
+        os.makedirs(self.directori, exist_ok=True)
+    
+    def _rutes(self, clau):
+        """Rutes del cos i de les metadades d'una clau"""
+        nom = hashlib.sha256(clau.encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.directori, f'{nom}.cos'), os.path.join(self.directori, f'{nom}.json')
+    
+    def _llegir_metadades(self, ruta_metadades):
+        try:
+            with open(ruta_metadades, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _escriure_atomic(self, ruta, contingut):
+        """Escriure un fitxer de manera atòmica (fitxer temporal + reanomenament)"""
+        descriptor, ruta_temporal = tempfile.mkstemp(dir=self.directori, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(contingut)
+            os.replace(ruta_temporal, ruta)
+        except BaseException:
+            if os.path.exists(ruta_temporal):
+                os.remove(ruta_temporal)
+            raise
+    
+    def _desar_metadades(self, ruta_metadades, metadades):
+        self._escriure_atomic(ruta_metadades, json.dumps(metadades).encode('utf-8'))
+    
+    def obtenir(self, url, clau, sessio=None, timeout=10):
+        """Descarregar una URL amb validació condicional
+        
+        Retorna (flux, codificació, origen) on flux és un LectorFluxBytes sobre el cos
+        i origen és 'xarxa' o 'cache', o (None, None, None) si el servidor no retorna
+        cap cos vàlid. El cos es copia a disc per fragments, mai sencer en memòria.
+        """
+        sessio = sessio or requests
+        ruta_cos, ruta_metadades = self._rutes(clau)
+        metadades = self._llegir_metadades(ruta_metadades) if os.path.exists(ruta_cos) else None
+        
+        capcaleres = {}
+        if metadades:
+            if metadades.get('etag'):
+                capcaleres['If-None-Match'] = metadades['etag']
+            if metadades.get('last_modified'):
+                capcaleres['If-Modified-Since'] = metadades['last_modified']
+        
+        with sessio.get(url, headers=capcaleres, timeout=timeout, stream=True) as resposta:
+            if resposta.status_code == 304 and metadades:
+                metadades['ultim_us'] = time.time()
+                self._desar_metadades(ruta_metadades, metadades)
+                print(f"💾 Sense canvis al servidor (304): usant còpia local ({os.path.getsize(ruta_cos)} bytes)")
+                flux = LectorFluxBytes.de_fitxer(ruta_cos, empremta=metadades.get('empremta'))
+                return flux, metadades.get('codificacio'), 'cache'
+            
+            if resposta.status_code != 200:
+                return None, None, None
+            
+            # Bolcar el cos a un fitxer temporal per fragments
+            descriptor, ruta_temporal = tempfile.mkstemp(dir=self.directori, suffix='.tmp')
+            mida = 0
+            hash_cos = hashlib.sha256()
+            try:
+                with os.fdopen(descriptor, 'wb') as f:
+                    for fragment in resposta.iter_content(chunk_size=LectorFluxBytes.MIDA_FRAGMENT):
+                        f.write(fragment)
+                        hash_cos.update(fragment)
+                        mida += len(fragment)
+            except BaseException:
+                self._eliminar(ruta_temporal)
+                raise
+            etag = resposta.headers.get('ETag')
+            last_modified = resposta.headers.get('Last-Modified')
+            codificacio = resposta.encoding
+        
+        if mida > self.mida_maxima or not (etag or last_modified):
+            # No es conserva: s'elimina el fitxer temporal en acabar la lectura
+            flux = LectorFluxBytes.de_fitxer(ruta_temporal, en_tancar=lambda: self._eliminar(ruta_temporal),
+                                             empremta=hash_cos.hexdigest())
+            return flux, codificacio, 'xarxa'
+        
+        os.replace(ruta_temporal, ruta_cos)
+        self._desar_metadades(ruta_metadades, {
+            'clau': clau,
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'codificacio': codificacio,
+            'mida': mida,
+            'empremta': hash_cos.hexdigest(),
+            'ultim_us': time.time()
+        })
+        flux = LectorFluxBytes.de_fitxer(ruta_cos, empremta=hash_cos.hexdigest())
+        self.expulsar()
+        return flux, codificacio, 'xarxa'
+    
+    def expulsar(self):
+        """Eliminar entrades caducades i, si cal, les menys usades fins a complir la mida màxima"""
+        with self._bloqueig:
+            self._expulsar()
+    
+    def _expulsar(self):
+        ara = time.time()
+        entrades = []
+        for nom in os.listdir(self.directori):
+            if not nom.endswith('.json'):
+                continue
+            ruta_metadades = os.path.join(self.directori, nom)
+            ruta_cos = ruta_metadades[:-len('.json')] + '.cos'
+            metadades = self._llegir_metadades(ruta_metadades)
+            if metadades is None or not os.path.exists(ruta_cos) or ara - metadades.get('ultim_us', 0) > self.edat_maxima:
+                self._eliminar(ruta_cos, ruta_metadades)
+                continue
+            entrades.append((metadades.get('ultim_us', 0), os.path.getsize(ruta_cos), ruta_cos, ruta_metadades))
+        
+        mida_total = sum(entrada[1] for entrada in entrades)
+        for _, mida, ruta_cos, ruta_metadades in sorted(entrades):
+            if mida_total <= self.mida_maxima:
+                break
+            self._eliminar(ruta_cos, ruta_metadades)
+            mida_total -= mida
+    
+    def _eliminar(self, *rutes):
+        for ruta in rutes:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+class CacheDadesNetes:
+    """Memòria cau de dades ja validades, adreçada pel hash del contingut en brut
+    
+    La clau combina el hash SHA-256 de les dades en brut amb les regles de validació,
+    de manera que unes dades idèntiques amb les mateixes regles es recuperen sense
+    tornar-les a llegir ni netejar. Es desa en format Feather si pyarrow està
+    disponible, o en NumPy .npz en cas contrari.
+    """
+    
+    def __init__(self, directori=os.path.join('.cache_sus', 'dades'), format_desat=None):
+        self.directori = directori
+        self.format_desat = format_desat or ('feather' if PYARROW_DISPONIBLE else 'npz')
+        os.makedirs(self.directori, exist_ok=True)
+    
+    def clau(self, empremta, regles):
+        """Clau de l'entrada a partir del hash del contingut i de les regles de validació"""
+        text = empremta + json.dumps(regles, sort_keys=True)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
+    
+    def _rutes(self, clau):
+        return os.path.join(self.directori, f'{clau}.{self.format_desat}'), os.path.join(self.directori, f'{clau}.json')
+    
+    def carregar(self, empremta, regles):
+        """Retornar (df, columnes de cada instrument...) o None si no hi ha cap entrada"""
+        ruta_dades, ruta_metadades = self._rutes(self.clau(empremta, regles))
+        if not (os.path.exists(ruta_dades) and os.path.exists(ruta_metadades)):
+            return None
+        try:
+            with open(ruta_metadades, 'r', encoding='utf-8') as f:
+                metadades = json.load(f)
+            if self.format_desat == 'feather':
+                df = pd.read_feather(ruta_dades).set_index('__index__')
+                df.index.name = None
+            else:
+                df = self._carregar_npz(ruta_dades, metadades['columnes'])
+        except Exception as e:
+            print(f"⚠️ No s'ha pogut llegir la memòria cau de dades netes: {e}")
+            return None
+        return (df, *metadades['columnes_instruments'])
+    
+    def desar(self, empremta, regles, df, *columnes_instruments):
+        """Desar unes dades validades de manera atòmica"""
+        ruta_dades, ruta_metadades = self._rutes(self.clau(empremta, regles))
+        descriptor, ruta_temporal = tempfile.mkstemp(dir=self.directori, suffix='.tmp')
+        os.close(descriptor)
+        try:
+            if self.format_desat == 'feather':
+                df.rename_axis('__index__').reset_index().to_feather(ruta_temporal)
+            else:
+                with open(ruta_temporal, 'wb') as f:
+                    self._desar_npz(f, df)
+            os.replace(ruta_temporal, ruta_dades)
+        except Exception as e:
+            if os.path.exists(ruta_temporal):
+                os.remove(ruta_temporal)
+            print(f"⚠️ No s'ha pogut desar la memòria cau de dades netes: {e}")
+            return
+        
+        with open(ruta_metadades, 'w', encoding='utf-8') as f:
+            json.dump({
+                'empremta': empremta,
+                'columnes': [str(col) for col in df.columns],
+                'columnes_instruments': [list(columnes) for columnes in columnes_instruments],
+                'files': len(df)
+            }, f)
+    
+    def _desar_npz(self, f, df):
+        """Desar cada columna com a vector NumPy; les columnes de text amb una màscara de nuls"""
+        vectors = {'__index__': df.index.to_numpy()}
+        for i, col in enumerate(df.columns):
+            if pd.api.types.is_numeric_dtype(df[col]) or pd.api.types.is_bool_dtype(df[col]):
+                vectors[f'c{i}'] = df[col].to_numpy()
+            else:
+                nuls = df[col].isna().to_numpy()
+                vectors[f'c{i}'] = df[col].astype(str).to_numpy(dtype=str)
+                vectors[f'n{i}'] = nuls
+        np.savez(f, **vectors)
+    
+    def _carregar_npz(self, ruta, columnes):
+        with np.load(ruta, allow_pickle=False) as vectors:
+            dades = {}
+            for i, col in enumerate(columnes):
+                valors = vectors[f'c{i}']
+                if f'n{i}' in vectors.files:
+                    serie = pd.Series(valors, dtype=object)
+                    serie[vectors[f'n{i}']] = np.nan
+                    valors = serie.to_numpy()
+                dades[col] = valors
+            return pd.DataFrame(dades, index=vectors['__index__'])
+
+class ManifestConstruccio:
+    """Manifest de construcció incremental: hash de l'entrada, dels resultats i de cada fitxer generat
+    
+    Cada etapa (anàlisi, informe HTML, exportació JSON, CSV...) es registra amb una clau
+    derivada de les seves entrades i amb els fitxers que ha produït. Si la clau no ha canviat
+    i els fitxers continuen intactes, l'etapa s'omet. Els fitxers s'escriuen primer a un
+    temporal i només substitueixen el destí (de manera atòmica) si els bytes són diferents,
+    de manera que una execució sense canvis no toca cap fitxer.
+    """
+    
+    VERSIO = 1
+    
+    def __init__(self, ruta=os.path.join('.cache_sus', 'manifest.json'),
+                 directori_resultats=os.path.join('.cache_sus', 'resultats'), forcar=False):
+        self.ruta = ruta
+        self.directori_resultats = directori_resultats
+        self.forcar = forcar  # Tornar a executar totes les etapes (el manifest s'actualitza igualment)
+        self.dades = self._llegir()
+        self._modificat = False
+    
+    def _llegir(self):
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                dades = json.load(f)
+            if dades.get('versio') == self.VERSIO:
+                return dades
+        except (OSError, ValueError):
+            pass
+        return {'versio': self.VERSIO, 'etapes': {}, 'fitxers': {}}
+    
+    @staticmethod
+    def empremta(*parts):
+        """Hash SHA-256 d'uns valors serialitzables en JSON (p. ex. la clau d'una etapa)"""
+        text = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def empremta_fitxer(ruta):
+        """Hash SHA-256 del contingut d'un fitxer, llegit per fragments"""
+        hash_fitxer = hashlib.sha256()
+        with open(ruta, 'rb') as f:
+            for fragment in iter(lambda: f.read(1024 * 1024), b''):
+                hash_fitxer.update(fragment)
+        return hash_fitxer.hexdigest()
+    
+    @staticmethod
+    def empremta_dades(df):
+        """Hash del contingut d'un DataFrame (noms de columna, índex i valors)"""
+        hash_dades = hashlib.sha256(json.dumps([str(col) for col in df.columns]).encode('utf-8'))
+        hash_dades.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+        return hash_dades.hexdigest()
+    
+    @classmethod
+    def versio_codi(cls):
+        """Hash del codi i de les plantilles: un canvi de versió invalida totes les etapes"""
+        if not hasattr(cls, '_versio_codi'):
+            directori = os.path.dirname(os.path.abspath(__file__))
+            cls._versio_codi = cls.empremta(*(cls.empremta_fitxer(os.path.join(directori, nom))
+                                              for nom in ('main.py', 'plantilla_informe.html', 'plantilla_informe.css')
+                                              if os.path.exists(os.path.join(directori, nom))))
+        return cls._versio_codi
+    
+    def _clau_fitxer(self, ruta):
+        return os.path.normpath(ruta)
+    
+    def _fitxer_intacte(self, ruta):
+        """Comprovar que un fitxer és el que es va registrar; mida i data primer, hash només si cal"""
+        registre = self.dades['fitxers'].get(self._clau_fitxer(ruta))
+        try:
+            estat = os.stat(ruta)
+        except OSError:
+            return False
+        if registre is None or estat.st_size != registre['mida']:
+            return False
+        if estat.st_mtime_ns == registre['mtime_ns']:
+            return True
+        if self.empremta_fitxer(ruta) != registre['empremta']:
+            return False
+        registre['mtime_ns'] = estat.st_mtime_ns
+        self._modificat = True
+        return True
+    
+    def valor(self, etapa, nom, defecte=None):
+        """Valor desat amb el registre d'una etapa"""
+        return self.dades['etapes'].get(etapa, {}).get(nom, defecte)
+    
+    def vigent(self, etapa, clau):
+        """L'etapa ja es va executar amb aquesta clau i els seus fitxers no s'han tocat"""
+        registre = self.dades['etapes'].get(etapa)
+        return (not self.forcar and registre is not None and registre['clau'] == clau
+                and all(self._fitxer_intacte(ruta) for ruta in registre['fitxers']))
+    
+    def registrar(self, etapa, clau, fitxers=(), **valors):
+        """Registrar una etapa executada amb la seva clau, els fitxers produïts i valors addicionals"""
+        self.dades['etapes'][etapa] = {'clau': clau, 'fitxers': [self._clau_fitxer(ruta) for ruta in fitxers], **valors}
+        self._modificat = True
+    
+    @contextlib.contextmanager
+    def escriure(self, ruta):
+        """Donar una ruta temporal al costat de `ruta` per escriure-hi el fitxer sencer
+        
+        En sortir, el temporal substitueix `ruta` només si el contingut ha canviat; si no,
+        s'elimina i el fitxer existent no es toca (ni tan sols la data de modificació).
+        """
+        directori = os.path.dirname(os.path.abspath(ruta))
+        os.makedirs(directori, exist_ok=True)
+        descriptor, ruta_temporal = tempfile.mkstemp(dir=directori, suffix='.tmp')
+        os.close(descriptor)
+        try:
+            yield ruta_temporal
+            self._substituir(ruta, ruta_temporal)
+        finally:
+            if os.path.exists(ruta_temporal):
+                os.remove(ruta_temporal)
+    
+    def _substituir(self, ruta, ruta_temporal):
+        empremta = self.empremta_fitxer(ruta_temporal)
+        registre = self.dades['fitxers'].get(self._clau_fitxer(ruta))
+        igual = os.path.exists(ruta) and (
+            (registre is not None and registre['empremta'] == empremta and self._fitxer_intacte(ruta))
+            or self.empremta_fitxer(ruta) == empremta)
+        if igual:
+            print(f"⏸️ Sense canvis: {ruta}")
+        else:
+            # mkstemp crea el fitxer amb permisos 0600: conservar els del fitxer anterior
+            os.chmod(ruta_temporal, os.stat(ruta).st_mode & 0o777 if os.path.exists(ruta) else 0o644)
+            os.replace(ruta_temporal, ruta)
+        self.registrar_fitxer(ruta, empremta)
+        return not igual
+    
+    def registrar_fitxer(self, ruta, empremta=None):
+        """Registrar l'estat actual d'un fitxer escrit fora del manifest"""
+        estat = os.stat(ruta)
+        self.dades['fitxers'][self._clau_fitxer(ruta)] = {
+            'empremta': empremta or self.empremta_fitxer(ruta), 'mida': estat.st_size, 'mtime_ns': estat.st_mtime_ns}
+        self._modificat = True
+    
+    def construir(self, etapa, clau, ruta, generar):
+        """Executar `generar(ruta_temporal)` si l'etapa no és vigent; retorna si s'ha executat"""
+        if self.vigent(etapa, clau):
+            print(f"⏭️ {ruta}: entrades sense canvis, s'omet")
+            return False
+        with self.escriure(ruta) as ruta_temporal:
+            generar(ruta_temporal)
+        self.registrar(etapa, clau, [ruta])
+        return True
+    
+    def _ruta_resultats(self, clau):
+        return os.path.join(self.directori_resultats, f'{clau[:32]}.pkl')
+    
+    def carregar_resultats(self, clau):
+        """Resultats d'una anàlisi anterior amb la mateixa clau d'entrada, o None"""
+        if not self.vigent('analisi', clau):
+            return None
+        try:
+            with open(self._ruta_resultats(clau), 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"⚠️ No s'han pogut llegir els resultats desats: {e}")
+            return None
+    
+    def desar_resultats(self, clau, resultats):
+        """Desar els resultats d'una anàlisi, registrar l'etapa i retornar-ne el hash"""
+        os.makedirs(self.directori_resultats, exist_ok=True)
+        anterior = self.valor('analisi', 'clau')
+        ruta = self._ruta_resultats(clau)
+        with self.escriure(ruta) as ruta_temporal:
+            with open(ruta_temporal, 'wb') as f:
+                pickle.dump(resultats, f, protocol=pickle.HIGHEST_PROTOCOL)
+        if anterior and anterior != clau and os.path.exists(self._ruta_resultats(anterior)):
+            os.remove(self._ruta_resultats(anterior))
+        empremta = self.dades['fitxers'][self._clau_fitxer(ruta)]['empremta']
+        self.registrar('analisi', clau, [ruta], resultats=empremta)
+        return empremta
+    
+    def desar(self):
+        """Escriure el manifest de manera atòmica, si ha canviat"""
+        if not self._modificat:
+            return
+        directori = os.path.dirname(os.path.abspath(self.ruta))
+        os.makedirs(directori, exist_ok=True)
+        descriptor, ruta_temporal = tempfile.mkstemp(dir=directori, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+                json.dump(self.dades, f, indent=2, ensure_ascii=False)
+            os.replace(ruta_temporal, self.ruta)
+        except BaseException:
+            if os.path.exists(ruta_temporal):
+                os.remove(ruta_temporal)
+            raise
+        self._modificat = False
+
+class EsquemaQuestionari:
+    """Esquema declaratiu dels instruments SUS d'un qüestionari
+    
+    Cada instrument (eina avaluada) es defineix pel prefix dels codis de pregunta
+    (p. ex. 'G' per a G01..G10) o per una expressió regular, i porta les dades de
+    presentació que fan servir l'informe i les exportacions.
+    """
+    
+    # Colors RGB assignats per ordre als instruments que no en declaren cap
+    COLORS = [(142, 68, 173), (230, 126, 34), (52, 152, 219), (39, 174, 96),
+              (231, 76, 60), (241, 196, 15), (26, 188, 156), (52, 73, 94)]
+    ICONES = ['🖼️', '🗺️', '🧭', '📱', '🔎', '📚', '🧩', '🛠️']
+    
+    def __init__(self, instruments, titol=None):
+        if not instruments:
+            raise ValueError("L'esquema ha de tenir almenys un instrument")
+        self.instruments = [self._normalitzar(instrument, posicio) for posicio, instrument in enumerate(instruments)]
+        noms = [instrument['nom'] for instrument in self.instruments]
+        if len(set(noms)) != len(noms):
+            raise ValueError(f"Noms d'instrument duplicats: {noms}")
+        self.titol = titol or ' vs '.join(noms)
+    
+    @classmethod
+    def per_defecte(cls):
+        """Esquema original de l'estudi: Galeria (G01..G10) i Mapa (M01..M10)"""
+        return cls([
+            {'nom': 'Galeria', 'prefix': 'G', 'titol': 'Galeria Botànica', 'article': 'la galeria'},
+            {'nom': 'Mapa', 'prefix': 'M', 'titol': 'Mapa Botànic', 'article': 'el mapa',
+             'millores': 'de navegació i interacció'}
+        ], titol='Galeria vs Mapa Botànic')
+    
+    @classmethod
+    def de_prefixos(cls, prefixos):
+        """Esquema a partir de parells prefix=Nom (o només prefix)"""
+        instruments = []
+        for definicio in prefixos:
+            prefix, _, nom = definicio.partition('=')
+            instruments.append({'prefix': prefix, 'nom': nom or prefix})
+        return cls(instruments)
+    
+    @classmethod
+    def de_fitxer(cls, ruta):
+        """Carregar un esquema des d'un fitxer JSON {"titol": ..., "instruments": [...]}"""
+        with open(ruta, 'r', encoding='utf-8') as f:
+            definicio = json.load(f)
+        return cls(definicio['instruments'], titol=definicio.get('titol'))
+    
+    def _normalitzar(self, instrument, posicio):
+        """Completar la definició d'un instrument amb valors per defecte i compilar-ne el patró"""
+        instrument = dict(instrument)
+        if 'patro' not in instrument and 'prefix' not in instrument:
+            raise ValueError(f"L'instrument {instrument.get('nom', posicio)} necessita 'prefix' o 'patro'")
+        nom = instrument.setdefault('nom', instrument.get('prefix', f'Eina {posicio + 1}'))
+        # Per defecte, codis PREFIX01..PREFIX10 en qualsevol posició del nom de columna
+        instrument.setdefault('patro', re.escape(instrument.get('prefix', '')) + r'(?:0[1-9]|10)')
+        instrument['regex'] = re.compile(instrument['patro'])
+        instrument.setdefault('clau', nom.lower())
+        instrument.setdefault('titol', nom)
+        instrument.setdefault('article', nom)
+        instrument.setdefault('millores', "d'usabilitat")
+        instrument.setdefault('icona', self.ICONES[posicio % len(self.ICONES)])
+        instrument['color'] = tuple(instrument.get('color') or self.COLORS[posicio % len(self.COLORS)])
+        return instrument
+    
+    def __len__(self):
+        return len(self.instruments)
+    
+    def __iter__(self):
+        return iter(self.instruments)
+    
+    @property
+    def noms(self):
+        return [instrument['nom'] for instrument in self.instruments]
+    
+    def descripcio(self):
+        """Descripció serialitzable (sense patrons compilats); EsquemaQuestionari(**descripcio) la reconstrueix"""
+        return {
+            'titol': self.titol,
+            'instruments': [{clau: valor for clau, valor in instrument.items() if clau != 'regex'}
+                            for instrument in self.instruments]
+        }
+    
+    def detectar(self, columnes):
+        """Retornar les columnes de cada instrument, ordenades pel número de pregunta"""
+        # Una sola passada: cada columna es prova contra els patrons de tots els instruments
+        coincidencies = [{} for _ in self.instruments]
+        for col in columnes:
+            for coincidencies_instrument, instrument in zip(coincidencies, self.instruments):
+                coincidencia = instrument['regex'].search(str(col))
+                if coincidencia:
+                    coincidencies_instrument[col] = coincidencia
+        
+        resultat = []
+        for instrument, coincidencies in zip(self.instruments, coincidencies):
+            trobades = list(coincidencies)
+            prefix = instrument.get('prefix')
+            if not trobades and prefix:
+                trobades = [col for col in columnes if str(col).startswith(prefix) and len(str(col)) <= len(prefix) + 3]
+            
+            # Ordenar pel número de pregunta (dígits del codi trobat o del nom de columna)
+            try:
+                trobades = sorted(trobades, key=lambda col: int(''.join(filter(
+                    str.isdigit, coincidencies[col].group() if coincidencies.get(col) else str(col)))))
+            except ValueError:
+                print("⚠️ Avís: No s'han pogut ordenar les columnes correctament")
+            resultat.append(trobades)
+        return resultat
+
+class ResolutorColumnes:
+    """Classificació de les columnes d'un full en rols: preguntes SUS, marca temporal i demografia
+    
+    Cada capçalera es classifica una sola vegada i el resultat es memoritza per
+    l'empremta de la capçalera, de manera que l'extractor, l'analitzador, l'informe
+    i les exportacions comparteixen el mateix mapa sense tornar a recórrer les columnes.
+    Els rols no SUS es reconeixen per taules de sinònims (expressions regulars,
+    sense distinció de majúscules) que es poden ampliar o substituir.
+    """
+    
+    # Rol -> sinònims; una columna pren el primer rol que coincideix i cada rol, la primera columna
+    SINONIMS_PER_DEFECTE = {
+        'marca_temporal': [r'marca temporal', r'timestamp'],
+        'tecnologia': [r'familiaritat', r'tecnolog', r'technolog', r'familiarity'],
+        'uab': [r'\buab\b'],
+        'edat': [r'\bedat\b', r'\bage\b']
+    }
+    
+    def __init__(self, esquema=None, sinonims=None):
+        self.esquema = esquema or EsquemaQuestionari.per_defecte()
+        self.sinonims = {rol: list(patrons) for rol, patrons in self.SINONIMS_PER_DEFECTE.items()}
+        for rol, patrons in (sinonims or {}).items():
+            self.sinonims[rol] = list(patrons)
+        self.patrons = {rol: re.compile('|'.join(f'(?:{patro})' for patro in patrons), re.IGNORECASE)
+                        for rol, patrons in self.sinonims.items() if patrons}
+        self._memoria = {}
+        self._darrera = (None, None)  # (objecte de capçalera, mapa) de la darrera consulta
+    
+    @classmethod
+    def de_definicions(cls, definicions, esquema=None):
+        """Resolutor a partir de parells rol=sinònim1,sinònim2 (substitueixen els sinònims del rol)"""
+        sinonims = {}
+        for definicio in definicions:
+            rol, _, patrons = definicio.partition('=')
+            sinonims[rol] = [patro for patro in patrons.split(',') if patro]
+        return cls(esquema, sinonims)
+    
+    @staticmethod
+    def empremta(columnes):
+        """Empremta de la capçalera (noms i ordre de les columnes); els hash dels noms ja són a la memòria de Python"""
+        return tuple(columnes)
+    
+    def resoldre(self, columnes):
+        """Mapa de rols de la capçalera: {'instruments': {nom: [columnes]}, rol: columna o None, 'altres': [...]}"""
+        capcalera, mapa = self._darrera
+        if capcalera is columnes:
+            # La mateixa capçalera (p. ex. el mateix df.columns): ni tan sols cal calcular l'empremta
+            return mapa
+        clau = self.empremta(columnes)
+        if clau not in self._memoria:
+            self._memoria[clau] = self._classificar(list(columnes))
+        self._darrera = (columnes, self._memoria[clau])
+        return self._memoria[clau]
+    
+    def _classificar(self, columnes):
+        columnes_instruments = self.esquema.detectar(columnes)
+        columnes_sus = {col for columnes_instrument in columnes_instruments for col in columnes_instrument}
+        
+        mapa = {rol: None for rol in self.sinonims}
+        altres = []
+        for col in columnes:
+            if col in columnes_sus:
+                continue
+            rol = next((rol for rol, patro in self.patrons.items() if mapa[rol] is None and patro.search(str(col))), None)
+            if rol:
+                mapa[rol] = col
+            else:
+                altres.append(col)
+        
+        mapa['instruments'] = dict(zip(self.esquema.noms, columnes_instruments))
+        mapa['altres'] = altres
+        return mapa
+
 class ExtractorDades:
     """Classe per extreure i validar dades de Google Sheets"""
     
-    def __init__(self, url_full=None):
+    # Regles de validació; formen part de la clau de la memòria cau de dades netes
+    REGLES_VALIDACIO = {'versio': 3, 'rang': [1, 5], 'enters': True, 'elements_per_eina': 10}
+    
+    def __init__(self, url_full=None, cache=None, url_base='https://docs.google.com',
+                 sessio=None, reintents=3, factor_espera=0.5, timeout=10,
+                 competir=False, retard_cobertura=0.0, cache_dades=None, esquema=None, resolutor=None):
         self.url_full = url_full
+        # Instruments a detectar; per defecte Galeria (G01..G10) i Mapa (M01..M10)
+        self.esquema = esquema or EsquemaQuestionari.per_defecte()
+        # Rols de columna, compartits amb l'analitzador i memoritzats per capçalera
+        self.resolutor = resolutor or ResolutorColumnes(self.esquema)
+        self.regles_validacio = dict(self.REGLES_VALIDACIO, eines=[instrument['patro'] for instrument in self.esquema])
+        self.cache = cache  # CacheHTTP opcional per evitar descàrregues repetides
+        self.cache_dades = cache_dades  # CacheDadesNetes opcional per evitar tornar a validar
+        self.url_base = url_base.rstrip('/')
+        self.sessio = sessio or self.crear_sessio(reintents, factor_espera)
+        self.timeout = timeout
+        # Competició entre endpoints: el segon es llança als `retard_cobertura` segons
+        # si el primer encara no ha respost (0 = tots alhora)
+        self.competir = competir
+        self.retard_cobertura = retard_cobertura
         self.dades_mostra = self._obtenir_dades_mostra()
+    
+    @staticmethod
+    def crear_sessio(reintents=3, factor_espera=0.5, mida_pool=10):
+        """Crear una sessió HTTP amb connexions persistents i reintents amb espera exponencial"""
+        opcions_reintent = dict(
+            total=reintents,
+            connect=reintents,
+            read=reintents,
+            status=reintents,
+            backoff_factor=factor_espera,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False
+        )
+        try:
+            reintent = Retry(backoff_jitter=factor_espera, **opcions_reintent)
+        except TypeError:
+            # Versions d'urllib3 anteriors a la 2.0 no admeten jitter
+            reintent = Retry(**opcions_reintent)
+        
+        adaptador = HTTPAdapter(pool_connections=mida_pool, pool_maxsize=mida_pool, max_retries=reintent)
+        sessio = requests.Session()
+        sessio.mount('https://', adaptador)
+        sessio.mount('http://', adaptador)
+        return sessio
         
     def _obtenir_dades_mostra(self):
         """Dades de mostra quan no es pot accedir a Google Sheets"""
@@ -55,6 +789,28 @@ class ExtractorDades:
             pass
         return None
     
+    def _urls_exportacio(self, id_full):
+        """Parells (endpoint, URL) d'exportació CSV d'un Google Sheet, per ordre de preferència"""
+        return [
+            ('export', f"{self.url_base}/spreadsheets/d/{id_full}/export?format=csv"),
+            ('gviz', f"{self.url_base}/spreadsheets/d/{id_full}/gviz/tq?tqx=out:csv")
+        ]
+    
+    def _obrir_flux(self, url, clau):
+        """Obrir el cos d'una URL com a flux de bytes, passant per la memòria cau si n'hi ha
+        
+        Retorna (flux, codificació) o (None, None) si la resposta no és vàlida.
+        """
+        if self.cache is not None:
+            flux, codificacio, _ = self.cache.obtenir(url, clau, sessio=self.sessio, timeout=self.timeout)
+            return flux, codificacio
+        
+        resposta = self.sessio.get(url, timeout=self.timeout, stream=True)
+        if resposta.status_code != 200:
+            resposta.close()
+            return None, None
+        return LectorFluxBytes.de_resposta(resposta), resposta.encoding
+    
     def obtenir_dades(self):
         """Extreure dades de Google Sheet o usar dades de mostra"""
         print("🔄 Intentant extreure dades de Google Sheets...")
@@ -64,35 +820,108 @@ class ExtractorDades:
             return self._usar_dades_mostra()
         
         try:
-            id_full = self.extreure_id_full(self.url_full)
-            if not id_full:
-                raise ValueError("URL de Google Sheet no vàlida")
-            
-            # Provar diferents mètodes d'extracció
-            metodes = [
-                f"https://docs.google.com/spreadsheets/d/{id_full}/export?format=csv",
-                f"https://docs.google.com/spreadsheets/d/{id_full}/gviz/tq?tqx=out:csv"
-            ]
-            
-            for metode in metodes:
-                try:
-                    print(f"🔗 Provant: {metode}")
-                    resposta = requests.get(metode, timeout=10)
-                    if resposta.status_code == 200 and len(resposta.text.strip()) > 0:
-                        df = pd.read_csv(StringIO(resposta.text))
-                        if len(df) > 0:
-                            print(f"✅ Dades extretes correctament: {len(df)} files")
-                            return self._validar_i_netejar(df)
-                except Exception as e:
-                    print(f"⚠️ Mètode fallit: {e}")
-                    continue
-                    
-            raise Exception("No es pot accedir a Google Sheets amb cap mètode")
+            df = self.llegir_font(self.url_full)
+            print(f"✅ Dades extretes correctament: {len(df)} files")
+            return self._validar_i_netejar(df)
             
         except Exception as e:
             print(f"⚠️ Error: {e}")
             return self._usar_dades_mostra()
     
+    def llegir_font(self, font):
+        """Llegir una font sense validar: fitxer CSV local, Google Sheet o URL directa d'un CSV"""
+        if os.path.exists(font):
+            print(f"📂 Llegint fitxer local: {font}")
+            empremta = self._empremta_fitxer(font) if self.cache_dades else None
+            df = self._recuperar_netes(empremta)
+            return df if df is not None else self._marcar_empremta(pd.read_csv(font), empremta)
+        
+        id_full = self.extreure_id_full(font)
+        if not id_full:
+            if not font.startswith(('http://', 'https://')):
+                raise ValueError("URL de Google Sheet no vàlida")
+            return self._provar_metode(font, 'directe', font)
+        
+        if self.competir:
+            return self._obtenir_en_competicio(id_full)
+        
+        # Provar diferents mètodes d'extracció
+        for endpoint, metode in self._urls_exportacio(id_full):
+            try:
+                return self._provar_metode(id_full, endpoint, metode)
+            except Exception as e:
+                print(f"⚠️ Mètode fallit: {e}")
+                continue
+                
+        raise Exception("No es pot accedir a Google Sheets amb cap mètode")
+    
+    def _provar_metode(self, id_full, endpoint, metode):
+        """Descarregar i llegir el CSV d'un endpoint; llança una excepció si no és vàlid"""
+        print(f"🔗 Provant: {metode}")
+        flux, codificacio = self._obrir_flux(metode, f"{id_full}:{endpoint}")
+        if flux is None:
+            raise ValueError(f"Resposta no vàlida de {endpoint}")
+        with flux:
+            df = self._recuperar_netes(flux.empremta)
+            if df is not None:
+                return df
+            if flux.es_buit():
+                raise ValueError(f"Resposta buida de {endpoint}")
+            df = pd.read_csv(io.BufferedReader(flux, buffer_size=LectorFluxBytes.MIDA_FRAGMENT),
+                             encoding=codificacio or 'utf-8')
+        if len(df) == 0:
+            raise ValueError(f"CSV sense files a {endpoint}")
+        return self._marcar_empremta(df, flux.empremta)
+    
+    def _empremta_fitxer(self, ruta):
+        """Hash SHA-256 del contingut d'un fitxer, llegit per fragments"""
+        hash_fitxer = hashlib.sha256()
+        with open(ruta, 'rb') as f:
+            for fragment in iter(lambda: f.read(1024 * 1024), b''):
+                hash_fitxer.update(fragment)
+        return hash_fitxer.hexdigest()
+    
+    def _marcar_empremta(self, df, empremta):
+        """Associar al DataFrame en brut el hash del contingut d'origen"""
+        if empremta:
+            df.attrs['empremta'] = empremta
+        return df
+    
+    def _recuperar_netes(self, empremta):
+        """Recuperar dades ja validades de la memòria cau, marcades perquè no es tornin a validar"""
+        if not (self.cache_dades and empremta):
+            return None
+        resultat = self.cache_dades.carregar(empremta, self.regles_validacio)
+        if resultat is None:
+            return None
+        df, *columnes_instruments = resultat
+        df.attrs['validat'] = tuple(columnes_instruments)
+        df.attrs['empremta'] = empremta
+        print(f"♻️ Dades netes recuperades de la memòria cau ({len(df)} files)")
+        return df
+    
+    def _obtenir_en_competicio(self, id_full):
+        """Llançar els endpoints en paral·lel i quedar-se amb el primer CSV vàlid"""
+        metodes = self._urls_exportacio(id_full)
+        executor = ThreadPoolExecutor(max_workers=len(metodes))
+        try:
+            pendents = {executor.submit(self._provar_metode, id_full, *metodes[0])}
+            restants = list(metodes[1:])
+            while pendents or restants:
+                fets, pendents = wait(pendents, timeout=self.retard_cobertura if restants else None,
+                                      return_when=FIRST_COMPLETED)
+                for futur in fets:
+                    try:
+                        return futur.result()
+                    except Exception as e:
+                        print(f"⚠️ Mètode fallit: {e}")
+                # Temps de cobertura esgotat o mètode fallit: llançar el següent endpoint
+                if restants:
+                    pendents.add(executor.submit(self._provar_metode, id_full, *restants.pop(0)))
+            raise Exception("No es pot accedir a Google Sheets amb cap mètode")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
     def _usar_dades_mostra(self):
         """Usar dades de mostra quan les dades reals no estan disponibles"""
         print("📋 Usant dades de mostra...")
@@ -106,45 +935,19 @@ class ExtractorDades:
         if df is None or len(df) == 0:
             raise ValueError("No hi ha dades disponibles")
         
-        # Identificar columnes de preguntes SUS
-        columnes_galeria = [col for col in df.columns if any(f'G{i:02d}' in str(col) for i in range(1, 11))]
-        columnes_mapa = [col for col in df.columns if any(f'M{i:02d}' in str(col) for i in range(1, 11))]
-        
-        if not columnes_galeria:
-            columnes_galeria = [col for col in df.columns if col.startswith('G') and len(col) <= 4]
-        if not columnes_mapa:
-            columnes_mapa = [col for col in df.columns if col.startswith('M') and len(col) <= 4]
-        
-        # Ordenar columnes
-        try:
-            columnes_galeria = sorted(columnes_galeria, key=lambda x: int(''.join(filter(str.isdigit, x))))
-            columnes_mapa = sorted(columnes_mapa, key=lambda x: int(''.join(filter(str.isdigit, x))))
-        except ValueError:
-            print("⚠️ Avís: No s'han pogut ordenar les columnes correctament")
-        
-        print(f"📊 Columnes Galeria: {columnes_galeria}")
-        print(f"🗺️ Columnes Mapa: {columnes_mapa}")
+        if 'validat' in df.attrs:
+            # Dades recuperades de la memòria cau de dades netes: ja validades
+            columnes_instruments = df.attrs.pop('validat')
+            print(f"✅ Dades validades: {len(df)} respostes vàlides")
+            return (df, *columnes_instruments)
         
-        if len(columnes_galeria) != 10:
-            print(f"⚠️ Avís: S'esperaven 10 columnes de Galeria, trobades {len(columnes_galeria)}")
-        if len(columnes_mapa) != 10:
-            print(f"⚠️ Avís: S'esperaven 10 columnes de Mapa, trobades {len(columnes_mapa)}")
+        empremta = df.attrs.get('empremta')
+        columnes_instruments = self._detectar_columnes_sus(df.columns)
         
         # Convertir respostes a numèric i validar rang
-        for col in columnes_galeria + columnes_mapa:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-                # Validar rang 1-5
-                mascara_valida = (df[col] >= 1) & (df[col] <= 5)
-                comptatge_invalid = (~mascara_valida & df[col].notna()).sum()
-                if comptatge_invalid > 0:
-                    print(f"⚠️ Avís: {comptatge_invalid} valors no vàlids a {col} (fora del rang 1-5)")
-                    df.loc[~mascara_valida, col] = np.nan
-        
-        # Eliminar files amb dades incompletes
         files_inicials = len(df)
-        totes_columnes_sus = columnes_galeria + columnes_mapa
-        df = df.dropna(subset=totes_columnes_sus)
+        df, comptatges_invalids, comptatges_no_enters = self._netejar_respostes(df, sum(columnes_instruments, []))
+        self.avisar_invalids(comptatges_invalids, comptatges_no_enters)
         files_finals = len(df)
         
         if files_finals == 0:
@@ -154,132 +957,865 @@ class ExtractorDades:
             print(f"🗑️ Eliminades {files_inicials - files_finals} files amb dades incompletes")
         
         print(f"✅ Dades validades: {files_finals} respostes vàlides")
-        return df, columnes_galeria, columnes_mapa
-
-class AnalitzadorSUS:
-    """Classe per calcular i analitzar puntuacions SUS"""
+        if self.cache_dades and empremta:
+            self.cache_dades.desar(empremta, self.regles_validacio, df, *columnes_instruments)
+        return (df, *columnes_instruments)
     
-    def __init__(self, df, columnes_galeria, columnes_mapa):
-        self.df = df.copy()
-        self.columnes_galeria = columnes_galeria
-        self.columnes_mapa = columnes_mapa
-        self.elements_inversos = [2, 4, 6, 8, 10]  # Elements inversos (base 1)
+    def _detectar_columnes_sus(self, columnes):
+        """Identificar i ordenar les columnes de preguntes SUS de cada instrument de l'esquema
         
-    def calcular_puntuacio_sus(self, respostes, mostrar_calcul=False):
-        """Calcular puntuació SUS amb explicació detallada"""
-        if len(respostes) != 10:
-            return None, None
+        Retorna una llista de columnes per instrument, en l'ordre de l'esquema.
+        """
+        columnes_instruments = list(self.resolutor.resoldre(columnes)['instruments'].values())
         
-        if pd.isna(respostes).any():
-            return None, None
+        for instrument, columnes_instrument in zip(self.esquema, columnes_instruments):
+            print(f"{instrument['icona']} Columnes {instrument['nom']}: {columnes_instrument}")
         
-        passos_calcul = []
-        puntuacio_total = 0
+        for instrument, columnes_instrument in zip(self.esquema, columnes_instruments):
+            if len(columnes_instrument) != 10:
+                print(f"⚠️ Avís: S'esperaven 10 columnes de {instrument['nom']}, trobades {len(columnes_instrument)}")
         
-        for i, resposta in enumerate(respostes, 1):
-            # Assegurar que la resposta està en rang vàlid
-            if not (1 <= resposta <= 5):
-                return None, None
-                
-            if i in self.elements_inversos:
-                # Elements inversos
-                puntuacio_element = 5 - resposta
-                passos_calcul.append({
-                    'element': i,
-                    'tipus': 'Invers',
-                    'resposta': resposta,
-                    'calcul': f'5 - {resposta} = {puntuacio_element}',
-                    'puntuacio': puntuacio_element
-                })
-            else:
-                # Elements normals
-                puntuacio_element = resposta - 1
-                passos_calcul.append({
-                    'element': i,
-                    'tipus': 'Normal',
-                    'resposta': resposta,
-                    'calcul': f'{resposta} - 1 = {puntuacio_element}',
-                    'puntuacio': puntuacio_element
-                })
-            
-            puntuacio_total += puntuacio_element
+        return columnes_instruments
+    
+    @staticmethod
+    def avisar_invalids(comptatges_invalids, comptatges_no_enters, columnes=None):
+        """Informe de validació: valors fora de rang i valors no enters descartats, per columna
         
-        puntuacio_final = puntuacio_total * 2.5
+        Amb `columnes`, els avisos segueixen aquest ordre (els comptatges acumulats per
+        fragments s'afegeixen en l'ordre en què apareixen).
+        """
+        ordre = {col: posicio for posicio, col in enumerate(columnes or [])}
+        for comptatges, motiu in ((comptatges_invalids, 'fora del rang 1-5'), (comptatges_no_enters, 'no són enters')):
+            for col in sorted(comptatges, key=lambda col: ordre.get(col, len(ordre))):
+                print(f"⚠️ Avís: {comptatges[col]} valors no vàlids a {col} ({motiu})")
+    
+    def _netejar_respostes(self, df, columnes_sus):
+        """Convertir respostes a numèric, anul·lar valors no vàlids i eliminar files incompletes
         
-        if mostrar_calcul:
-            print(f"\n📋 CÀLCUL DETALLAT SUS:")
-            print("-" * 50)
-            for pas in passos_calcul:
-                print(f"Element {pas['element']:2d} ({pas['tipus']:7s}): Resposta={pas['resposta']}, Càlcul={pas['calcul']}, Punts={pas['puntuacio']}")
-            print("-" * 50)
-            print(f"Suma total: {puntuacio_total}")
-            print(f"Puntuació SUS: {puntuacio_total} × 2.5 = {puntuacio_final}")
-            print("-" * 50)
+        Retorna el DataFrame net, el nombre de valors fora del rang 1-5 per columna i el
+        nombre de valors dins el rang però no enters (p. ex. 2.5), que també es descarten.
+        """
+        columnes_sus = [col for col in columnes_sus if col in df.columns]
         
-        return puntuacio_final, passos_calcul
-    
-    def interpretar_puntuacio(self, puntuacio):
-        """Interpretar puntuació SUS segons estàndards acadèmics"""
-        if puntuacio >= 90:
-            return "A+", "Excel·lent++", "success", "🏆"
-        elif puntuacio >= 80:
-            return "A", "Excel·lent", "success", "⭐"
-        elif puntuacio >= 70:
-            return "B", "Bo", "info", "👍"
-        elif puntuacio >= 60:
-            return "C", "Acceptable", "warning", "⚠️"
-        elif puntuacio >= 50:
-            return "D", "Deficient", "warning", "👎"
-        else:
-            return "F", "Inacceptable", "danger", "❌"
-    
-    def generar_recomanacions(self, puntuacio_galeria, puntuacio_mapa, demografics):
-        """Generar recomanacions personalitzades basades en resultats"""
-        recomanacions = []
+        # Convertir a numèric només les columnes de text i obtenir tot el bloc com una matriu (N, K)
+        for col in columnes_sus:
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+        valors = df[columnes_sus].to_numpy(dtype=np.float64, na_value=np.nan)
         
-        # Anàlisi general
-        if puntuacio_galeria >= 80 and puntuacio_mapa >= 80:
-            recomanacions.append({
-                'tipus': 'success',
-                'icona': '🎉',
-                'titol': 'Excel·lent Usabilitat Global',
-                'missatge': 'Ambdues eines han assolit nivells excel·lents d\'usabilitat.'
-            })
-        elif puntuacio_galeria >= 70 and puntuacio_mapa >= 70:
-            recomanacions.append({
-                'tipus': 'info',
-                'icona': '✅',
-                'titol': 'Bona Usabilitat General',
-                'missatge': 'Ambdues eines tenen una usabilitat acceptable a bona.'
-            })
+        # Una sola màscara de validesa (enters 1-5; els NaN no compleixen cap comparació)
+        valides = MotorPuntuacioSUS.respostes_valides(valors)
+        # No vàlids = no són enters 1-5 i no són NaN; els del rang 1-5 són els no enters
+        en_rang = (valors >= 1) & (valors <= 5)
+        invalids = len(valors) - en_rang.sum(axis=0) - np.isnan(valors).sum(axis=0)
+        no_enters = en_rang.sum(axis=0) - valides.sum(axis=0)
+        comptatges_invalids = {col: int(n) for col, n in zip(columnes_sus, invalids) if n > 0}
+        comptatges_no_enters = {col: int(n) for col, n in zip(columnes_sus, no_enters) if n > 0}
         
-        # Anàlisi específic d'eines
-        if puntuacio_galeria < 70:
-            recomanacions.append({
-                'tipus': 'warning',
-                'icona': '🖼️',
-                'titol': 'La Galeria Necessita Millores',
-                'missatge': f'La galeria ({puntuacio_galeria:.1f}) requereix millores d\'usabilitat.'
-            })
+        # Eliminar files amb dades incompletes amb un únic índex booleà
+        files_completes = valides.all(axis=1)
+        if not files_completes.all():
+            df = df.loc[files_completes]
         
-        if puntuacio_mapa < 70:
-            recomanacions.append({
-                'tipus': 'warning',
-                'icona': '🗺️',
-                'titol': 'El Mapa Necessita Millores',
-                'missatge': f'El mapa ({puntuacio_mapa:.1f}) requereix millores de navegació i interacció.'
-            })
+        # Les columnes amb valors anul·lats passen a float, com amb df.loc[...] = np.nan
+        if comptatges_invalids or comptatges_no_enters:
+            df = df.astype({col: np.float64 for col in {**comptatges_invalids, **comptatges_no_enters}})
+        return df, comptatges_invalids, comptatges_no_enters
+    
+    def llegir_fragments(self, font=None, mida_fragment=50_000):
+        """Llegir un CSV local o remot (Google Sheets o URL directa) en fragments de mida fixa
         
-        # Diferència significativa
-        diferencia = abs(puntuacio_galeria - puntuacio_mapa)
-        if diferencia > 15:
-            millor = "Galeria" if puntuacio_galeria > puntuacio_mapa else "Mapa"
-            recomanacions.append({
-                'tipus': 'info',
-                'icona': '⚖️',
-                'titol': 'Diferència Significativa',
-                'missatge': f'{millor} supera l\'altra eina per {diferencia:.1f} punts. Considera estandarditzar l\'experiència.'
-            })
+        Sense font es retornen les dades de mostra com a únic fragment.
+        """
+        font = font or self.url_full
+        if not font:
+            print("⚠️ No s'ha proporcionat cap font de dades")
+            print("📋 Usant dades de mostra...")
+            yield pd.DataFrame(self.dades_mostra)
+            return
+        
+        if os.path.exists(font):
+            print(f"📂 Llegint fitxer local per fragments de {mida_fragment} files: {font}")
+            with pd.read_csv(font, chunksize=mida_fragment) as lector:
+                yield from lector
+            return
+        
+        id_full = self.extreure_id_full(font)
+        for _, metode in (self._urls_exportacio(id_full) if id_full else [(None, font)]):
+            enviat = False
+            try:
+                print(f"🔗 Provant (streaming): {metode}")
+                with self.sessio.get(metode, timeout=self.timeout, stream=True) as resposta:
+                    resposta.raise_for_status()
+                    resposta.raw.decode_content = True
+                    with pd.read_csv(resposta.raw, chunksize=mida_fragment) as lector:
+                        primer = next(lector, None)
+                        if primer is None or len(primer) == 0:
+                            raise ValueError("Resposta buida")
+                        enviat = True
+                        yield primer
+                        yield from lector
+                return
+            except Exception as e:
+                # Amb algun fragment ja lliurat, un altre mètode tornaria a enviar les mateixes files
+                if enviat:
+                    raise
+                print(f"⚠️ Mètode fallit: {e}")
+                continue
+        
+        raise Exception("No es pot accedir a la font de dades amb cap mètode")
+
+class ExtractorMultiFont(ExtractorDades):
+    """Extreure, validar i combinar diverses fonts (fulls o fitxers) de manera concurrent
+    
+    Les fonts es descarreguen i es llegeixen en paral·lel amb un nombre limitat de fils,
+    es validen una a una amb les mateixes regles i es concatenen amb una columna 'Font'.
+    """
+    
+    def __init__(self, fonts, max_fils=4, **opcions):
+        self.fonts = list(fonts)
+        self.max_fils = max(1, min(max_fils, len(self.fonts) or 1))
+        super().__init__(self.fonts[0] if self.fonts else None, **opcions)
+    
+    def _nom_font(self, font):
+        """Etiqueta curta d'una font per a la columna 'Font'"""
+        if os.path.exists(font):
+            return os.path.splitext(os.path.basename(font))[0]
+        return self.extreure_id_full(font) or font
+    
+    def obtenir_dades(self):
+        """Extreure totes les fonts en paral·lel i retornar-les validades i concatenades"""
+        print(f"🔄 Extraient {len(self.fonts)} fonts amb {self.max_fils} fils...")
+        
+        if not self.fonts:
+            print("⚠️ No s'ha proporcionat cap font")
+            return self._usar_dades_mostra()
+        
+        with ThreadPoolExecutor(max_workers=self.max_fils) as executor:
+            futurs = [executor.submit(self.llegir_font, font) for font in self.fonts]
+        
+        # Validar en ordre al fil principal perquè els missatges no s'entrellacin
+        parts = []
+        columnes_instruments = None
+        for font, futur in zip(self.fonts, futurs):
+            nom = self._nom_font(font)
+            try:
+                df, *columnes = self._validar_i_netejar(futur.result())
+            except Exception as e:
+                print(f"⚠️ Font descartada ({nom}): {e}")
+                continue
+            
+            if columnes_instruments is None:
+                columnes_instruments = columnes
+            elif [len(c) for c in columnes] == [len(c) for c in columnes_instruments]:
+                # Unificar noms de columnes SUS amb els de la primera font
+                df = df.rename(columns=dict(zip(sum(columnes, []), sum(columnes_instruments, []))))
+            else:
+                print(f"⚠️ Font descartada ({nom}): columnes SUS incompatibles")
+                continue
+            
+            df.insert(0, 'Font', nom)
+            parts.append(df)
+            print(f"✅ {nom}: {len(df)} respostes vàlides")
+        
+        if not parts:
+            raise Exception("No s'ha pogut extreure cap font")
+        
+        df = pd.concat(parts, ignore_index=True)
+        print(f"✅ Total combinat: {len(df)} respostes de {len(parts)} fonts")
+        return (df, *columnes_instruments)
+
+class MotorPuntuacioSUS:
+    """Motor de puntuació SUS vectoritzat per blocs de respostes (N, 10) o (N, K, 10)"""
+    
+    def __init__(self, elements_inversos=(2, 4, 6, 8, 10)):
+        self.elements_inversos = list(elements_inversos)
+        # Màscara booleana dels elements inversos (base 0) per operar sobre tota la matriu
+        self.mascara_inversos = np.isin(np.arange(1, 11), self.elements_inversos)
+        # Inversos: 5 - resposta; normals: resposta - 1. La suma és respostes · pesos + constant
+        self.pesos = np.where(self.mascara_inversos, -1.0, 1.0)
+        self.constant = 5.0 * self.mascara_inversos.sum() - (~self.mascara_inversos).sum()
+    
+    @staticmethod
+    def respostes_valides(respostes):
+        """Màscara de respostes Likert vàlides: valors enters dins el rang 1-5 (els NaN no ho són)
+        
+        És l'única regla de validesa: la fan servir la neteja, la puntuació (vectoritzada i
+        fila a fila), la representació compacta (uint8) i l'exportació .npz, de manera que
+        totes descarten les mateixes respostes.
+        """
+        return (respostes >= 1) & (respostes <= 5) & (respostes == np.floor(respostes))
+    
+    @classmethod
+    def totes_valides(cls, respostes, mida_tros=1 << 16):
+        """Si totes les respostes són vàlides, comprovat per blocs de files de ~`mida_tros` valors
+        
+        Els temporals de cada bloc caben a la memòria cau: és més ràpid que la màscara sencera.
+        """
+        files_tros = max(1, mida_tros // max(1, respostes[:1].size))
+        return all(cls.respostes_valides(respostes[inici:inici + files_tros]).all()
+                   for inici in range(0, len(respostes), files_tros))
+    
+    def puntuar(self, respostes):
+        """Calcular les puntuacions SUS de totes les files d'una matriu (N, 10)
+        
+        Un tensor (N, K, 10) puntua K instruments alhora i retorna (N, K).
+        Les files amb algun valor mancant o no vàlid (respostes_valides: enters 1-5)
+        retornen NaN, igual que el càlcul fila a fila retorna None.
+        """
+        respostes = np.asarray(respostes, dtype=np.float64)
+        if respostes.ndim == 1:
+            respostes = respostes.reshape(1, -1)
+        
+        if respostes.ndim < 2 or respostes.shape[-1] != 10:
+            return np.full(respostes.shape[:-1] if respostes.ndim else 0, np.nan)
+        
+        # Una sola contracció amb el vector de pesos; els NaN es propaguen sols a la seva fila.
+        # einsum recorre directament la vista en ordre de columnes que retorna pandas, sense copiar-la
+        puntuacions = (np.einsum('...j,j->...', respostes, self.pesos) + self.constant) * 2.5
+        
+        # Files amb valors no vàlids (fora de rang o no enters): la màscara sencera només es
+        # calcula si la comprovació per blocs en troba algun
+        if not self.totes_valides(respostes):
+            puntuacions[~self.respostes_valides(respostes).all(axis=-1)] = np.nan
+        return puntuacions
+    
+    def sumar(self, respostes, mascara_validesa):
+        """Calcular les sumes SUS en unitats enteres (0-40) d'una matriu uint8 (N, 10) o (N, K, 10)
+        
+        `mascara_validesa` és un uint16 per fila (i instrument) amb un bit per resposta vàlida.
+        Retorna (sumes uint8, files vàlides); la puntuació SUS és suma × 2.5.
+        """
+        respostes = np.asarray(respostes, dtype=np.uint8)
+        # uint8 · int8 acumula en int16, prou per a sumes entre -50 i 50
+        sumes = np.einsum('...j,j->...', respostes, self.pesos.astype(np.int8)) + int(self.constant)
+        files_valides = mascara_validesa == (1 << respostes.shape[-1]) - 1
+        sumes = np.where(files_valides, sumes, 0).astype(np.uint8)
+        return sumes, files_valides
+
+class AcumuladorSUS:
+    """Acumulador exacte d'estadístiques SUS basat en un histograma de 41 valors
+    
+    Una puntuació SUS només pot prendre els valors 0, 2.5, ..., 100, de manera que
+    n'hi ha prou amb comptar quantes vegades apareix cada valor. La memòria és
+    constant (41 comptadors) i no cal ordenar ni guardar les puntuacions.
+    """
+    
+    NOMBRE_VALORS = 41
+    VALORS = np.arange(41) * 2.5
+    
+    def __init__(self, comptatges=None):
+        if comptatges is None:
+            self.comptatges = np.zeros(self.NOMBRE_VALORS, dtype=np.int64)
+        else:
+            self.comptatges = np.asarray(comptatges, dtype=np.int64).copy()
+            if self.comptatges.shape != (self.NOMBRE_VALORS,):
+                raise ValueError(f"S'esperaven {self.NOMBRE_VALORS} comptadors, trobats {self.comptatges.shape}")
+    
+    def actualitzar(self, puntuacions):
+        """Afegir puntuacions SUS (els NaN s'ignoren)"""
+        puntuacions = np.asarray(puntuacions, dtype=np.float64).ravel()
+        puntuacions = puntuacions[~np.isnan(puntuacions)]
+        unitats = np.rint(puntuacions / 2.5)
+        if np.any(unitats * 2.5 != puntuacions) or np.any((unitats < 0) | (unitats > 40)):
+            raise ValueError("Les puntuacions SUS han de ser múltiples de 2.5 entre 0 i 100")
+        self.comptatges += np.bincount(unitats.astype(np.int64), minlength=self.NOMBRE_VALORS)
+        return self
+    
+    def actualitzar_sumes(self, sumes):
+        """Afegir sumes SUS en unitats enteres (0-40), sense passar per coma flotant"""
+        self.comptatges += np.bincount(np.asarray(sumes, dtype=np.int64), minlength=self.NOMBRE_VALORS)
+        return self
+    
+    def combinar(self, altre):
+        """Combinar amb un altre acumulador (p. ex. d'un altre fragment de dades)"""
+        self.comptatges += altre.comptatges
+        return self
+    
+    # Noms alternatius
+    update = actualitzar
+    merge = combinar
+    
+    @property
+    def comptatge(self):
+        return int(self.comptatges.sum())
+    
+    def _sumes_unitats(self):
+        """Suma i suma de quadrats en unitats enteres (puntuació / 2.5)"""
+        unitats = range(self.NOMBRE_VALORS)
+        suma = sum(int(c) * k for k, c in zip(unitats, self.comptatges))
+        suma_quadrats = sum(int(c) * k * k for k, c in zip(unitats, self.comptatges))
+        return suma, suma_quadrats
+    
+    def mitjana(self):
+        n = self.comptatge
+        if n == 0:
+            return np.nan
+        suma, _ = self._sumes_unitats()
+        return suma * 2.5 / n
+    
+    def desviacio_tipica(self):
+        """Desviació típica mostral (ddof=1)"""
+        n = self.comptatge
+        if n < 2:
+            return 0
+        suma, suma_quadrats = self._sumes_unitats()
+        # Variància exacta en unitats enteres: (n·Σk² - (Σk)²) / (n·(n-1))
+        variancia = (n * suma_quadrats - suma * suma) / (n * (n - 1)) * 6.25
+        return float(np.sqrt(variancia))
+    
+    def _valor_ordenat(self, posicio, acumulat):
+        """Valor a la posició (base 0) de la mostra ordenada"""
+        return self.VALORS[np.searchsorted(acumulat, posicio, side='right')]
+    
+    def quantil(self, q):
+        """Quantil amb interpolació lineal (mateix criteri que np.quantile)"""
+        n = self.comptatge
+        if n == 0:
+            return np.nan
+        acumulat = np.cumsum(self.comptatges)
+        posicio = (n - 1) * q
+        inferior = int(np.floor(posicio))
+        fraccio = posicio - inferior
+        valor_inferior = self._valor_ordenat(inferior, acumulat)
+        if fraccio == 0:
+            return float(valor_inferior)
+        valor_superior = self._valor_ordenat(min(inferior + 1, n - 1), acumulat)
+        return float(valor_inferior + fraccio * (valor_superior - valor_inferior))
+    
+    def mediana(self):
+        return self.quantil(0.5)
+    
+    def minim(self):
+        no_buits = np.flatnonzero(self.comptatges)
+        return float(self.VALORS[no_buits[0]]) if len(no_buits) else np.nan
+    
+    def maxim(self):
+        no_buits = np.flatnonzero(self.comptatges)
+        return float(self.VALORS[no_buits[-1]]) if len(no_buits) else np.nan
+
+class BootstrapSUS:
+    """Intervals de confiança bootstrap (percentil i BCa) de la mitjana i la mediana
+    
+    Les puntuacions SUS (i les seves diferències aparellades) només prenen uns pocs
+    valors, de manera que remostrejar N respostes amb reemplaçament equival a extreure
+    els comptatges de cada valor d'una distribució multinomial. Cada lot de rèpliques
+    és una matriu (mida del lot, valors) i el cost no depèn de N. Els lots tenen
+    llavors derivades d'una única llavor, i el resultat és el mateix tant si es
+    calculen al procés principal com repartits en un grup de processos.
+    """
+    
+    def __init__(self, replicats=10_000, nivell=0.95, llavor=0, mida_lot=2_000,
+                 processos=None, llindar_processos=200_000):
+        self.replicats = replicats
+        self.nivell = nivell
+        self.llavor = llavor
+        self.mida_lot = mida_lot
+        # Per sobre de `llindar_processos` rèpliques els lots es reparteixen entre processos
+        self.processos = processos
+        self.llindar_processos = llindar_processos
+    
+    @staticmethod
+    def estadistics(comptatges, valors):
+        """Mitjana i mediana (interpolació lineal, com np.median) de cada fila d'histogrames (B, V)"""
+        comptatges = np.atleast_2d(comptatges)
+        totals = comptatges.sum(axis=1)
+        mitjanes = comptatges @ valors / totals
+        
+        acumulats = np.cumsum(comptatges, axis=1)
+        def valor_ordenat(posicio):
+            # L'element `posicio` (base 0) de les dades ordenades és al primer valor amb acumulat > posicio
+            index = (acumulats <= posicio[:, None]).sum(axis=1)
+            return valors[np.minimum(index, len(valors) - 1)]
+        
+        posicio = (totals - 1) / 2
+        inferior = np.floor(posicio)
+        medianes = valor_ordenat(inferior)
+        fraccio = posicio - inferior
+        if np.any(fraccio > 0):
+            medianes = medianes + fraccio * (valor_ordenat(np.minimum(inferior + 1, totals - 1)) - medianes)
+        return mitjanes, medianes
+    
+    @staticmethod
+    def _lot(llavor, comptatges, valors, mida):
+        """Rèpliques d'un lot: (mida, 2) amb la mitjana i la mediana de cada remostreig"""
+        rng = np.random.default_rng(llavor)
+        total = int(comptatges.sum())
+        remostrejos = rng.multinomial(total, comptatges / total, size=mida)
+        return np.column_stack(BootstrapSUS.estadistics(remostrejos, valors))
+    
+    def replicats_bootstrap(self, comptatges, valors):
+        """Matriu (replicats, 2) de mitjanes i medianes remostrejades"""
+        mides = [self.mida_lot] * (self.replicats // self.mida_lot)
+        if self.replicats % self.mida_lot:
+            mides.append(self.replicats % self.mida_lot)
+        llavors = np.random.SeedSequence(self.llavor).spawn(len(mides))
+        arguments = (llavors, [comptatges] * len(mides), [valors] * len(mides), mides)
+        
+        if self.replicats >= self.llindar_processos and self.processos != 1 and len(mides) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=self.processos) as executor:
+                lots = list(executor.map(self._lot, *arguments))
+        else:
+            lots = list(map(self._lot, *arguments))
+        return np.concatenate(lots)
+    
+    def _acceleracio(self, comptatges, valors):
+        """Acceleració BCa per jackknife: cada valor diferent és una observació eliminada"""
+        presents = np.flatnonzero(comptatges)
+        sense_un = comptatges[None, :] - np.eye(len(comptatges), dtype=comptatges.dtype)[presents]
+        pesos = comptatges[presents]
+        acceleracions = []
+        for jackknife in self.estadistics(sense_un, valors):
+            desviacions = np.average(jackknife, weights=pesos) - jackknife
+            denominador = 6 * (pesos @ desviacions ** 2) ** 1.5
+            acceleracions.append(pesos @ desviacions ** 3 / denominador if denominador > 0 else 0.0)
+        return acceleracions
+    
+    def interval(self, comptatges, valors):
+        """Intervals percentil i BCa de la mitjana i la mediana d'un histograma"""
+        from statistics import NormalDist
+        normal = NormalDist()
+        comptatges = np.asarray(comptatges, dtype=np.int64)
+        valors = np.asarray(valors, dtype=np.float64)
+        if comptatges.sum() < 2:
+            return None
+        
+        estimacions = [float(valor[0]) for valor in self.estadistics(comptatges, valors)]
+        replicats = self.replicats_bootstrap(comptatges, valors)
+        acceleracions = self._acceleracio(comptatges, valors)
+        alfa = (1 - self.nivell) / 2
+        
+        interval = {'nivell': self.nivell, 'replicats': self.replicats}
+        for columna, (nom, estimacio, acceleracio) in enumerate(zip(['mitjana', 'mediana'], estimacions, acceleracions)):
+            mostra = replicats[:, columna]
+            percentil = np.quantile(mostra, [alfa, 1 - alfa])
+            
+            # Correcció de biaix (els empats compten la meitat, habitual amb estadístics discrets)
+            proporcio = (np.sum(mostra < estimacio) + 0.5 * np.sum(mostra == estimacio)) / len(mostra)
+            proporcio = min(max(proporcio, 0.5 / len(mostra)), 1 - 0.5 / len(mostra))
+            z0 = normal.inv_cdf(proporcio)
+            quantils = []
+            for z in (normal.inv_cdf(alfa), normal.inv_cdf(1 - alfa)):
+                quantils.append(normal.cdf(z0 + (z0 + z) / (1 - acceleracio * (z0 + z))))
+            bca = np.quantile(mostra, quantils)
+            
+            interval[nom] = {
+                'estimacio': estimacio,
+                'percentil': [float(percentil[0]), float(percentil[1])],
+                'bca': [float(bca[0]), float(bca[1])]
+            }
+        return interval
+
+class ProvesAparellades:
+    """Proves de significació per a diferències aparellades (cada persona valora les dues eines)
+    
+    Inclou la prova t aparellada, la prova de rangs amb signe de Wilcoxon, una prova de
+    permutació per canvi de signe (exacta per a mostres petites, Monte Carlo si no) i la
+    mida de l'efecte d de Cohen per a dades aparellades (dz). Les matrius de signes
+    aleatoris es generen per blocs amb un nombre màxim d'elements, de manera que la
+    memòria no depèn del nombre de permutacions.
+    """
+    
+    def __init__(self, alfa=0.05, permutacions=10_000, llavor=0, maxim_exacte=20, maxim_elements=2**22):
+        self.alfa = alfa
+        self.permutacions = permutacions
+        self.llavor = llavor
+        # Fins a `maxim_exacte` diferències no nul·les s'enumeren tots els 2^n canvis de signe
+        self.maxim_exacte = maxim_exacte
+        self.maxim_elements = maxim_elements
+    
+    @staticmethod
+    def _beta_incompleta(a, b, x):
+        """Funció beta incompleta regularitzada I_x(a, b) (fracció contínua de Lentz)"""
+        if x <= 0 or x >= 1:
+            return 0.0 if x <= 0 else 1.0
+        if x > (a + 1) / (a + b + 2):
+            return 1.0 - ProvesAparellades._beta_incompleta(b, a, 1 - x)
+        
+        logaritme = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x)
+        minim = 1e-300
+        c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+        d = 1.0 / (d if abs(d) > minim else minim)
+        fraccio = d
+        for m in range(1, 500):
+            for numerador in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                              -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+                d = 1.0 + numerador * d
+                d = 1.0 / (d if abs(d) > minim else minim)
+                c = 1.0 + numerador / c
+                c = c if abs(c) > minim else minim
+                fraccio *= c * d
+            if abs(c * d - 1.0) < 1e-14:
+                break
+        return math.exp(logaritme) * fraccio / a
+    
+    def prova_t(self, diferencies):
+        """Prova t aparellada bilateral"""
+        n = len(diferencies)
+        mitjana = float(np.mean(diferencies))
+        desviacio = float(np.std(diferencies, ddof=1)) if n > 1 else 0.0
+        if n < 2 or desviacio == 0:
+            return {'estadistic': None, 'graus_llibertat': n - 1, 'p': 1.0 if mitjana == 0 else 0.0}
+        
+        t = float(mitjana / (desviacio / np.sqrt(n)))
+        graus = n - 1
+        p = self._beta_incompleta(graus / 2, 0.5, graus / (graus + t * t))
+        return {'estadistic': t, 'graus_llibertat': graus, 'p': min(1.0, float(p))}
+    
+    def prova_wilcoxon(self, diferencies):
+        """Prova de rangs amb signe de Wilcoxon bilateral (s'ignoren les diferències nul·les)
+        
+        Distribució exacta fins a 50 diferències sense empats; aproximació normal amb
+        correcció d'empats en cas contrari.
+        """
+        from statistics import NormalDist
+        diferencies = diferencies[diferencies != 0]
+        n = len(diferencies)
+        if n == 0:
+            return {'estadistic': 0.0, 'p': 1.0, 'metode': 'exacte'}
+        
+        # Rangs mitjans de |d| (els empats comparteixen rang)
+        absoluts, inversa, empats = np.unique(np.abs(diferencies), return_inverse=True, return_counts=True)
+        rangs = (np.cumsum(empats) - (empats - 1) / 2)[inversa]
+        w_positiu = float(rangs[diferencies > 0].sum())
+        estadistic = min(w_positiu, n * (n + 1) / 2 - w_positiu)
+        
+        if n <= 50 and np.all(empats == 1):
+            # Nombre de subconjunts de {1..n} per a cada suma de rangs
+            maneres = np.zeros(n * (n + 1) // 2 + 1)
+            maneres[0] = 1
+            for rang in range(1, n + 1):
+                maneres[rang:] = maneres[rang:] + maneres[:-rang].copy()
+            p = 2 * maneres[:int(estadistic) + 1].sum() / 2.0 ** n
+            return {'estadistic': estadistic, 'p': min(1.0, float(p)), 'metode': 'exacte'}
+        
+        mitjana = n * (n + 1) / 4
+        variancia = n * (n + 1) * (2 * n + 1) / 24 - np.sum(empats ** 3 - empats) / 48
+        z = (estadistic - mitjana) / np.sqrt(variancia) if variancia > 0 else 0.0
+        p = 2 * NormalDist().cdf(-abs(z))
+        return {'estadistic': estadistic, 'z': float(z), 'p': min(1.0, p), 'metode': 'normal'}
+    
+    def _blocs_signes(self, n):
+        """Matrius de signes (0 = negatiu, 1 = positiu) per blocs d'almenys una fila i com a màxim `maxim_elements`"""
+        files_bloc = max(1, self.maxim_elements // max(n, 1))
+        if n <= self.maxim_exacte:
+            # Totes les 2^n combinacions: els bits de cada enter són els signes
+            bits = np.arange(n, dtype=np.int64)
+            for inici in range(0, 2 ** n, files_bloc):
+                enters = np.arange(inici, min(inici + files_bloc, 2 ** n), dtype=np.int64)
+                yield (enters[:, None] >> bits) & 1
+            return
+        
+        rng = np.random.default_rng(self.llavor)
+        for inici in range(0, self.permutacions, files_bloc):
+            files = min(files_bloc, self.permutacions - inici)
+            # 8 signes per byte aleatori
+            octets = rng.integers(0, 256, size=(files, (n + 7) // 8), dtype=np.uint8)
+            yield np.unpackbits(octets, axis=1, count=n)
+    
+    def prova_permutacio(self, diferencies):
+        """Prova de permutació bilateral per canvi de signe sobre la suma de diferències"""
+        diferencies = np.asarray(diferencies[diferencies != 0], dtype=np.float64)
+        n = len(diferencies)
+        if n == 0:
+            return {'p': 1.0, 'metode': 'exacte', 'permutacions': 1}
+        
+        # Suma amb signes s = 2b - 1:  Σ s·d = 2 Σ b·d - Σ d
+        total = diferencies.sum()
+        observat = abs(total) - 1e-9 * max(1.0, abs(total))  # tolerància d'arrodoniment
+        extrems = permutacions = 0
+        for signes in self._blocs_signes(n):
+            sumes = 2 * (signes.astype(np.float64) @ diferencies) - total
+            extrems += int(np.count_nonzero(np.abs(sumes) >= observat))
+            permutacions += len(signes)
+        
+        if n <= self.maxim_exacte:
+            return {'p': extrems / permutacions, 'metode': 'exacte', 'permutacions': permutacions}
+        # Monte Carlo: s'inclou l'estadístic observat perquè p no sigui mai 0
+        return {'p': (extrems + 1) / (permutacions + 1), 'metode': 'monte_carlo', 'permutacions': permutacions}
+    
+    @staticmethod
+    def magnitud_efecte(dz):
+        """Etiqueta convencional de la mida de l'efecte (llindars de Cohen)"""
+        dz = abs(dz)
+        if dz < 0.2:
+            return 'negligible'
+        elif dz < 0.5:
+            return 'petit'
+        elif dz < 0.8:
+            return 'mitjà'
+        return 'gran'
+    
+    def comparar(self, diferencies):
+        """Totes les proves sobre un vector de diferències aparellades (A - B)"""
+        diferencies = np.asarray(diferencies, dtype=np.float64)
+        n = len(diferencies)
+        mitjana = float(diferencies.mean()) if n else 0.0
+        desviacio = float(diferencies.std(ddof=1)) if n > 1 else 0.0
+        dz = mitjana / desviacio if desviacio > 0 else 0.0
+        permutacio = self.prova_permutacio(diferencies)
+        return {
+            'comptatge': n,
+            'nuls': int(np.count_nonzero(diferencies == 0)),
+            'mitjana_diferencia': mitjana,
+            'desviacio_diferencia': desviacio,
+            't_aparellada': self.prova_t(diferencies),
+            'wilcoxon': self.prova_wilcoxon(diferencies),
+            'permutacio': permutacio,
+            'cohen_dz': dz,
+            'magnitud': self.magnitud_efecte(dz),
+            'alfa': self.alfa,
+            # La decisió es pren amb la prova de permutació, que no suposa normalitat
+            'p': permutacio['p']
+        }
+    
+    def comparar_parells(self, diferencies_per_parell):
+        """Comparar diversos parells; amb més d'un parell les p s'ajusten per Holm-Bonferroni"""
+        comparacions = []
+        for (a, b), diferencies in diferencies_per_parell.items():
+            comparacio = self.comparar(diferencies)
+            comparacio.update({'nom': f'{a} − {b}', 'instruments': [a, b]})
+            comparacions.append(comparacio)
+        
+        ordre = sorted(range(len(comparacions)), key=lambda i: comparacions[i]['p'])
+        maxim_ajustat = 0.0
+        for posicio, i in enumerate(ordre):
+            maxim_ajustat = max(maxim_ajustat, min(1.0, (len(ordre) - posicio) * comparacions[i]['p']))
+            comparacions[i]['p_ajustada'] = maxim_ajustat
+            comparacions[i]['significativa'] = maxim_ajustat < self.alfa
+        return comparacions
+
+class AnalitzadorSUS:
+    """Classe per calcular i analitzar puntuacions SUS"""
+    
+    def __init__(self, df, *columnes_instruments, compacte=False, esquema=None, bootstrap=None, proves=None,
+                 resolutor=None):
+        # Una llista de columnes per instrument, en l'ordre de l'esquema (per defecte Galeria i Mapa)
+        self.esquema = esquema or EsquemaQuestionari.per_defecte()
+        # Rols de columna (marca temporal, demografia) memoritzats per capçalera
+        self.resolutor = resolutor or ResolutorColumnes(self.esquema)
+        if columnes_instruments and len(columnes_instruments) != len(self.esquema):
+            raise ValueError(f"S'esperaven columnes per a {len(self.esquema)} instruments, "
+                             f"rebudes {len(columnes_instruments)}")
+        self.columnes_instruments = {instrument['nom']: list(columnes) for instrument, columnes
+                                     in zip(self.esquema, columnes_instruments or [[]] * len(self.esquema))}
+        self.elements_inversos = [2, 4, 6, 8, 10]  # Elements inversos (base 1)
+        self.motor = MotorPuntuacioSUS(self.elements_inversos)
+        self.acumuladors = {}  # Histogrames de puntuacions per instrument
+        # BootstrapSUS opcional per als intervals de confiança de cada instrument i de les diferències
+        self.bootstrap = bootstrap
+        # Proves de significació aparellades entre instruments
+        self.proves = proves or ProvesAparellades()
+        # Mapa de rols de les columnes analitzades i rols demogràfics {'tecnologia', 'uab', 'edat'} -> columna
+        self.rols_columnes = None
+        self.columnes_demografiques = None
+        # En mode compacte les respostes es guarden com a uint8 i les puntuacions com a sumes 0-40
+        self.compacte = compacte
+        self.df = self.compactar(df) if compacte else df.copy()
+    
+    def _instruments(self):
+        """Parells (nom, columnes) dels instruments avaluats"""
+        return list(self.columnes_instruments.items())
+    
+    def _tensor_respostes(self, df, dtype=np.float64):
+        """Respostes de tots els instruments complets (10 preguntes) com un únic tensor (N, K, 10)
+        
+        Retorna el tensor i els índexs dels instruments que hi són inclosos.
+        """
+        complets = [k for k, (_, columnes) in enumerate(self._instruments()) if len(columnes) == 10]
+        columnes = [col for k in complets for col in self._instruments()[k][1]]
+        if dtype == np.float64:
+            matriu = df[columnes].to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            matriu = df[columnes].to_numpy(dtype=dtype)
+        return matriu.reshape(len(df), len(complets), 10), complets
+    
+    def compactar(self, df):
+        """Representació compacta de les dades
+        
+        Respostes SUS com a uint8 (0 = no vàlida) amb una màscara de validesa uint16
+        per fila i instrument, text demogràfic com a 'category', enters reduïts al
+        tipus més petit i la marca temporal com a datetime64.
+        """
+        columnes_sus = {col for _, columnes in self._instruments() for col in columnes}
+        rols = self.resolutor.resoldre(df.columns)
+        compactes = {}
+        for col in df.columns:
+            if col in columnes_sus:
+                continue
+            serie = df[col]
+            if col == rols['marca_temporal']:
+                dates = pd.to_datetime(serie, format='%d/%m/%Y %H:%M:%S', errors='coerce')
+                compactes[col] = dates if dates.notna().sum() == serie.notna().sum() else serie
+            elif pd.api.types.is_integer_dtype(serie):
+                compactes[col] = pd.to_numeric(serie, downcast='integer')
+            elif not pd.api.types.is_numeric_dtype(serie) and serie.nunique() <= max(1, len(serie) // 2):
+                compactes[col] = serie.astype('category')
+            else:
+                compactes[col] = serie
+        
+        for nom, columnes in self._instruments():
+            respostes = df[columnes].to_numpy(dtype=np.float64, na_value=np.nan)
+            valides = MotorPuntuacioSUS.respostes_valides(respostes)
+            respostes_u8 = np.where(valides, respostes, 0).astype(np.uint8)
+            for j, col in enumerate(columnes):
+                compactes[col] = respostes_u8[:, j]
+            pesos = (1 << np.arange(len(columnes))).astype(np.uint16)
+            compactes[f'Valides_{nom}'] = (valides * pesos).sum(axis=1).astype(np.uint16)
+        
+        return pd.DataFrame(compactes, index=df.index)[
+            [col for col in df.columns] + [f'Valides_{nom}' for nom, _ in self._instruments()]
+        ]
+    
+    @staticmethod
+    def expandir_puntuacions(df, dates_com_text=True):
+        """Convertir les sumes SUS compactes a puntuacions 0-100 per mostrar o exportar
+        
+        Les marques temporals tornen al text del formulari, tret que `dates_com_text` sigui
+        fals (formats columnars, que les desen com a dates).
+        """
+        columnes_suma = [col for col in df.columns if str(col).endswith('_suma')]
+        if not columnes_suma:
+            return df
+        expandit = df.drop(columns=columnes_suma + [col for col in df.columns if str(col).startswith('Valides_')])
+        for col in columnes_suma:
+            nom = col[:-len('_suma')]
+            valides = df[f"Valides_{nom[len('SUS_'):]}"] == (1 << 10) - 1
+            expandit[nom] = np.where(valides, df[col].to_numpy() * 2.5, np.nan)
+        for col in expandit.columns if dates_com_text else []:
+            if pd.api.types.is_datetime64_any_dtype(expandit[col]):
+                expandit[col] = expandit[col].dt.strftime('%d/%m/%Y %H:%M:%S')
+        return expandit
+        
+    def _matriu_respostes(self, columnes):
+        """Obtenir un bloc de respostes com a matriu NumPy (N, 10)"""
+        return self.df[columnes].to_numpy(dtype=np.float64, na_value=np.nan)
+        
+    def calcular_puntuacions_lot(self, respostes):
+        """Calcular puntuacions SUS per a una matriu de respostes (N, 10)"""
+        return self.motor.puntuar(respostes)
+        
+    def calcular_puntuacio_sus(self, respostes, mostrar_calcul=False):
+        """Calcular puntuació SUS amb explicació detallada"""
+        if len(respostes) != 10:
+            return None, None
+        
+        if pd.isna(respostes).any():
+            return None, None
+        
+        passos_calcul = []
+        puntuacio_total = 0
+        
+        for i, resposta in enumerate(respostes, 1):
+            # Assegurar que la resposta és vàlida (enter dins el rang 1-5), amb la regla del càlcul vectoritzat
+            if not MotorPuntuacioSUS.respostes_valides(resposta):
+                return None, None
+                
+            if i in self.elements_inversos:
+                # Elements inversos
+                puntuacio_element = 5 - resposta
+                passos_calcul.append({
+                    'element': i,
+                    'tipus': 'Invers',
+                    'resposta': resposta,
+                    'calcul': f'5 - {resposta} = {puntuacio_element}',
+                    'puntuacio': puntuacio_element
+                })
+            else:
+                # Elements normals
+                puntuacio_element = resposta - 1
+                passos_calcul.append({
+                    'element': i,
+                    'tipus': 'Normal',
+                    'resposta': resposta,
+                    'calcul': f'{resposta} - 1 = {puntuacio_element}',
+                    'puntuacio': puntuacio_element
+                })
+            
+            puntuacio_total += puntuacio_element
+        
+        puntuacio_final = puntuacio_total * 2.5
+        
+        if mostrar_calcul:
+            print(f"\n📋 CÀLCUL DETALLAT SUS:")
+            print("-" * 50)
+            for pas in passos_calcul:
+                print(f"Element {pas['element']:2d} ({pas['tipus']:7s}): Resposta={pas['resposta']}, Càlcul={pas['calcul']}, Punts={pas['puntuacio']}")
+            print("-" * 50)
+            print(f"Suma total: {puntuacio_total}")
+            print(f"Puntuació SUS: {puntuacio_total} × 2.5 = {puntuacio_final}")
+            print("-" * 50)
+        
+        return puntuacio_final, passos_calcul
+    
+    def interpretar_puntuacio(self, puntuacio):
+        """Interpretar puntuació SUS segons estàndards acadèmics"""
+        if puntuacio >= 90:
+            return "A+", "Excel·lent++", "success", "🏆"
+        elif puntuacio >= 80:
+            return "A", "Excel·lent", "success", "⭐"
+        elif puntuacio >= 70:
+            return "B", "Bo", "info", "👍"
+        elif puntuacio >= 60:
+            return "C", "Acceptable", "warning", "⚠️"
+        elif puntuacio >= 50:
+            return "D", "Deficient", "warning", "👎"
+        else:
+            return "F", "Inacceptable", "danger", "❌"
+    
+    def generar_recomanacions(self, mitjanes, demografics, comparacions=None):
+        """Generar recomanacions personalitzades basades en resultats
+        
+        `mitjanes` és un diccionari {nom d'instrument: puntuació SUS mitjana} i
+        `comparacions` el resultat de les proves aparellades entre parells d'instruments.
+        """
+        recomanacions = []
+        instruments = {instrument['nom']: instrument for instrument in self.esquema}
+        totes = 'Ambdues eines' if len(mitjanes) == 2 else 'Totes les eines'
+        
+        # Anàlisi general
+        if all(mitjana >= 80 for mitjana in mitjanes.values()):
+            recomanacions.append({
+                'tipus': 'success',
+                'icona': '🎉',
+                'titol': 'Excel·lent Usabilitat Global',
+                'missatge': f'{totes} han assolit nivells excel·lents d\'usabilitat.'
+            })
+        elif all(mitjana >= 70 for mitjana in mitjanes.values()):
+            recomanacions.append({
+                'tipus': 'info',
+                'icona': '✅',
+                'titol': 'Bona Usabilitat General',
+                'missatge': f'{totes} tenen una usabilitat acceptable a bona.'
+            })
+        
+        # Anàlisi específic d'eines
+        for nom, mitjana in mitjanes.items():
+            if mitjana < 70:
+                instrument = instruments[nom]
+                recomanacions.append({
+                    'tipus': 'warning',
+                    'icona': instrument['icona'],
+                    'titol': f"{instrument['article'].title()} Necessita Millores",
+                    'missatge': f"{instrument['article'].capitalize()} ({mitjana:.1f}) requereix millores {instrument['millores']}."
+                })
+        
+        # Diferències estadísticament significatives segons les proves aparellades
+        for comparacio in comparacions or []:
+            if not comparacio['significativa']:
+                continue
+            a, b = comparacio['instruments']
+            millor, pitjor = (a, b) if comparacio['mitjana_diferencia'] > 0 else (b, a)
+            altra = "l'altra eina" if len(mitjanes) == 2 else pitjor
+            recomanacions.append({
+                'tipus': 'info',
+                'icona': '⚖️',
+                'titol': 'Diferència Significativa',
+                'missatge': (f"{millor} supera {altra} per {abs(comparacio['mitjana_diferencia']):.1f} punts "
+                             f"(p = {comparacio['p_ajustada']:.3g}, dz = {abs(comparacio['cohen_dz']):.2f}, efecte {comparacio['magnitud']}). "
+                             f"Considera estandarditzar l'experiència.")
+            })
         
         # Recomanacions basades en demografia
         if demografics.get('familiaritat_tec_mitja', 3) < 3:
@@ -305,71 +1841,178 @@ class AnalitzadorSUS:
         print("\n🧮 INICIANT ANÀLISI SUS...")
         print("=" * 60)
         
-        # Calcular puntuacions individuals
-        puntuacions_galeria = []
-        puntuacions_mapa = []
+        if len(self.df) > 0:  # Mostrar càlcul detallat per al primer usuari
+            print(f"\n👤 EXEMPLE DE CÀLCUL (Usuari 1):")
+            for posicio, (nom, columnes) in enumerate(self._instruments()):
+                exemple = self.df[columnes].iloc[0].tolist()
+                separador = '' if posicio == 0 else '\n'
+                print(f"{separador}Respostes {nom}: {exemple}")
+                self.calcular_puntuacio_sus(exemple, mostrar_calcul=True)
         
-        for index, fila in self.df.iterrows():
-            # Galeria
-            respostes_galeria = [fila[col] for col in self.columnes_galeria]
-            puntuacio_galeria, calcul_galeria = self.calcular_puntuacio_sus(respostes_galeria)
-            puntuacions_galeria.append(puntuacio_galeria)
-            
-            # Mapa
-            respostes_mapa = [fila[col] for col in self.columnes_mapa]
-            puntuacio_mapa, calcul_mapa = self.calcular_puntuacio_sus(respostes_mapa)
-            puntuacions_mapa.append(puntuacio_mapa)
-            
-            if index == 0:  # Mostrar càlcul detallat per al primer usuari
-                print(f"\n👤 EXEMPLE DE CÀLCUL (Usuari 1):")
-                print(f"Respostes Galeria: {respostes_galeria}")
-                puntuacio_galeria, _ = self.calcular_puntuacio_sus(respostes_galeria, mostrar_calcul=True)
-                
-                print(f"\nRespostes Mapa: {respostes_mapa}")
-                puntuacio_mapa, _ = self.calcular_puntuacio_sus(respostes_mapa, mostrar_calcul=True)
+        # Tots els instruments es puntuen alhora com un tensor (N, K, 10)
+        if self.compacte:
+            # Sumes enteres 0-40 (uint8); el factor 2.5 només s'aplica en mostrar-les
+            tensor, complets = self._tensor_respostes(self.df, dtype=np.uint8)
+            mascares = self.df[[f'Valides_{self._instruments()[k][0]}' for k in complets]].to_numpy()
+            sumes, valides = self.motor.sumar(tensor, mascares)
+        else:
+            tensor, complets = self._tensor_respostes(self.df)
+            puntuacions = self.motor.puntuar(tensor)
+        
+        # Puntuacions en unitats de 2.5 (0-40), -1 si no són vàlides, per a les diferències aparellades
+        unitats = np.full((len(self.df), len(self.esquema)), -1, dtype=np.int16)
+        if self.compacte:
+            # En int16: amb les sumes uint8, el -1 es convertiria en 255
+            unitats[:, complets] = np.where(valides, sumes.astype(np.int16), -1)
+        else:
+            unitats[:, complets] = np.where(np.isnan(puntuacions), -1, np.rint(np.nan_to_num(puntuacions) / 2.5))
         
-        # Afegir puntuacions al DataFrame
-        self.df['SUS_Galeria'] = puntuacions_galeria
-        self.df['SUS_Mapa'] = puntuacions_mapa
+        estadistiques = {}
+        for k, (nom, _) in enumerate(self._instruments()):
+            if k not in complets:
+                # Instrument incomplet: puntuacions no vàlides, com al càlcul per files
+                self.df[f'SUS_{nom}'] = np.nan
+                estadistiques[nom] = self._calcular_estadistiques(np.full(len(self.df), np.nan), nom)
+                continue
+            posicio = complets.index(k)
+            if self.compacte:
+                self.df[f'SUS_{nom}_suma'] = sumes[:, posicio]
+                valides_instrument = valides[:, posicio]
+                estadistiques[nom] = self._estadistiques_des_de_acumulador(
+                    AcumuladorSUS().actualitzar_sumes(sumes[valides_instrument, posicio]), nom)
+                if estadistiques[nom]:
+                    estadistiques[nom]['puntuacions'] = (sumes[valides_instrument, posicio] * 2.5).tolist()
+            else:
+                self.df[f'SUS_{nom}'] = puntuacions[:, posicio]
+                estadistiques[nom] = self._calcular_estadistiques(puntuacions[:, posicio], nom)
         
-        # Calcular estadístiques
-        estadistiques_galeria = self._calcular_estadistiques(puntuacions_galeria, "Galeria")
-        estadistiques_mapa = self._calcular_estadistiques(puntuacions_mapa, "Mapa")
+        comptatges_diferencies = self._comptatges_diferencies(unitats)
+        diferencies = self._intervals_confianca(estadistiques, comptatges_diferencies)
+        comparacions = self._proves_aparellades(comptatges_diferencies)
         
-        # Anàlisi demogràfica
+        # Anàlisi demogràfica i segmentació de les puntuacions
         demografics = self._analitzar_demografia()
+        segments = self._taules_segments(*self._celles_segments(self.df, unitats))
+        
+        return self._resultats(estadistiques, demografics, diferencies, comparacions, segments)
+    
+    def _comptatges_diferencies(self, unitats):
+        """Histogrames de les diferències aparellades (-100..100, 81 valors) de cada parell d'instruments
+        
+        `unitats` és una matriu (N, K) de puntuacions en unitats de 2.5, amb -1 per a les no vàlides.
+        """
+        comptatges = {}
+        noms = self.esquema.noms
+        for a in range(len(noms)):
+            for b in range(a + 1, len(noms)):
+                valides = (unitats[:, a] >= 0) & (unitats[:, b] >= 0)
+                diferencies = unitats[valides, a].astype(np.int64) - unitats[valides, b] + 40
+                comptatges[(noms[a], noms[b])] = np.bincount(diferencies, minlength=81)
+        return comptatges
+    
+    def _intervals_confianca(self, estadistiques, comptatges_diferencies):
+        """Afegir intervals bootstrap a cada instrument i retornar les diferències entre parells"""
+        if self.bootstrap is None:
+            return []
+        
+        percentatge = f"{self.bootstrap.nivell * 100:g}%"
+        print(f"\n🎲 INTERVALS DE CONFIANÇA BOOTSTRAP ({self.bootstrap.replicats} rèpliques, {percentatge}):")
+        for nom, estadistiques_instrument in estadistiques.items():
+            if not estadistiques_instrument:
+                continue
+            interval = self.bootstrap.interval(self.acumuladors[nom].comptatges, AcumuladorSUS.VALORS)
+            if interval:
+                estadistiques_instrument['interval_confianca'] = interval
+                print(f"   {nom}: mitjana [{interval['mitjana']['bca'][0]:.2f}, {interval['mitjana']['bca'][1]:.2f}] | "
+                      f"mediana [{interval['mediana']['bca'][0]:.2f}, {interval['mediana']['bca'][1]:.2f}] (BCa)")
+        
+        diferencies = []
+        valors = np.arange(-40, 41) * 2.5
+        for (a, b), comptatges in comptatges_diferencies.items():
+            interval = self.bootstrap.interval(comptatges, valors)
+            if not interval:
+                continue
+            diferencies.append({
+                'nom': f'{a} − {b}',
+                'instruments': [a, b],
+                'comptatge': int(comptatges.sum()),
+                'mitjana': interval['mitjana']['estimacio'],
+                'mediana': interval['mediana']['estimacio'],
+                'interval_confianca': interval
+            })
+            print(f"   {a} − {b}: mitjana {interval['mitjana']['estimacio']:+.2f} "
+                  f"[{interval['mitjana']['bca'][0]:+.2f}, {interval['mitjana']['bca'][1]:+.2f}] (BCa)")
+        return diferencies
+    
+    def _proves_aparellades(self, comptatges_diferencies):
+        """Proves de significació de cada parell d'instruments a partir dels histogrames de diferències"""
+        valors = np.arange(-40, 41) * 2.5
+        diferencies = {parell: np.repeat(valors, comptatges)
+                       for parell, comptatges in comptatges_diferencies.items() if comptatges.sum() > 0}
+        if not diferencies:
+            return []
         
-        # Generar recomanacions
+        comparacions = self.proves.comparar_parells(diferencies)
+        print(f"\n🔬 PROVES APARELLADES (α = {self.proves.alfa:g}):")
+        for comparacio in comparacions:
+            print(f"   {comparacio['nom']}: t p={comparacio['t_aparellada']['p']:.4f} | "
+                  f"Wilcoxon p={comparacio['wilcoxon']['p']:.4f} | permutació p={comparacio['permutacio']['p']:.4f} | "
+                  f"dz={comparacio['cohen_dz']:.2f} ({comparacio['magnitud']})"
+                  f"{' ✅ significativa' if comparacio['significativa'] else ''}")
+        return comparacions
+    
+    def _resultats(self, estadistiques, demografics, diferencies=None, comparacions=None, segments=None):
+        """Diccionari de resultats: estadístiques per instrument (també sota la seva clau), demografia i recomanacions"""
         recomanacions = self.generar_recomanacions(
-            estadistiques_galeria['mitjana'] if estadistiques_galeria else 0, 
-            estadistiques_mapa['mitjana'] if estadistiques_mapa else 0, 
-            demografics
+            {nom: (estadistiques_instrument['mitjana'] if estadistiques_instrument else 0)
+             for nom, estadistiques_instrument in estadistiques.items()},
+            demografics,
+            comparacions
         )
         
-        return {
-            'galeria': estadistiques_galeria,
-            'mapa': estadistiques_mapa,
+        resultats = {instrument['clau']: estadistiques[instrument['nom']] for instrument in self.esquema}
+        resultats.update({
+            'instruments': estadistiques,
+            'esquema': self.esquema.descripcio(),
+            'diferencies': diferencies or [],
+            'proves_aparellades': comparacions or [],
+            'segments': segments or {},
+            'columnes': self.rols_columnes or self.resolutor.resoldre(self.df.columns),
             'demografia': demografics,
             'recomanacions': recomanacions,
             'dades_en_brut': self.df
-        }
+        })
+        return resultats
     
     def _calcular_estadistiques(self, puntuacions, nom_component):
         """Calcular estadístiques descriptives"""
-        puntuacions_valides = [p for p in puntuacions if p is not None]
+        puntuacions = np.array(puntuacions, dtype=np.float64)  # None -> NaN
+        puntuacions_valides = puntuacions[~np.isnan(puntuacions)].tolist()
         
         if not puntuacions_valides:
             print(f"❌ No hi ha puntuacions vàlides per {nom_component}")
             return None
         
+        acumulador = AcumuladorSUS().actualitzar(puntuacions)
+        estadistiques = self._estadistiques_des_de_acumulador(acumulador, nom_component)
+        estadistiques['puntuacions'] = puntuacions_valides
+        return estadistiques
+    
+    def _estadistiques_des_de_acumulador(self, acumulador, nom_component):
+        """Calcular estadístiques descriptives a partir d'un histograma de puntuacions"""
+        if acumulador.comptatge == 0:
+            print(f"❌ No hi ha puntuacions vàlides per {nom_component}")
+            return None
+        
+        self.acumuladors[nom_component] = acumulador
+        
         estadistiques = {
-            'mitjana': np.mean(puntuacions_valides),
-            'mediana': np.median(puntuacions_valides),
-            'desviacio_tipica': np.std(puntuacions_valides, ddof=1) if len(puntuacions_valides) > 1 else 0,
-            'minim': np.min(puntuacions_valides),
-            'maxim': np.max(puntuacions_valides),
-            'comptatge': len(puntuacions_valides),
-            'puntuacions': puntuacions_valides
+            'mitjana': acumulador.mitjana(),
+            'mediana': acumulador.mediana(),
+            'desviacio_tipica': acumulador.desviacio_tipica(),
+            'minim': acumulador.minim(),
+            'maxim': acumulador.maxim(),
+            'comptatge': acumulador.comptatge
         }
         
         # Interpretació
@@ -390,6 +2033,97 @@ class AnalitzadorSUS:
         
         return estadistiques
     
+    def _rols_demografics(self, columnes):
+        """Columnes de familiaritat tecnològica, experiència UAB i edat, segons el resolutor de rols"""
+        if self.columnes_demografiques is None:
+            rols = self.rols_columnes = self.resolutor.resoldre(columnes)
+            self.columnes_demografiques = {rol: rols.get(rol) for rol in ('tecnologia', 'uab', 'edat')}
+        return self.columnes_demografiques
+    
+    # Rols pels quals se segmenten les puntuacions, amb la seva etiqueta a l'informe
+    ROLS_SEGMENTACIO = {'edat': 'Edat', 'tecnologia': 'Familiaritat tecnològica', 'uab': 'Experiència UAB'}
+    SENSE_RESPOSTA = 'Sense resposta'
+    
+    def _celles_segments(self, df, unitats):
+        """Histogrames de puntuacions per cella demogràfica (edat × tecnologia × UAB) en una sola agregació
+        
+        Cada combinació observada de valors dels rols presents és una cella (la memòria
+        creix amb les celles que hi ha, no amb el producte del nombre de nivells); el codi
+        de cella i la puntuació (en unitats de 2.5) formen un únic índex i un bincount per
+        instrument n'obté tots els histogrames alhora. Retorna els rols usats i un
+        diccionari {valors de la cella: (respostes, histogrames (K, 41))}.
+        """
+        rols_demografics = self._rols_demografics(df.columns)
+        rols = [rol for rol in self.ROLS_SEGMENTACIO if rols_demografics.get(rol) in df.columns]
+        if not rols:
+            return [], {}
+        
+        codis, nivells = [], []
+        for rol in rols:
+            codi, nivell = pd.factorize(df[rols_demografics[rol]], sort=True)
+            # Els valors mancants (-1) formen el seu propi nivell al final
+            codis.append(np.where(codi < 0, len(nivell), codi))
+            nivells.append(nivell.tolist() + [self.SENSE_RESPOSTA])
+        combinacions, cella = np.unique(np.column_stack(codis), axis=0, return_inverse=True)
+        cella = cella.reshape(-1)
+        nombre_celles = len(combinacions)
+        
+        respostes = np.bincount(cella, minlength=nombre_celles)
+        histogrames = np.zeros((nombre_celles, unitats.shape[1], AcumuladorSUS.NOMBRE_VALORS), dtype=np.int64)
+        for k in range(unitats.shape[1]):
+            valides = unitats[:, k] >= 0
+            index = cella[valides] * AcumuladorSUS.NOMBRE_VALORS + unitats[valides, k]
+            histogrames[:, k, :] = np.bincount(index, minlength=nombre_celles * AcumuladorSUS.NOMBRE_VALORS).reshape(
+                nombre_celles, AcumuladorSUS.NOMBRE_VALORS)
+        
+        celles = {}
+        for posicio, combinacio in enumerate(combinacions):
+            clau = tuple(nivell[i] for nivell, i in zip(nivells, combinacio))
+            celles[clau] = (int(respostes[posicio]), histogrames[posicio])
+        return rols, celles
+    
+    def _combinar_celles(self, acumulades, celles):
+        """Sumar les celles d'un fragment a les acumulades"""
+        for clau, (respostes, histogrames) in celles.items():
+            if clau in acumulades:
+                respostes_acumulades, histogrames_acumulats = acumulades[clau]
+                acumulades[clau] = (respostes_acumulades + respostes, histogrames_acumulats + histogrames)
+            else:
+                acumulades[clau] = (respostes, histogrames.copy())
+        return acumulades
+    
+    def _taules_segments(self, rols, celles):
+        """Estadístiques SUS per segment de cada rol i de cada parell de rols, plegant les celles"""
+        from itertools import combinations
+        segments = {}
+        dimensions = [(rol,) for rol in rols] + list(combinations(rols, 2))
+        for dimensio in dimensions:
+            posicions = [rols.index(rol) for rol in dimensio]
+            agregades = {}
+            for clau, (respostes, histogrames) in celles.items():
+                self._combinar_celles(agregades, {tuple(clau[i] for i in posicions): (respostes, histogrames)})
+            
+            files = []
+            ordre = lambda clau: tuple((valor == self.SENSE_RESPOSTA, str(valor) if isinstance(valor, str) else valor) for valor in clau)
+            for clau in sorted(agregades, key=ordre):
+                respostes, histogrames = agregades[clau]
+                instruments = {}
+                for nom, histograma in zip(self.esquema.noms, histogrames):
+                    acumulador = AcumuladorSUS(histograma)
+                    instruments[nom] = None if acumulador.comptatge == 0 else {
+                        'mitjana': acumulador.mitjana(),
+                        'mediana': acumulador.mediana(),
+                        'desviacio_tipica': acumulador.desviacio_tipica(),
+                        'comptatge': acumulador.comptatge
+                    }
+                files.append({'segment': dict(zip(dimensio, clau)), 'comptatge': respostes, 'instruments': instruments})
+            segments[' × '.join(dimensio)] = files
+        
+        if segments:
+            print(f"\n👥 SEGMENTACIÓ: {len(celles)} celles demogràfiques, "
+                  f"{sum(len(files) for files in segments.values())} segments en {len(segments)} taules")
+        return segments
+    
     def _analitzar_demografia(self):
         """Analitzar dades demogràfiques"""
         demografia = {
@@ -401,13 +2135,10 @@ class AnalitzadorSUS:
             'distribucio_tecnologia': {}
         }
         
-        # Familiaritat tecnològica
-        col_tec = None
-        for col in self.df.columns:
-            if any(paraula in col.lower() for paraula in ['familiaritat', 'tecnolog', 'technology', 'familiarity']):
-                col_tec = col
-                break
+        columnes_demografiques = self._rols_demografics(self.df.columns)
         
+        # Familiaritat tecnològica
+        col_tec = columnes_demografiques['tecnologia']
         if col_tec and col_tec in self.df.columns:
             try:
                 demografia['familiaritat_tec_mitja'] = float(self.df[col_tec].mean())
@@ -416,12 +2147,7 @@ class AnalitzadorSUS:
                 pass
         
         # Experiència UAB
-        col_uab = None
-        for col in self.df.columns:
-            if 'uab' in col.lower():
-                col_uab = col
-                break
-        
+        col_uab = columnes_demografiques['uab']
         if col_uab and col_uab in self.df.columns:
             try:
                 comptatge_uab = self.df[col_uab].value_counts()
@@ -431,12 +2157,7 @@ class AnalitzadorSUS:
                 pass
         
         # Distribució d'edat
-        col_edat = None
-        for col in self.df.columns:
-            if 'edat' in col.lower() or 'age' in col.lower():
-                col_edat = col
-                break
-        
+        col_edat = columnes_demografiques['edat']
         if col_edat and col_edat in self.df.columns:
             try:
                 demografia['distribucio_edat'] = self.df[col_edat].value_counts().to_dict()
@@ -445,10 +2166,698 @@ class AnalitzadorSUS:
         
         return demografia
 
+class AnalitzadorSUSStreaming(AnalitzadorSUS):
+    """Anàlisi SUS per fragments: la memòria depèn de la mida del fragment, no del fitxer
+    
+    Cada fragment es valida i es puntua i després es descarta; només es conserven
+    els histogrames de puntuacions, els comptatges demogràfics i, opcionalment,
+    les columnes de puntuació.
+    """
+    
+    def __init__(self, extractor, mida_fragment=50_000, conservar_puntuacions=True, bootstrap=None, proves=None):
+        super().__init__(pd.DataFrame(), esquema=extractor.esquema, bootstrap=bootstrap, proves=proves,
+                         resolutor=extractor.resolutor)
+        self.extractor = extractor
+        self.mida_fragment = mida_fragment
+        self.conservar_puntuacions = conservar_puntuacions
+    
+    def analitzar(self, font=None):
+        """Realitzar anàlisi completa SUS llegint la font per fragments"""
+        print("\n🧮 INICIANT ANÀLISI SUS (STREAMING)...")
+        print("=" * 60)
+        
+        estat = self._estat_inicial()
+        for numero, fragment in enumerate(self.extractor.llegir_fragments(font, self.mida_fragment), 1):
+            self._plegar_fragment(estat, fragment)
+            print(f"📦 Fragment {numero}: {len(fragment)} respostes vàlides (acumulades: {estat['demografia']['total_respostes']})")
+        return self._resultats_estat(estat)
+    
+    def _estat_inicial(self):
+        """Agregats buits: histogrames, comptatges demogràfics, diferències aparellades i cel·les de segments"""
+        return {
+            'acumuladors': {nom: AcumuladorSUS() for nom in self.esquema.noms},
+            'demografia': {
+                'total_respostes': 0,
+                'familiaritat_tec_mitja': 0,
+                'experiencia_uab_si': 0,
+                'experiencia_uab_no': 0,
+                'distribucio_edat': {},
+                'distribucio_tecnologia': {}
+            },
+            'comptatges_edat': {}, 'comptatges_tec': {}, 'comptatges_invalids': {}, 'comptatges_no_enters': {},
+            'suma_tec': 0.0, 'comptatge_tec': 0, 'tec_numerica': True,
+            'fragments_puntuacions': [],
+            'comptatges_diferencies': {},
+            'celles': {}, 'rols_segments': [],
+            'columnes_instruments': None, 'columnes_demografiques': None,
+            'files_inicials': 0
+        }
+    
+    def _plegar_fragment(self, estat, fragment):
+        """Validar i puntuar un fragment i sumar-lo als agregats; retorna les respostes vàlides afegides"""
+        if estat['columnes_demografiques'] is None:
+            estat['columnes_instruments'] = dict(zip(self.esquema.noms, self.extractor._detectar_columnes_sus(fragment.columns)))
+            estat['columnes_demografiques'] = self._rols_demografics(fragment.columns)
+        self.columnes_instruments = estat['columnes_instruments']
+        columnes_demografiques = estat['columnes_demografiques']
+        demografia = estat['demografia']
+        
+        estat['files_inicials'] += len(fragment)
+        fragment, invalids, no_enters = self.extractor._netejar_respostes(
+            fragment, sum(self.columnes_instruments.values(), []))
+        for clau, comptatges in (('comptatges_invalids', invalids), ('comptatges_no_enters', no_enters)):
+            for col, comptatge in comptatges.items():
+                estat[clau][col] = estat[clau].get(col, 0) + comptatge
+        
+        # Puntuar el bloc de tots els instruments alhora i plegar-lo als acumuladors
+        tensor, complets = self._tensor_respostes(fragment)
+        puntuacions = np.full((len(fragment), len(self.esquema)), np.nan)
+        puntuacions[:, complets] = self.calcular_puntuacions_lot(tensor)
+        for nom, columna in zip(self.esquema.noms, puntuacions.T):
+            estat['acumuladors'][nom].actualitzar(columna)
+        unitats = np.where(np.isnan(puntuacions), -1, np.rint(np.nan_to_num(puntuacions) / 2.5)).astype(np.int16)
+        for parell, comptatges in self._comptatges_diferencies(unitats).items():
+            estat['comptatges_diferencies'][parell] = estat['comptatges_diferencies'].get(parell, 0) + comptatges
+        estat['rols_segments'], celles_fragment = self._celles_segments(fragment, unitats)
+        self._combinar_celles(estat['celles'], celles_fragment)
+        if self.conservar_puntuacions:
+            estat['fragments_puntuacions'].append(puntuacions)
+        
+        # Comptatges demogràfics
+        demografia['total_respostes'] += len(fragment)
+        col_tec = columnes_demografiques['tecnologia']
+        if col_tec and estat['tec_numerica']:
+            try:
+                estat['suma_tec'] += float(fragment[col_tec].sum())
+                estat['comptatge_tec'] += int(fragment[col_tec].count())
+                self._sumar_comptatges(estat['comptatges_tec'], fragment[col_tec])
+            except Exception:
+                estat['tec_numerica'] = False
+        col_uab = columnes_demografiques['uab']
+        if col_uab:
+            comptatge_uab = fragment[col_uab].value_counts()
+            demografia['experiencia_uab_si'] += int(comptatge_uab.get('SI', 0))
+            demografia['experiencia_uab_no'] += int(comptatge_uab.get('NO', 0))
+        if columnes_demografiques['edat']:
+            self._sumar_comptatges(estat['comptatges_edat'], fragment[columnes_demografiques['edat']])
+        return len(fragment)
+    
+    def _resultats_estat(self, estat):
+        """Resultats complets a partir dels agregats, sense tornar a llegir cap resposta"""
+        demografia = dict(estat['demografia'])
+        self.extractor.avisar_invalids(estat['comptatges_invalids'], estat['comptatges_no_enters'],
+                                       sum((estat['columnes_instruments'] or {}).values(), []))
+        if demografia['total_respostes'] == 0:
+            raise ValueError("No s'han trobat respostes completes després de la neteja de dades")
+        if estat['files_inicials'] != demografia['total_respostes']:
+            print(f"🗑️ Eliminades {estat['files_inicials'] - demografia['total_respostes']} files amb dades incompletes")
+        
+        if estat['tec_numerica'] and estat['comptatge_tec'] > 0:
+            demografia['familiaritat_tec_mitja'] = estat['suma_tec'] / estat['comptatge_tec']
+            demografia['distribucio_tecnologia'] = self._ordenar_comptatges(estat['comptatges_tec'])
+        demografia['distribucio_edat'] = self._ordenar_comptatges(estat['comptatges_edat'])
+        
+        estadistiques = {nom: self._estadistiques_des_de_acumulador(acumulador, nom)
+                         for nom, acumulador in estat['acumuladors'].items()}
+        diferencies = self._intervals_confianca(estadistiques, estat['comptatges_diferencies'])
+        comparacions = self._proves_aparellades(estat['comptatges_diferencies'])
+        
+        # Només es conserven les columnes de puntuació (en un sol bloc per a les crides següents)
+        if len(estat['fragments_puntuacions']) > 1:
+            estat['fragments_puntuacions'] = [np.concatenate(estat['fragments_puntuacions'])]
+        puntuacions = (estat['fragments_puntuacions'][0] if estat['fragments_puntuacions']
+                       else np.empty((0, len(self.esquema))))
+        self.df = pd.DataFrame({f'SUS_{nom}': columna for nom, columna in zip(self.esquema.noms, puntuacions.T)})
+        
+        segments = self._taules_segments(estat['rols_segments'], estat['celles'])
+        
+        return self._resultats(estadistiques, demografia, diferencies, comparacions, segments)
+    
+    def _sumar_comptatges(self, comptatges, serie):
+        """Sumar els comptatges de valors d'una columna a un diccionari acumulat"""
+        for valor, comptatge in serie.value_counts().items():
+            comptatges[valor] = comptatges.get(valor, 0) + int(comptatge)
+    
+    def _ordenar_comptatges(self, comptatges):
+        """Ordenar comptatges de més a menys freqüent, com value_counts()"""
+        return dict(sorted(comptatges.items(), key=lambda parella: -parella[1]))
+
+class AnalitzadorSUSIncremental(AnalitzadorSUSStreaming):
+    """Agregats SUS persistents als quals només s'afegeixen les respostes noves d'una font
+    
+    Les files es reconeixen per la marca temporal i per una empremta de la fila (hash de
+    tots els seus valors). L'estat desat només conté els agregats i un resum acotat de la
+    font: l'última marca vista, un resum (nombre i suma de les empremtes) de les files
+    anteriors, les empremtes de les files amb l'última marca i un resum de les files sense
+    marca, que es reconeixen per posició. A cada consulta es validen, es puntuen i se
+    sumen als agregats només les files posteriors a l'última marca, les de la mateixa
+    marca amb una empremta nova i les files sense marca que no hi eren. Si una fila ja
+    comptada s'edita o s'esborra (o la capçalera canvia), el resum deixa de coincidir i
+    els agregats es reconstrueixen des de zero.
+    """
+    
+    FORMAT_MARCA = '%d/%m/%Y %H:%M:%S'  # Format de la marca temporal de Google Forms
+    
+    def __init__(self, extractor, ruta_estat=os.path.join('.cache_sus', 'vigilancia.pkl'),
+                 mida_fragment=50_000, bootstrap=None, proves=None):
+        # Les puntuacions de cada resposta no es conserven: l'estat creixeria amb la font
+        super().__init__(extractor, mida_fragment, conservar_puntuacions=False, bootstrap=bootstrap, proves=proves)
+        self.ruta_estat = ruta_estat
+        self.clau = ManifestConstruccio.empremta(extractor.url_full, extractor.regles_validacio,
+                                                 self.esquema.descripcio(), ManifestConstruccio.versio_codi())
+        self.estat = self._carregar_estat()
+    
+    def _estat_inicial(self):
+        estat = super()._estat_inicial()
+        estat.update(clau=self.clau, darrera_marca=None, resum_anteriors=(0, 0),
+                     empremtes_frontera=np.empty(0, dtype=np.uint64), resum_sense_marca=(0, 0),
+                     columnes_font=None)
+        return estat
+    
+    def _carregar_estat(self):
+        try:
+            with open(self.ruta_estat, 'rb') as f:
+                estat = pickle.load(f)
+        except OSError:
+            return self._estat_inicial()
+        except Exception as e:
+            print(f"⚠️ No s'ha pogut llegir l'estat desat ({e}): es comença amb agregats buits")
+            return self._estat_inicial()
+        if estat.get('clau') != self.clau:
+            print("🔁 La font, l'esquema o el codi han canviat: es comença amb agregats buits")
+            return self._estat_inicial()
+        print(f"💾 Agregats recuperats: {estat['demografia']['total_respostes']} respostes vàlides")
+        return estat
+    
+    def _desar_estat(self):
+        """Desar l'estat de manera atòmica (fitxer temporal + reanomenament)"""
+        directori = os.path.dirname(os.path.abspath(self.ruta_estat))
+        os.makedirs(directori, exist_ok=True)
+        descriptor, ruta_temporal = tempfile.mkstemp(dir=directori, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                pickle.dump(self.estat, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(ruta_temporal, self.ruta_estat)
+        except BaseException:
+            if os.path.exists(ruta_temporal):
+                os.remove(ruta_temporal)
+            raise
+    
+    @staticmethod
+    def empremtes_files(df):
+        """Hash de cada fila, independent del tipus que pandas hagi inferit per a cada columna
+        
+        Un mateix valor pot arribar com a 5, 5.0 o '5' segons el fragment: els valors
+        numèrics es hashegen com a float i només la resta com a text. Les columnes de text
+        es converteixen valor únic a valor únic, perquè cada consulta hasheja la font sencera.
+        """
+        hashes = {}
+        for col in df.columns:
+            valors = df[col]
+            if pd.api.types.is_numeric_dtype(valors) and not pd.api.types.is_bool_dtype(valors):
+                hashes[col] = pd.util.hash_array(valors.to_numpy(np.float64, na_value=np.nan))
+                continue
+            codis, unics = pd.factorize(valors)
+            unics = pd.Series(unics)
+            numerics = pd.to_numeric(unics, errors='coerce')
+            hashes_unics = pd.util.hash_array(numerics.to_numpy(np.float64, na_value=np.nan))
+            text = numerics.isna().to_numpy()
+            if text.any():
+                hashes_unics[text] = pd.util.hash_array(unics[text].astype(str).to_numpy(dtype=object))
+            # Els codis -1 (valors mancants) agafen el hash de NaN, igual que a les columnes numèriques
+            hashes[col] = np.append(hashes_unics, pd.util.hash_array(np.array([np.nan])))[codis]
+        return pd.util.hash_pandas_object(pd.DataFrame(hashes, index=df.index), index=False).to_numpy()
+    
+    @staticmethod
+    def resum_empremtes(empremtes, resum=(0, 0)):
+        """Afegir empremtes a un resum (nombre de files, suma mòdul 2⁶⁴) que no depèn de l'ordre"""
+        return resum[0] + len(empremtes), (resum[1] + int(empremtes.sum(dtype=np.uint64))) % 2**64
+    
+    def _marques(self, serie):
+        """Marques temporals; les que no segueixen el format de Google Forms es deixen com a NaT"""
+        return pd.to_datetime(serie, format=self.FORMAT_MARCA, errors='coerce')
+    
+    def actualitzar(self, font=None):
+        """Consultar la font, sumar als agregats només les files noves i desar l'estat
+        
+        Retorna el nombre de respostes vàlides afegides.
+        """
+        files_font, afegides, noves_files = 0, 0, 0
+        # Resums de les files ja comptades tal com es troben ara a la font
+        resum_anteriors, resum_vistes_sense_marca = (0, 0), (0, 0)
+        # Resum acotat de la font sencera, que substituirà el desat si tot quadra
+        maxima, frontera_nova, resum_menors, resum_sense_marca = None, [], (0, 0), (0, 0)
+        for fragment in self.extractor.llegir_fragments(font, self.mida_fragment):
+            if files_font == 0:
+                columnes = tuple(str(col) for col in fragment.columns)
+                if self.estat['columnes_font'] not in (None, columnes):
+                    print("🔁 La capçalera de la font ha canviat: es reconstrueixen els agregats")
+                    self.estat = self._estat_inicial()
+                self.estat['columnes_font'] = columnes
+                col_marca = self.resolutor.resoldre(fragment.columns)['marca_temporal']
+                darrera_marca = self.estat['darrera_marca']
+                pendents_frontera = Counter(self.estat['empremtes_frontera'].tolist())
+                sense_marca_vistes = self.estat['resum_sense_marca'][0]
+            files_font += len(fragment)
+            
+            empremtes = self.empremtes_files(fragment)
+            marques = self._marques(fragment[col_marca]) if col_marca else pd.Series(pd.NaT, index=fragment.index)
+            amb_marca = marques.notna().to_numpy()
+            noves = np.zeros(len(fragment), dtype=bool)
+            
+            # Files sense marca: les primeres de la font ja s'havien comptat
+            posicions_sense = np.flatnonzero(~amb_marca)
+            ja_vistes = min(len(posicions_sense), max(sense_marca_vistes - resum_sense_marca[0], 0))
+            resum_vistes_sense_marca = self.resum_empremtes(empremtes[posicions_sense[:ja_vistes]],
+                                                            resum_vistes_sense_marca)
+            resum_sense_marca = self.resum_empremtes(empremtes[posicions_sense], resum_sense_marca)
+            noves[posicions_sense[ja_vistes:]] = True
+            
+            # Files amb marca: les anteriors a l'última vista ja s'havien comptat, les posteriors són noves
+            if darrera_marca is None:
+                noves |= amb_marca
+            else:
+                resum_anteriors = self.resum_empremtes(empremtes[(marques < darrera_marca).to_numpy()], resum_anteriors)
+                noves |= (marques > darrera_marca).to_numpy()
+                # Amb la mateixa marca, només les empremtes que no es van comptar (respostes al mateix segon)
+                for posicio in np.flatnonzero((marques == darrera_marca).to_numpy()):
+                    if pendents_frontera[empremtes[posicio]] > 0:
+                        pendents_frontera[empremtes[posicio]] -= 1
+                    else:
+                        noves[posicio] = True
+            
+            if amb_marca.any():
+                maxima_fragment = marques.max()
+                if maxima is None or maxima_fragment > maxima:
+                    if maxima is not None:
+                        resum_menors = self.resum_empremtes(np.array(frontera_nova, dtype=np.uint64), resum_menors)
+                    maxima, frontera_nova = maxima_fragment, []
+                resum_menors = self.resum_empremtes(empremtes[(marques < maxima).to_numpy()], resum_menors)
+                frontera_nova.extend(empremtes[(marques == maxima).to_numpy()].tolist())
+            
+            if noves.any():
+                noves_files += int(noves.sum())
+                afegides += self._plegar_fragment(self.estat, fragment.iloc[np.flatnonzero(noves)].copy())
+        
+        if files_font and (resum_anteriors != self.estat['resum_anteriors']
+                           or resum_vistes_sense_marca != self.estat['resum_sense_marca']
+                           or any(pendents_frontera.values())):
+            # Una fila comptada s'ha editat o esborrat: els agregats no es poden restar, es reconstrueixen
+            print("🔁 S'han editat o esborrat respostes ja comptades: es reconstrueixen els agregats")
+            self.estat = self._estat_inicial()
+            return self.actualitzar(font)
+        
+        if noves_files == 0:
+            return 0
+        self.estat.update(darrera_marca=maxima, resum_anteriors=resum_menors,
+                          empremtes_frontera=np.sort(np.array(frontera_nova, dtype=np.uint64)),
+                          resum_sense_marca=resum_sense_marca)
+        self._desar_estat()
+        print(f"➕ {noves_files} files noves, {afegides} respostes vàlides (total: {self.estat['demografia']['total_respostes']})")
+        return afegides
+    
+    def empremta_agregats(self):
+        """Hash dels agregats: només canvia quan s'hi afegeixen respostes"""
+        return ManifestConstruccio.empremta(
+            self.clau, self.estat['demografia'],
+            {nom: acumulador.comptatges.tolist() for nom, acumulador in self.estat['acumuladors'].items()})
+    
+    def analitzar(self, font=None):
+        """Actualitzar els agregats amb les files noves i retornar els resultats complets"""
+        self.actualitzar(font)
+        return self._resultats_estat(self.estat)
+    
+    def vigilar(self, interval, en_canvi, max_consultes=None, font=None):
+        """Consultar la font cada `interval` segons i cridar `en_canvi(resultats)` quan els agregats canvien
+        
+        La primera crida es fa sempre amb els agregats actuals, de manera que l'informe
+        queda al dia en engegar. Ctrl+C atura la vigilància; retorna els últims resultats.
+        """
+        resultats = None
+        empremta = None
+        consulta = 0
+        try:
+            while max_consultes is None or consulta < max_consultes:
+                consulta += 1
+                inici = time.perf_counter()
+                try:
+                    self.actualitzar(font)
+                except Exception as e:
+                    print(f"⚠️ Consulta {consulta} fallida: {e}")
+                else:
+                    empremta_actual = self.empremta_agregats()
+                    if empremta_actual != empremta and self.estat['demografia']['total_respostes'] > 0:
+                        resultats = self._resultats_estat(self.estat)
+                        en_canvi(resultats)
+                        empremta = empremta_actual
+                        print(f"🔄 Consulta {consulta}: resultats regenerats en {time.perf_counter() - inici:.2f} s")
+                    else:
+                        print(f"💤 Consulta {consulta}: sense canvis ({time.perf_counter() - inici:.2f} s)")
+                if max_consultes is None or consulta < max_consultes:
+                    time.sleep(interval)
+        except KeyboardInterrupt:
+            print("\n⏹️ Vigilància aturada")
+        return resultats
+
+class PlantillaInforme:
+    """Plantilla HTML precompilada amb ranures {{ nom }}
+    
+    El text estàtic (CSS, JavaScript dels gràfics, estructura de la pàgina) es
+    parteix una sola vegada en trossos fixos i ranures; omplir-la només uneix els
+    trossos amb els valors dinàmics, sense tornar a formatar el text estàtic.
+    Els blocs opcionals <!-- bloc:nom --> ... <!-- /bloc:nom --> es conserven o
+    s'eliminen (`sense_blocs`) en compilar-la, no en cada informe.
+    """
+    
+    RANURA = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+    BLOC = re.compile(r'[ \t]*<!-- bloc:(\w+) -->\r?\n(.*?)[ \t]*<!-- /bloc:\1 -->\r?\n', re.S)
+    
+    def __init__(self, text, sense_blocs=()):
+        text = self.BLOC.sub(lambda bloc: '' if bloc.group(1) in sense_blocs else bloc.group(2), text)
+        parts = self.RANURA.split(text)
+        self.trossos = parts[0::2]
+        self.ranures = parts[1::2]
+    
+    @classmethod
+    def de_fitxer(cls, ruta, sense_blocs=()):
+        with open(ruta, 'r', encoding='utf-8', newline='') as f:
+            return cls(f.read(), sense_blocs)
+    
+    def omplir(self, **valors):
+        """Text de la plantilla amb cada ranura substituïda pel seu valor"""
+        falten = [ranura for ranura in self.ranures if ranura not in valors]
+        if falten:
+            raise KeyError(f"Falten valors per a les ranures de la plantilla: {falten}")
+        parts = [None] * (len(self.trossos) + len(self.ranures))
+        parts[0::2] = self.trossos
+        parts[1::2] = [str(valors[ranura]) for ranura in self.ranures]
+        return ''.join(parts)
+
+class GrafiquesSVG:
+    """Gràfics SVG estàtics (barres, formatge/rosca i radar) generats en Python pur
+    
+    Reprodueixen els gràfics de Chart.js de l'informe sense JavaScript: es pinten
+    amb la pàgina i es converteixen a PDF immediatament. Els valors que Chart.js
+    mostra en passar-hi el ratolí s'escriuen directament al gràfic o a la llegenda.
+    """
+    
+    FONT = "'Segoe UI', Tahoma, Geneva, Verdana, sans-serif"
+    
+    @staticmethod
+    def _n(valor):
+        """Coordenada amb un decimal, sense zeros sobrers"""
+        return f'{valor:.1f}'.rstrip('0').rstrip('.')
+    
+    @staticmethod
+    def _rgba(color, opacitat):
+        return f'rgba({", ".join(str(component) for component in color)}, {opacitat})'
+    
+    def _svg(self, amplada, alcada, contingut, alcada_css='100%'):
+        return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {amplada} {alcada}" width="100%" '
+                f'height="{alcada_css}" preserveAspectRatio="xMidYMid meet" role="img" '
+                f'font-family="{html.escape(self.FONT)}" font-size="12">{"".join(contingut)}</svg>')
+    
+    def _text(self, x, y, text, ancora='middle', mida=12, color='#666', gruix='normal'):
+        return (f'<text x="{self._n(x)}" y="{self._n(y)}" text-anchor="{ancora}" font-size="{mida}" '
+                f'font-weight="{gruix}" fill="{color}">{html.escape(str(text))}</text>')
+    
+    def barres(self, etiquetes, valors, colors, maxim=100, pas=20, unitat=' pts'):
+        """Gràfic de barres verticals; `colors` són tuples RGB"""
+        amplada, alcada = 600, 400
+        esquerra, dreta, dalt, baix = 60, 10, 20, 40
+        alcada_util = alcada - dalt - baix
+        y = lambda valor: dalt + alcada_util * (1 - min(max(valor, 0), maxim) / maxim)
+        contingut = []
+        for marca in range(0, maxim + 1, pas):
+            contingut.append(f'<line x1="{esquerra}" y1="{self._n(y(marca))}" x2="{amplada - dreta}" '
+                             f'y2="{self._n(y(marca))}" stroke="rgba(0, 0, 0, 0.1)"/>')
+            contingut.append(self._text(esquerra - 8, y(marca) + 4, f'{marca}{unitat}', ancora='end'))
+        
+        banda = (amplada - esquerra - dreta) / max(len(valors), 1)
+        for i, (etiqueta, valor, color) in enumerate(zip(etiquetes, valors, colors)):
+            ample = banda * 0.72
+            x0 = esquerra + banda * i + (banda - ample) / 2
+            y0, y1 = y(valor), y(0)
+            radi = min(15, ample / 2, y1 - y0)
+            # Barra amb les cantonades superiors arrodonides, com borderRadius de Chart.js
+            contingut.append(
+                f'<path d="M{self._n(x0)},{self._n(y1)} V{self._n(y0 + radi)} '
+                f'Q{self._n(x0)},{self._n(y0)} {self._n(x0 + radi)},{self._n(y0)} H{self._n(x0 + ample - radi)} '
+                f'Q{self._n(x0 + ample)},{self._n(y0)} {self._n(x0 + ample)},{self._n(y0 + radi)} V{self._n(y1)} Z" '
+                f'fill="{self._rgba(color, 0.8)}" stroke="{self._rgba(color, 1)}" stroke-width="3"/>')
+            contingut.append(self._text(x0 + ample / 2, y0 - 6, f'{valor:.1f}{unitat}', color='#2C3E50', gruix='bold'))
+            contingut.append(self._text(x0 + ample / 2, alcada - baix + 20, etiqueta))
+        return self._svg(amplada, alcada, contingut)
+    
+    def _llegenda(self, entrades, amplada, y, mida_marca=5):
+        """Llegenda centrada en files: entrades (text, color de farciment)"""
+        files, fila, ample_fila = [], [], 0
+        for text, color in entrades:
+            ample = 2 * mida_marca + 8 + 7 * len(text) + 20
+            if fila and ample_fila + ample > amplada - 20:
+                files.append((fila, ample_fila))
+                fila, ample_fila = [], 0
+            fila.append((text, color, ample))
+            ample_fila += ample
+        if fila:
+            files.append((fila, ample_fila))
+        
+        contingut = []
+        for numero, (fila, ample_fila) in enumerate(files):
+            x = (amplada - ample_fila) / 2
+            y_fila = y + numero * 20
+            for text, color, ample in fila:
+                contingut.append(f'<circle cx="{self._n(x + mida_marca)}" cy="{self._n(y_fila - 4)}" r="{mida_marca}" '
+                                 f'fill="{color}"/>')
+                contingut.append(self._text(x + 2 * mida_marca + 6, y_fila, text, ancora='start'))
+                x += ample
+        return contingut, len(files)
+    
+    def pastis(self, etiquetes, valors, colors, forat=0.0):
+        """Gràfic de formatge (o de rosca si `forat` > 0, fracció del radi) amb llegenda i percentatges"""
+        amplada, alcada = 400, 300
+        total = sum(valors)
+        # Com més sectors que colors, es tornen a fer servir per ordre
+        colors = [colors[i % len(colors)] for i in range(len(valors))] if colors else ['#999'] * len(valors)
+        entrades = [(f'{etiqueta}: {valor} ({valor * 100 / total:.1f}%)' if total else f'{etiqueta}: {valor}', color)
+                    for etiqueta, valor, color in zip(etiquetes, valors, colors)]
+        llegenda, files = self._llegenda(entrades, amplada, 0)
+        radi = min(amplada / 2, alcada - 20 * files - 20) / 2 - 5
+        cx, cy = amplada / 2, radi + 10
+        
+        contingut = []
+        if not total:
+            contingut.append(self._text(cx, cy, 'Sense dades'))
+        else:
+            angle = -math.pi / 2
+            interior = radi * forat
+            for valor, color in zip(valors, colors):
+                if not valor:
+                    continue
+                if valor == total:
+                    # Un sol sector: un arc de 360° no es pot dibuixar amb un sol path
+                    contingut.append(f'<circle cx="{self._n(cx)}" cy="{self._n(cy)}" r="{self._n(radi)}" fill="{color}" '
+                                     f'stroke="#fff" stroke-width="2"/>')
+                    break
+                final = angle + 2 * math.pi * valor / total
+                gran = 1 if final - angle > math.pi else 0
+                punts = [(cx + r * math.cos(a), cy + r * math.sin(a)) for r, a in
+                         ((radi, angle), (radi, final), (interior, final), (interior, angle))]
+                camí = (f'M{self._n(punts[0][0])},{self._n(punts[0][1])} '
+                        f'A{self._n(radi)},{self._n(radi)} 0 {gran} 1 {self._n(punts[1][0])},{self._n(punts[1][1])} ')
+                if interior:
+                    camí += (f'L{self._n(punts[2][0])},{self._n(punts[2][1])} '
+                             f'A{self._n(interior)},{self._n(interior)} 0 {gran} 0 {self._n(punts[3][0])},{self._n(punts[3][1])} Z')
+                else:
+                    camí += f'L{self._n(cx)},{self._n(cy)} Z'
+                contingut.append(f'<path d="{camí}" fill="{color}" stroke="#fff" stroke-width="2"/>')
+                angle = final
+            if interior and any(valor == total for valor in valors):
+                contingut.append(f'<circle cx="{self._n(cx)}" cy="{self._n(cy)}" r="{self._n(interior)}" fill="#fff"/>')
+        
+        desplacament = cy + radi + 25
+        contingut.append(f'<g transform="translate(0 {self._n(desplacament)})">{"".join(llegenda)}</g>')
+        return self._svg(amplada, max(alcada, desplacament + 20 * files), contingut, alcada_css='85%')
+    
+    def radar(self, eixos, series, maxim=100, pas=20):
+        """Gràfic de radar: `series` és una llista de (etiqueta, valors per eix, color RGB)
+        
+        La graella es pinta amb els colors de les franges SUS (≤50 inacceptable,
+        ≤68 acceptable, més bo/excel·lent), com a l'informe interactiu.
+        """
+        amplada, alcada = 600, 400
+        llegenda, files = self._llegenda([(etiqueta, self._rgba(color, 1)) for etiqueta, _, color in series], amplada, 20)
+        dalt = 20 * files + 20
+        radi = (alcada - dalt - 40) / 2
+        cx, cy = amplada / 2, dalt + 20 + radi
+        angles = [-math.pi / 2 + 2 * math.pi * i / len(eixos) for i in range(len(eixos))]
+        punt = lambda valor, angle: (cx + radi * min(max(valor, 0), maxim) / maxim * math.cos(angle),
+                                     cy + radi * min(max(valor, 0), maxim) / maxim * math.sin(angle))
+        poligon = lambda punts: ' '.join(f'{self._n(x)},{self._n(y)}' for x, y in punts)
+        
+        contingut = list(llegenda)
+        for marca in range(pas, maxim + 1, pas):
+            color = 'rgba(220, 53, 69, 0.3)' if marca <= 50 else 'rgba(255, 193, 7, 0.3)' if marca <= 68 else 'rgba(40, 167, 69, 0.3)'
+            contingut.append(f'<polygon points="{poligon([punt(marca, angle) for angle in angles])}" fill="none" stroke="{color}"/>')
+        for angle, eix in zip(angles, eixos):
+            x, y = punt(maxim, angle)
+            contingut.append(f'<line x1="{self._n(cx)}" y1="{self._n(cy)}" x2="{self._n(x)}" y2="{self._n(y)}" '
+                             f'stroke="rgba(0, 0, 0, 0.1)"/>')
+            ancora = 'middle' if abs(math.cos(angle)) < 0.3 else 'start' if math.cos(angle) > 0 else 'end'
+            contingut.append(self._text(x + 10 * math.cos(angle), y + 14 * math.sin(angle) + 4, eix, ancora=ancora,
+                                        color='#34495E', gruix='bold'))
+        for marca in range(pas, maxim + 1, pas):
+            etiqueta = 'Inacceptable' if marca <= 50 else 'Acceptable' if marca <= 68 else 'Bo/Excel·lent'
+            contingut.append(self._text(cx + 4, cy - radi * marca / maxim + 4, f'{marca} ({etiqueta})', ancora='start', mida=10))
+        
+        for _, valors, color in series:
+            punts = [punt(valor, angle) for valor, angle in zip(valors, angles)]
+            contingut.append(f'<polygon points="{poligon(punts)}" fill="{self._rgba(color, 0.2)}" '
+                             f'stroke="{self._rgba(color, 1)}" stroke-width="3"/>')
+            for (x, y), valor in zip(punts, valors):
+                contingut.append(f'<circle cx="{self._n(x)}" cy="{self._n(y)}" r="6" fill="{self._rgba(color, 1)}" '
+                                 f'stroke="#fff" stroke-width="2"><title>{valor:.1f}</title></circle>')
+        return self._svg(amplada, alcada, contingut)
+
+class ActiusInforme:
+    """Full d'estils i Chart.js dels informes: des del CDN, compartits entre informes o incrustats
+    
+    - 'cdn': estils incrustats i Chart.js des de cdnjs (comportament original).
+    - 'compartits': un CSS i un JS (Chart.js local) amb el hash del contingut al nom,
+      escrits una sola vegada al directori d'actius al costat dels informes.
+    - 'incrustat': tot dins de l'HTML, un sol fitxer que es pot obrir sense xarxa.
+    Chart.js es llegeix de la còpia local (vendor/chart.min.js) i el programa mai no el
+    descarrega: si no hi és, els modes 'compartits' i 'incrustat' avisen i l'informe el
+    carrega des del CDN. Els informes sense gràfics interactius només porten el CSS.
+    """
+    
+    MODES = ('cdn', 'compartits', 'incrustat')
+    URL_CHARTJS = 'https://cdnjs.cloudflare.com/ajax/libs/Chart.js/3.9.1/chart.min.js'
+    DIRECTORI_BASE = os.path.dirname(os.path.abspath(__file__))
+    RUTA_CSS = os.path.join(DIRECTORI_BASE, 'plantilla_informe.css')
+    RUTA_CHARTJS = os.path.join(DIRECTORI_BASE, 'vendor', 'chart.min.js')
+    
+    def __init__(self, mode='cdn', directori_actius='actius', ruta_chartjs=None):
+        if mode not in self.MODES:
+            raise ValueError(f"Mode d'actius desconegut: {mode} (possibles: {', '.join(self.MODES)})")
+        self.mode = mode
+        self.directori_actius = directori_actius
+        self.ruta_chartjs = ruta_chartjs or self.RUTA_CHARTJS
+        self._continguts = {}
+        self._avisat_sense_chartjs = False
+    
+    def _llegir(self, clau, ruta):
+        if clau not in self._continguts:
+            with open(ruta, 'r', encoding='utf-8', newline='') as f:
+                self._continguts[clau] = f.read()
+        return self._continguts[clau]
+    
+    def css(self):
+        return self._llegir('css', self.RUTA_CSS)
+    
+    @classmethod
+    def missatge_sense_chartjs(cls, ruta_chartjs=None):
+        ruta_chartjs = ruta_chartjs or cls.RUTA_CHARTJS
+        return (f"No es troba la còpia local de Chart.js ({ruta_chartjs}): l'informe el carregarà des del CDN "
+                f"i necessitarà xarxa per mostrar els gràfics. Per treballar sense xarxa, desa-la una vegada amb "
+                f"`curl -L --create-dirs -o {ruta_chartjs} {cls.URL_CHARTJS}`")
+    
+    def chartjs(self):
+        """Chart.js de la còpia local; sense còpia es falla en lloc de descarregar-lo"""
+        if not os.path.exists(self.ruta_chartjs):
+            raise FileNotFoundError(self.missatge_sense_chartjs(self.ruta_chartjs))
+        return self._llegir('chartjs', self.ruta_chartjs)
+    
+    def chartjs_local(self):
+        """Si hi ha còpia local de Chart.js; la primera vegada que falta s'avisa que es farà servir el CDN"""
+        if os.path.exists(self.ruta_chartjs):
+            return True
+        if not self._avisat_sense_chartjs:
+            print(f"⚠️ {self.missatge_sense_chartjs(self.ruta_chartjs)}")
+            self._avisat_sense_chartjs = True
+        return False
+    
+    def fitxers_compartits(self, amb_chartjs=True):
+        """{nom de fitxer amb hash: contingut} del paquet CSS i, si cal i hi ha còpia local, del de Chart.js"""
+        paquets = [('css', self.css())]
+        if amb_chartjs and self.chartjs_local():
+            paquets.append(('js', self.chartjs()))
+        fitxers = {}
+        for extensio, contingut in paquets:
+            dades = contingut.encode('utf-8')
+            fitxers[f'informe-{hashlib.sha256(dades).hexdigest()[:12]}.{extensio}'] = dades
+        return fitxers
+    
+    def capcalera(self, amb_chartjs=True):
+        """Etiquetes de la capçalera <head> que carreguen els estils i, si cal, Chart.js"""
+        script_cdn = f'<script src="{self.URL_CHARTJS}"></script>'
+        if self.mode == 'compartits':
+            etiquetes = []
+            for nom in self.fitxers_compartits(amb_chartjs):
+                ruta = f'{self.directori_actius}/{nom}'
+                etiquetes.append(f'<link rel="stylesheet" href="{ruta}">' if nom.endswith('.css')
+                                 else f'<script src="{ruta}"></script>')
+            if amb_chartjs and len(etiquetes) == 1:
+                etiquetes.append(script_cdn)
+            return '\n   '.join(etiquetes)
+        estils = f'<style>\n{self.css()}   </style>'
+        if not amb_chartjs:
+            return estils
+        if self.mode == 'incrustat' and self.chartjs_local():
+            # Un '</script' dins del codi tancaria l'etiqueta abans d'hora
+            chartjs = self.chartjs().replace('</script', '<\\/script')
+            return f'<script>\n{chartjs}\n   </script>\n   {estils}'
+        return f'{script_cdn}\n   {estils}'
+    
+    def desar(self, directori_informes, amb_chartjs=True):
+        """Escriure els paquets compartits al costat dels informes; els que ja hi són no es tornen a escriure"""
+        if self.mode != 'compartits':
+            return []
+        directori = os.path.join(directori_informes, self.directori_actius)
+        os.makedirs(directori, exist_ok=True)
+        escrits = []
+        for nom, dades in self.fitxers_compartits(amb_chartjs).items():
+            ruta = os.path.join(directori, nom)
+            if os.path.exists(ruta):
+                continue
+            # Temporal amb nom únic: diversos lots poden escriure el mateix actiu alhora
+            with tempfile.NamedTemporaryFile(dir=directori, suffix='.tmp', delete=False) as f:
+                f.write(dades)
+            try:
+                os.chmod(f.name, 0o644)
+                os.replace(f.name, ruta)
+            except BaseException:
+                if os.path.exists(f.name):
+                    os.remove(f.name)
+                raise
+            escrits.append(ruta)
+        return escrits
+
 class GeneradorInformeHTML:
     """Classe per generar informes HTML elegants"""
     
-    def __init__(self):
+    # Plantilla de l'informe, al costat d'aquest fitxer; es compila la primera vegada que es fa servir
+    RUTA_PLANTILLA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plantilla_informe.html')
+    _plantilles = {}
+    
+    @classmethod
+    def plantilla(cls, ruta=None, sense_blocs=()):
+        """Plantilla compilada, una sola vegada per procés, per ruta i per blocs eliminats"""
+        clau = (ruta or cls.RUTA_PLANTILLA, tuple(sense_blocs))
+        if clau not in cls._plantilles:
+            cls._plantilles[clau] = PlantillaInforme.de_fitxer(*clau)
+        return cls._plantilles[clau]
+    
+    MODES_GRAFICS = ('interactiu', 'estatic')
+    
+    def __init__(self, actius=None, grafics='interactiu'):
+        # Estils i Chart.js: des del CDN (per defecte), compartits entre informes o incrustats
+        self.actius = actius or ActiusInforme()
+        # Gràfics Chart.js al navegador ('interactiu') o SVG generats aquí, sense JavaScript ('estatic')
+        if grafics not in self.MODES_GRAFICS:
+            raise ValueError(f"Mode de gràfics desconegut: {grafics} (possibles: {', '.join(self.MODES_GRAFICS)})")
+        self.grafics = grafics
+        self.svg = GrafiquesSVG()
         self.colors = {
             'primari': '#2C3E50',
             'secundari': '#34495E', 
@@ -487,38 +2896,265 @@ class GeneradorInformeHTML:
             'uab': {'labels': uab_labels, 'values': uab_values, 'colors': uab_colors}
         }
     
-    def _generar_grafic_comparatiu_estadistiques(self, galeria, mapa):
-        """Generar dades per al gràfic comparatiu d'estadístiques"""
+    def _generar_grafic_comparatiu_estadistiques(self, instruments):
+        """Generar dades per al gràfic comparatiu d'estadístiques
+        
+        `instruments` és una llista de parells (instrument de l'esquema, estadístiques).
+        """
         return {
-            'galeria': {
-                'mediana': galeria.get('mediana', 0),
-                'desviacio': galeria.get('desviacio_tipica', 0),
-                'rang': galeria.get('maxim', 0) - galeria.get('minim', 0)
-            },
-            'mapa': {
-                'mediana': mapa.get('mediana', 0),
-                'desviacio': mapa.get('desviacio_tipica', 0),
-                'rang': mapa.get('maxim', 0) - mapa.get('minim', 0)
+            instrument['clau']: {
+                'mediana': estadistiques.get('mediana', 0),
+                'desviacio': estadistiques.get('desviacio_tipica', 0),
+                'rang': estadistiques.get('maxim', 0) - estadistiques.get('minim', 0)
             }
+            for instrument, estadistiques in instruments
+        }
+    
+    # Per sota d'aquesta mida les puntuacions codificades no es comprimeixen
+    MIDA_MINIMA_GZIP = 1024
+    
+    @staticmethod
+    def _json_compatible(valor):
+        """Valor amb tipus JSON estrictes: NaN i infinits com a null, escalars de NumPy com a Python"""
+        if isinstance(valor, dict):
+            return {str(clau): GeneradorInformeHTML._json_compatible(v) for clau, v in valor.items()}
+        if isinstance(valor, (list, tuple)):
+            return [GeneradorInformeHTML._json_compatible(v) for v in valor]
+        if isinstance(valor, np.generic):
+            valor = valor.item()
+        if isinstance(valor, float) and not math.isfinite(valor):
+            return None
+        if valor is None or isinstance(valor, (bool, int, float, str)):
+            return valor
+        return str(valor)
+    
+    def _codificar_puntuacions(self, llistes):
+        """Puntuacions de cada instrument en un sol bloc: unitats de 2.5 en uint8 (o float32), gzip i base64"""
+        valors = np.concatenate([np.asarray(llista, dtype=np.float64) for llista in llistes]) if llistes else np.zeros(0)
+        unitats = valors / 2.5
+        if np.array_equal(unitats, np.rint(unitats)) and (len(unitats) == 0 or (unitats.min() >= 0 and unitats.max() <= 40)):
+            codificacio, dades = 'unitats', unitats.astype(np.uint8).tobytes()
+        else:
+            codificacio, dades = 'float32', valors.astype('<f4').tobytes()
+        compressio = 'cap'
+        if len(dades) >= self.MIDA_MINIMA_GZIP:
+            compressio, dades = 'gzip', gzip.compress(dades, compresslevel=9, mtime=0)
+        return {
+            'codificacio': codificacio,
+            'compressio': compressio,
+            'longituds': [len(llista) for llista in llistes],
+            'dades': base64.b64encode(dades).decode('ascii')
+        }
+    
+    def _generar_illa_dades(self, instruments, demo, dades_demografia, dades_comparatives):
+        """Illa JSON única de l'informe (instruments, gràfics, demografia i puntuacions codificades)"""
+        entrades, puntuacions = [], []
+        for instrument, estadistiques in instruments:
+            puntuacions.append(estadistiques.get('puntuacions') or [])
+            entrades.append({
+                'nom': instrument['nom'],
+                'clau': instrument['clau'],
+                'titol': instrument['titol'],
+                'icona': instrument['icona'],
+                'color': ', '.join(str(component) for component in instrument['color']),
+                'mitjana': round(estadistiques.get('mitjana', 0), 1),
+                'amb_puntuacions': 'puntuacions' in estadistiques,
+                'estadistiques': {clau: valor for clau, valor in estadistiques.items() if clau != 'puntuacions'}
+            })
+        illa = self._json_compatible({
+            'instruments': entrades,
+            'grafics': dades_demografia,
+            'comparatives': dades_comparatives,
+            'demografia': demo
+        })
+        illa['puntuacions'] = self._codificar_puntuacions(puntuacions)
+        # '</' dins d'un <script> en tancaria l'etiqueta; '<\/' és el mateix text en JSON
+        return json.dumps(illa, ensure_ascii=False, allow_nan=False, separators=(',', ':')).replace('</', '<\\/')
+    
+    def _generar_grafics(self, instruments, dades_demografia, dades_comparatives):
+        """Contingut de cada gràfic: el <canvas> que pinta Chart.js o el SVG estàtic equivalent"""
+        if self.grafics == 'interactiu':
+            return {f'grafic_{nom}': f'<canvas id="{canvas}"></canvas>' for nom, canvas in (
+                ('sus', 'susChart'), ('estadistiques', 'statsComparisonChart'), ('edat', 'edatChart'),
+                ('tecnologia', 'tecnologiaChart'), ('uab', 'uabChart'))}
+        
+        grafics = {
+            'grafic_sus': self.svg.barres([f"{instrument['icona']} {instrument['titol']}" for instrument, _ in instruments],
+                                          [round(estadistiques.get('mitjana', 0), 1) for _, estadistiques in instruments],
+                                          [instrument['color'] for instrument, _ in instruments]),
+            'grafic_estadistiques': self.svg.radar(
+                ['Mediana', 'Desviació Típica', 'Rang'],
+                [(f"{instrument['icona']} {instrument['nom']}",
+                  [dades_comparatives[instrument['clau']][clau] for clau in ('mediana', 'desviacio', 'rang')],
+                  instrument['color']) for instrument, _ in instruments])
         }
+        for nom, clau in (('edat', 'edats'), ('tecnologia', 'tecnologia'), ('uab', 'uab')):
+            dades = dades_demografia[clau]
+            grafics[f'grafic_{nom}'] = self.svg.pastis(dades['labels'], dades['values'], dades['colors'])
+        return grafics
+    
+    def _instruments_informe(self, resultats):
+        """Parells (instrument, estadístiques) de l'esquema dels resultats, amb valors buits si falten"""
+        esquema = (EsquemaQuestionari(**resultats['esquema']) if resultats.get('esquema')
+                   else EsquemaQuestionari.per_defecte())
+        estadistiques_instruments = resultats.get('instruments') or {}
+        instruments = [(instrument, estadistiques_instruments.get(instrument['nom']) or resultats.get(instrument['clau']) or {})
+                       for instrument in esquema]
+        
+        # Gestionar dades mancants amb elegància
+        if not all(estadistiques for _, estadistiques in instruments):
+            print("⚠️ Avís: Falten resultats d'anàlisi, generant informe bàsic")
+            buides = {'mitjana': 0, 'mediana': 0, 'desviacio_tipica': 0, 'minim': 0, 'maxim': 0, 'comptatge': 0, 'nota': 'N/A', 'interpretacio': 'Sense dades', 'estat': 'danger', 'icona': '❌'}
+            instruments = [(instrument, estadistiques or dict(buides)) for instrument, estadistiques in instruments]
+        return esquema, instruments
+    
+    def _generar_resum_executiu(self, instruments):
+        """Puntuacions principals de cada instrument, separades per indicadors VS"""
+        blocs = [f"""<div style="text-align: center;">
+                       <h3>{instrument['icona']} {instrument['titol']}</h3>
+                       <div class="score-big">
+                           <div class="score-number">{estadistiques.get('mitjana', 0):.1f}</div>
+                           <div class="score-grade">{estadistiques.get('nota', 'N/A')} {estadistiques.get('icona', '')}</div>
+                           <div class="score-interpretation">{estadistiques.get('interpretacio', 'Sense dades')}</div>
+                       </div>
+                   </div>""" for instrument, estadistiques in instruments]
+        columnes = ' auto '.join(['1fr'] * len(blocs))
+        return (f'<div style="display: grid; grid-template-columns: {columnes}; align-items: center; gap: 20px;">\n'
+                '                   ' + '\n                   <div class="vs-indicator">VS</div>\n                   '.join(blocs) +
+                '\n               </div>')
+    
+    def _generar_targetes_estadistiques(self, instruments):
+        """Targetes d'estadístiques detallades, una per instrument"""
+        return '\n\n'.join(f"""           <!-- {instrument['nom']} Stats -->
+           <div class="card">
+               <div class="card-header">
+                   <div class="card-icon">{instrument['icona']}</div>
+                   <div class="card-title">{instrument['titol']}</div>
+               </div>
+               <div class="metric">
+                   <span class="metric-label">Puntuació Mitjana</span>
+                   <span class="metric-value">{estadistiques.get('mitjana', 0):.2f}</span>
+               </div>
+               <div class="metric">
+                   <span class="metric-label">Mediana</span>
+                   <span class="metric-value">{estadistiques.get('mediana', 0):.2f}</span>
+               </div>
+               <div class="metric">
+                   <span class="metric-label">Desviació Típica</span>
+                   <span class="metric-value">{estadistiques.get('desviacio_tipica', 0):.2f}</span>
+               </div>
+               <div class="metric">
+                   <span class="metric-label">Rang</span>
+                   <span class="metric-value">{estadistiques.get('minim', 0):.1f} - {estadistiques.get('maxim', 0):.1f}</span>
+               </div>
+               <div class="metric">
+                   <span class="metric-label">Qualificació</span>
+                   <span class="badge badge-{estadistiques.get('estat', 'info')}">{estadistiques.get('nota', 'N/A')}</span>
+               </div>{self._generar_metriques_interval(estadistiques.get('interval_confianca'))}
+           </div>""" for instrument, estadistiques in instruments)
+    
+    def _generar_metriques_interval(self, interval):
+        """Files d'intervals de confiança bootstrap (BCa) de la mitjana i la mediana"""
+        if not interval:
+            return ''
+        percentatge = f"{interval['nivell'] * 100:g}%"
+        return ''.join(f"""
+               <div class="metric">
+                   <span class="metric-label">IC {percentatge} {etiqueta} (BCa)</span>
+                   <span class="metric-value">{interval[clau]['bca'][0]:.1f} - {interval[clau]['bca'][1]:.1f}</span>
+               </div>""" for clau, etiqueta in [('mitjana', 'mitjana'), ('mediana', 'mediana')])
+    
+    def _generar_seccio_proves(self, comparacions):
+        """Targeta amb les proves de significació aparellades de cada parell d'eines"""
+        if not comparacions:
+            return ''
+        files = ''.join(f"""
+               <div class="metric">
+                   <span class="metric-label">{comparacio['nom']} (n={comparacio['comptatge']})</span>
+                   <span class="metric-value">t p={comparacio['t_aparellada']['p']:.4f} · Wilcoxon p={comparacio['wilcoxon']['p']:.4f} · permutació p={comparacio['permutacio']['p']:.4f} · dz={comparacio['cohen_dz']:.2f} ({comparacio['magnitud']})</span>
+                   <span class="badge badge-{'success' if comparacio['significativa'] else 'info'}">{'Significativa' if comparacio['significativa'] else 'No significativa'}</span>
+               </div>""" for comparacio in comparacions)
+        return f"""
+       <!-- Proves aparellades -->
+       <div class="card full-width">
+           <div class="card-header">
+               <div class="card-icon">🔬</div>
+               <div class="card-title">Proves de Significació Aparellades (α = {comparacions[0]['alfa']:g})</div>
+           </div>{files}
+       </div>
+"""
+    
+    def _generar_seccio_diferencies(self, diferencies):
+        """Targeta amb la diferència aparellada entre cada parell d'eines i els seus intervals bootstrap"""
+        if not diferencies:
+            return ''
+        interval = diferencies[0]['interval_confianca']
+        percentatge = f"{interval['nivell'] * 100:g}%"
+        files = ''.join(f"""
+               <div class="metric">
+                   <span class="metric-label">{diferencia['nom']} (n={diferencia['comptatge']})</span>
+                   <span class="metric-value">{diferencia['mitjana']:+.1f} punts · IC {percentatge} BCa {diferencia['interval_confianca']['mitjana']['bca'][0]:+.1f} a {diferencia['interval_confianca']['mitjana']['bca'][1]:+.1f} · percentil {diferencia['interval_confianca']['mitjana']['percentil'][0]:+.1f} a {diferencia['interval_confianca']['mitjana']['percentil'][1]:+.1f}</span>
+               </div>""" for diferencia in diferencies)
+        return f"""
+       <!-- Diferències entre eines -->
+       <div class="card full-width">
+           <div class="card-header">
+               <div class="card-icon">🎲</div>
+               <div class="card-title">Diferències entre Eines (bootstrap, {interval['replicats']} rèpliques)</div>
+           </div>{files}
+       </div>
+"""
+    
+    def _generar_seccio_segments(self, segments, esquema):
+        """Targeta amb una taula de puntuacions SUS per a cada dimensió demogràfica i els seus creuaments"""
+        if not segments:
+            return ''
+        etiquetes = AnalitzadorSUS.ROLS_SEGMENTACIO
+        taules = ''
+        for dimensio, files in segments.items():
+            rols = dimensio.split(' × ')
+            # Els valors dels segments són el text que els enquestats han escrit al formulari
+            capcalera = ''.join(f'<th>{html.escape(str(etiquetes.get(rol, rol)))}</th>' for rol in rols) + '<th>n</th>' + ''.join(
+                f'<th>{html.escape(instrument["icona"])} {html.escape(instrument["nom"])}</th>' for instrument in esquema)
+            cossos = ''
+            for fila in files:
+                celles_fila = ''.join(f'<td>{html.escape(str(fila["segment"][rol]))}</td>' for rol in rols) + f'<td>{fila["comptatge"]}</td>'
+                for instrument in esquema:
+                    estadistiques = fila['instruments'].get(instrument['nom'])
+                    celles_fila += '<td>—</td>' if estadistiques is None else (
+                        f'<td>{estadistiques["mitjana"]:.1f} <span class="segment-detall">'
+                        f'(Md {estadistiques["mediana"]:.1f}, n={estadistiques["comptatge"]})</span></td>')
+                cossos += f"""
+                       <tr>{celles_fila}</tr>"""
+            taules += f"""
+               <h4 class="segment-titol">{html.escape(' × '.join(str(etiquetes.get(rol, rol)) for rol in rols))}</h4>
+               <div class="segment-scroll">
+                   <table class="segment-table">
+                       <thead><tr>{capcalera}</tr></thead>
+                       <tbody>{cossos}
+                       </tbody>
+                   </table>
+               </div>"""
+        return f"""
+       <!-- Segmentació demogràfica -->
+       <div class="card full-width">
+           <div class="card-header">
+               <div class="card-icon">👥</div>
+               <div class="card-title">Segmentació Demogràfica (mitjana SUS per segment)</div>
+           </div>{taules}
+       </div>
+"""
     
     def generar_informe_html(self, resultats, url_base_dades=None):
         """Generar informe HTML complet"""
         
-        galeria = resultats.get('galeria', {})
-        mapa = resultats.get('mapa', {})
+        esquema, instruments = self._instruments_informe(resultats)
         demo = resultats.get('demografia', {})
         recomanacions = resultats.get('recomanacions', [])
         
-        # Gestionar dades mancants amb elegància
-        if not galeria or not mapa:
-            print("⚠️ Avís: Falten resultats d'anàlisi, generant informe bàsic")
-            galeria = galeria or {'mitjana': 0, 'mediana': 0, 'desviacio_tipica': 0, 'minim': 0, 'maxim': 0, 'comptatge': 0, 'nota': 'N/A', 'interpretacio': 'Sense dades', 'estat': 'danger', 'icona': '❌'}
-            mapa = mapa or {'mitjana': 0, 'mediana': 0, 'desviacio_tipica': 0, 'minim': 0, 'maxim': 0, 'comptatge': 0, 'nota': 'N/A', 'interpretacio': 'Sense dades', 'estat': 'danger', 'icona': '❌'}
-        
         # Generar dades per als gràfics
         dades_demografia = self._generar_dades_grafics_demografia(demo)
-        dades_comparatives = self._generar_grafic_comparatiu_estadistiques(galeria, mapa)
+        dades_comparatives = self._generar_grafic_comparatiu_estadistiques(instruments)
         
         # Secció de base de dades
         seccio_base_dades = ""
@@ -547,888 +3183,41 @@ class GeneradorInformeHTML:
             </div>
             """
         
-        # Variables JavaScript amb valors reals
-        puntuacio_galeria_js = galeria.get('mitjana', 0)
-        puntuacio_mapa_js = mapa.get('mitjana', 0)
         
-        contingut_html = f"""
-
-<!DOCTYPE html>
-<html lang="ca">
-<head>
-   <meta charset="UTF-8">
-   <meta name="viewport" content="width=device-width, initial-scale=1.0">
-   <title>Informe SUS - Galeria vs Mapa Botànic</title>
-   <script src="https://cdnjs.cloudflare.com/ajax/libs/Chart.js/3.9.1/chart.min.js"></script>
-   <style>
-       * {{
-           margin: 0;
-           padding: 0;
-           box-sizing: border-box;
-       }}
-       
-       body {{
-           font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-           background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-           color: #333;
-           line-height: 1.6;
-           min-height: 100vh;
-       }}
-       
-       .container {{
-           max-width: 1400px;
-           margin: 0 auto;
-           padding: 20px;
-       }}
-       
-       .header {{
-           background: linear-gradient(135deg, #2C3E50 0%, #34495E 100%);
-           color: white;
-           text-align: center;
-           padding: 40px 20px;
-           border-radius: 20px;
-           margin-bottom: 30px;
-           box-shadow: 0 15px 35px rgba(0,0,0,0.1);
-       }}
-       
-       .header h1 {{
-           font-size: 2.5rem;
-           margin-bottom: 10px;
-           font-weight: 700;
-       }}
-       
-       .header p {{
-           font-size: 1.2rem;
-           opacity: 0.9;
-           margin-bottom: 5px;
-       }}
-       
-       .grid {{
-           display: grid;
-           grid-template-columns: repeat(auto-fit, minmax(350px, 1fr));
-           gap: 30px;
-           margin-bottom: 30px;
-       }}
-       
-       .card {{
-           background: white;
-           border-radius: 20px;
-           padding: 30px;
-           box-shadow: 0 15px 35px rgba(0,0,0,0.08);
-           border: 1px solid rgba(255,255,255,0.2);
-           backdrop-filter: blur(10px);
-           transition: transform 0.3s ease, box-shadow 0.3s ease;
-           margin-bottom: 50px;
-       }}
-       
-       .card:hover {{
-           transform: translateY(-5px);
-           box-shadow: 0 25px 45px rgba(0,0,0,0.15);
-       }}
-       
-       .card-header {{
-           display: flex;
-           align-items: center;
-           margin-bottom: 25px;
-           padding-bottom: 15px;
-           border-bottom: 2px solid #f8f9fa;
-       }}
-       
-       .card-icon {{
-           font-size: 2.5rem;
-           margin-right: 15px;
-       }}
-       
-       .card-title {{
-           font-size: 1.5rem;
-           font-weight: 700;
-           color: #2C3E50;
-       }}
-       
-       .metric {{
-           display: flex;
-           justify-content: space-between;
-           align-items: center;
-           padding: 15px 0;
-           border-bottom: 1px solid #f1f2f6;
-       }}
-       
-       .metric:last-child {{
-           border-bottom: none;
-       }}
-       
-       .metric-label {{
-           font-weight: 600;
-           color: #34495E;
-       }}
-       
-       .metric-value {{
-           font-weight: 700;
-           font-size: 1.1rem;
-       }}
-       
-       .score-big {{
-           text-align: center;
-           margin: 20px 0;
-       }}
-       
-       .score-number {{
-           font-size: 4rem;
-           font-weight: 900;
-           margin-bottom: 10px;
-           background: linear-gradient(135deg, #8E44AD, #3498DB);
-           -webkit-background-clip: text;
-           -webkit-text-fill-color: transparent;
-       }}
-       
-       .score-grade {{
-           font-size: 1.8rem;
-           font-weight: 700;
-           margin-bottom: 5px;
-       }}
-       
-       .score-interpretation {{
-           font-size: 1.2rem;
-           color: #7F8C8D;
-           font-style: italic;
-       }}
-       
-       .badge {{
-           display: inline-block;
-           padding: 8px 16px;
-           border-radius: 25px;
-           font-weight: 600;
-           font-size: 0.9rem;
-           text-transform: uppercase;
-           letter-spacing: 0.5px;
-       }}
-       
-       .badge-success {{ background: linear-gradient(135deg, #27AE60, #2ECC71); color: white; }}
-       .badge-warning {{ background: linear-gradient(135deg, #F39C12, #E67E22); color: white; }}
-       .badge-danger {{ background: linear-gradient(135deg, #E74C3C, #C0392B); color: white; }}
-       .badge-info {{ background: linear-gradient(135deg, #3498DB, #2980B9); color: white; }}
-       
-       .recommendation {{
-           background: linear-gradient(135deg, #f8f9fa, #ffffff);
-           border-left: 5px solid #3498DB;
-           padding: 20px;
-           margin: 15px 0;
-           border-radius: 10px;
-           transition: all 0.3s ease;
-       }}
-       
-       .recommendation:hover {{
-           transform: translateX(5px);
-           box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-       }}
-       
-       .recommendation-header {{
-           display: flex;
-           align-items: center;
-           margin-bottom: 10px;
-       }}
-       
-       .recommendation-icon {{
-           font-size: 1.5rem;
-           margin-right: 10px;
-       }}
-       
-       .recommendation-title {{
-           font-weight: 700;
-           color: #2C3E50;
-       }}
-       
-       .recommendation-message {{
-           color: #34495E;
-           line-height: 1.5;
-       }}
-       
-       .chart-container {{
-           position: relative;
-           height: 400px;
-           margin: 20px 0;
-       }}
-       
-       .chart-container-small {{
-           position: relative;
-           height: 300px;
-           margin: 20px 0;
-       }}
-       
-       .full-width {{
-           grid-column: 1 / -1;
-       }}
-       
-       .comparison-container {{
-           background: linear-gradient(135deg, #f8f9fa, #ffffff);
-           border-radius: 15px;
-           padding: 25px;
-           margin: 20px 0;
-       }}
-       
-       .vs-indicator {{
-           text-align: center;
-           font-size: 3rem;
-           font-weight: 900;
-           color: #E74C3C;
-           margin: 20px 0;
-       }}
-       
-       .export-buttons {{
-           text-align: center;
-           margin: 30px 0;
-       }}
-       
-       .btn {{
-           display: inline-block;
-           padding: 12px 30px;
-           background: linear-gradient(135deg, #3498DB, #2980B9);
-           color: white;
-           text-decoration: none;
-           border-radius: 25px;
-           font-weight: 600;
-           margin: 0 10px;
-           transition: all 0.3s ease;
-           border: none;
-           cursor: pointer;
-       }}
-       
-       .btn:hover {{
-           transform: translateY(-2px);
-           box-shadow: 0 10px 25px rgba(52, 152, 219, 0.3);
-       }}
-       
-       .demographic-grid {{
-           display: grid;
-           grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-           gap: 20px;
-           margin: 20px 0;
-       }}
-       
-       .stat-comparison-container {{
-           background: linear-gradient(135deg, #e8f5e8, #f0f8f0);
-           border-radius: 15px;
-           padding: 25px;
-           margin: 20px 0;
-           position: relative;
-           overflow: hidden;
-       }}
-       
-       .stat-comparison-container::before {{
-           content: '';
-           position: absolute;
-           top: 0;
-           left: 0;
-           right: 0;
-           bottom: 0;
-           background: linear-gradient(90deg, 
-               rgba(220,53,69,0.8) 0%, 
-               rgba(255,193,7,0.8) 25%, 
-               rgba(255,193,7,0.8) 50%, 
-               rgba(40,167,69,0.8) 75%, 
-               rgba(40,167,69,0.8) 100%);
-           opacity: 0.1;
-           z-index: 0;
-       }}
-       
-       .stat-comparison-content {{
-           position: relative;
-           z-index: 1;
-       }}
-       
-       @media (max-width: 768px) {{
-           .grid {{
-               grid-template-columns: 1fr;
-           }}
-           .header h1 {{
-               font-size: 2rem;
-           }}
-           .score-number {{
-               font-size: 3rem;
-           }}
-           .demographic-grid {{
-               grid-template-columns: 1fr;
-           }}
-       }}
-   </style>
-</head>
-<body>
-   <div class="container">
-       <div class="header">
-            <h1>📊 Informe d'Anàlisi SUS</h1>
-            <p>Galeria Botànica vs Mapa Botànic</p>
-            <p>Generat el {datetime.now().strftime('%d/%m/%Y %H:%M')}</p>
-            <div style="margin-top: 15px;">
-                <a href="https://github.com/PoltorProgrammer/Analisi_SUS?tab=readme-ov-file#analitzador-sus" target="_blank" class="btn">
-                    🛠️ Veure a GitHub
-                </a>
-            </div>
-       </div>
-       
-       <!-- Resum Executiu -->
-       <div class="card full-width">
-           <div class="card-header">
-               <div class="card-icon">🎯</div>
-               <div class="card-title">Resum Executiu</div>
-           </div>
-           <div class="comparison-container">
-               <div style="display: grid; grid-template-columns: 1fr auto 1fr; align-items: center; gap: 20px;">
-                   <div style="text-align: center;">
-                       <h3>🖼️ Galeria Botànica</h3>
-                       <div class="score-big">
-                           <div class="score-number">{galeria.get('mitjana', 0):.1f}</div>
-                           <div class="score-grade">{galeria.get('nota', 'N/A')} {galeria.get('icona', '')}</div>
-                           <div class="score-interpretation">{galeria.get('interpretacio', 'Sense dades')}</div>
-                       </div>
-                   </div>
-                   <div class="vs-indicator">VS</div>
-                   <div style="text-align: center;">
-                       <h3>🗺️ Mapa Botànic</h3>
-                       <div class="score-big">
-                           <div class="score-number">{mapa.get('mitjana', 0):.1f}</div>
-                           <div class="score-grade">{mapa.get('nota', 'N/A')} {mapa.get('icona', '')}</div>
-                           <div class="score-interpretation">{mapa.get('interpretacio', 'Sense dades')}</div>
-                       </div>
-                   </div>
-               </div>
-           </div>
-       </div>
-
-<!-- Explicació del Mètode SUS -->
-        <div class="card full-width">
-            <div class="card-header">
-                <div class="card-icon">📚</div>
-                <div class="card-title">Què és el System Usability Scale (SUS)?</div>
-            </div>
-            <div style="padding: 20px; background: linear-gradient(135deg, #f8f9fa, #ffffff); border-radius: 15px; margin: 20px 0;">
-                <h4 style="color: #2C3E50; margin-bottom: 15px;">📖 Introducció al Mètode</h4>
-                <p style="line-height: 1.6; margin-bottom: 15px;">
-                    El <strong>System Usability Scale (SUS)</strong> és un qüestionari estandarditzat desenvolupat per John Brooke el 1986 
-                    per avaluar la usabilitat percebuda d'un sistema. És una eina àmpliament utilitzada en la investigació d'experiència 
-                    d'usuari (UX) i és reconeguda per la seva simplicitat i fiabilitat.
-                </p>
-                
-                <h4 style="color: #2C3E50; margin: 20px 0 15px 0;">🎯 Característiques Clau</h4>
-                <ul style="line-height: 1.6; margin-left: 20px;">
-                    <li><strong>10 preguntes</strong> amb escala Likert de 5 punts (1=Totalment en desacord, 5=Totalment d'acord)</li>
-                    <li><strong>Preguntes alternades</strong>: 5 positives (1, 3, 5, 7, 9) i 5 negatives (2, 4, 6, 8, 10)</li>
-                    <li><strong>Puntuació de 0 a 100</strong> que no representa un percentatge sinó una escala de usabilitat</li>
-                    <li><strong>Ràpid i econòmic</strong>: es pot completar en 2-3 minuts</li>
-                </ul>
-
-                <h4 style="color: #2C3E50; margin: 20px 0 15px 0;">🔢 Interpretació de Puntuacions</h4>
-                <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(150px, 1fr)); gap: 15px; margin: 15px 0;">
-                    <div style="background: #dc3545; color: white; padding: 10px; border-radius: 8px; text-align: center;">
-                        <strong>0-50</strong><br>Inacceptable ❌
-                    </div>
-                    <div style="background: #ffc107; color: #212529; padding: 10px; border-radius: 8px; text-align: center;">
-                        <strong>50-68</strong><br>Acceptable ⚠️
-                    </div>
-                    <div style="background: #17a2b8; color: white; padding: 10px; border-radius: 8px; text-align: center;">
-                        <strong>68-80</strong><br>Bo 👍
-                    </div>
-                    <div style="background: #28a745; color: white; padding: 10px; border-radius: 8px; text-align: center;">
-                        <strong>80-100</strong><br>Excel·lent ⭐
-                    </div>
-                </div>
-            </div>
-        </div>
-
-        <!-- Càlcul Detallat del SUS -->
-        <div class="card full-width">
-            <div class="card-header">
-                <div class="card-icon">🧮</div>
-                <div class="card-title">Com es Calcula la Puntuació SUS?</div>
-            </div>
-            <div style="padding: 20px; background: linear-gradient(135deg, #e8f4fd, #ffffff); border-radius: 15px; margin: 20px 0;">
-                <h4 style="color: #2C3E50; margin-bottom: 15px;">📝 Procés de Càlcul Pas a Pas</h4>
-                
-                <div style="background: #fff; padding: 15px; border-radius: 10px; margin: 15px 0; border-left: 4px solid #3498DB;">
-                    <h5 style="color: #2C3E50;">1️⃣ Transformació de Respostes</h5>
-                    <p><strong>Preguntes positives (1, 3, 5, 7, 9):</strong> Puntuació = Resposta - 1</p>
-                    <p><strong>Preguntes negatives (2, 4, 6, 8, 10):</strong> Puntuació = 5 - Resposta</p>
-                    <p style="font-style: italic; color: #7F8C8D;">Aquesta transformació converteix totes les respostes en una escala de 0-4 punts.</p>
-                </div>
-
-                <div style="background: #fff; padding: 15px; border-radius: 10px; margin: 15px 0; border-left: 4px solid #E67E22;">
-                    <h5 style="color: #2C3E50;">2️⃣ Suma Total</h5>
-                    <p>S'afegeixen totes les puntuacions transformades (rang: 0-40 punts)</p>
-                </div>
-
-                <div style="background: #fff; padding: 15px; border-radius: 10px; margin: 15px 0; border-left: 4px solid #27AE60;">
-                    <h5 style="color: #2C3E50;">3️⃣ Escalatge Final</h5>
-                    <p><strong>Puntuació SUS = Suma Total × 2.5</strong></p>
-                    <p style="font-style: italic; color: #7F8C8D;">Això converteix el rang 0-40 en una escala de 0-100 punts.</p>
-                </div>
-
-                <h4 style="color: #2C3E50; margin: 20px 0 15px 0;">💡 Exemple Pràctic</h4>
-                <div style="background: #f8f9fa; padding: 15px; border-radius: 10px; font-family: monospace;">
-                    <p><strong>Respostes d'un usuari:</strong> [4, 2, 5, 1, 4, 2, 5, 1, 4, 2]</p>
-                    <br>
-                    <p><strong>Transformacions:</strong></p>
-                    <p>P1 (positiva): 4 - 1 = 3</p>
-                    <p>P2 (negativa): 5 - 2 = 3</p>
-                    <p>P3 (positiva): 5 - 1 = 4</p>
-                    <p>P4 (negativa): 5 - 1 = 4</p>
-                    <p>... i així successivament</p>
-                    <br>
-                    <p><strong>Suma total:</strong> 30 punts</p>
-                    <p><strong>Puntuació SUS:</strong> 30 × 2.5 = <span style="color: #E67E22; font-weight: bold;">75 punts</span> (Bo 👍)</p>
-                </div>
-            </div>
-        </div>
-
-        <!-- Comentat: Gràfic de comparació principal
-        <div class="card full-width">
-            <div class="card-header">
-                <div class="card-icon">📊</div>
-                <div class="card-title">Comparació de Puntuacions SUS</div>
-            </div>
-            <div class="chart-container">
-                <canvas id="susChart"></canvas>
-            </div>
-        </div>
-        -->
-
-       <!-- Estadístiques Detallades -->
-       <div class="grid">
-           <!-- Galeria Stats -->
-           <div class="card">
-               <div class="card-header">
-                   <div class="card-icon">🖼️</div>
-                   <div class="card-title">Galeria Botànica</div>
-               </div>
-               <div class="metric">
-                   <span class="metric-label">Puntuació Mitjana</span>
-                   <span class="metric-value">{galeria.get('mitjana', 0):.2f}</span>
-               </div>
-               <div class="metric">
-                   <span class="metric-label">Mediana</span>
-                   <span class="metric-value">{galeria.get('mediana', 0):.2f}</span>
-               </div>
-               <div class="metric">
-                   <span class="metric-label">Desviació Típica</span>
-                   <span class="metric-value">{galeria.get('desviacio_tipica', 0):.2f}</span>
-               </div>
-               <div class="metric">
-                   <span class="metric-label">Rang</span>
-                   <span class="metric-value">{galeria.get('minim', 0):.1f} - {galeria.get('maxim', 0):.1f}</span>
-               </div>
-               <div class="metric">
-                   <span class="metric-label">Qualificació</span>
-                   <span class="badge badge-{galeria.get('estat', 'info')}">{galeria.get('nota', 'N/A')}</span>
-               </div>
-           </div>
-
-           <!-- Mapa Stats -->
-           <div class="card">
-               <div class="card-header">
-                   <div class="card-icon">🗺️</div>
-                   <div class="card-title">Mapa Botànic</div>
-               </div>
-               <div class="metric">
-                   <span class="metric-label">Puntuació Mitjana</span>
-                   <span class="metric-value">{mapa.get('mitjana', 0):.2f}</span>
-               </div>
-               <div class="metric">
-                   <span class="metric-label">Mediana</span>
-                   <span class="metric-value">{mapa.get('mediana', 0):.2f}</span>
-               </div>
-               <div class="metric">
-                   <span class="metric-label">Desviació Típica</span>
-                   <span class="metric-value">{mapa.get('desviacio_tipica', 0):.2f}</span>
-               </div>
-               <div class="metric">
-                   <span class="metric-label">Rang</span>
-                   <span class="metric-value">{mapa.get('minim', 0):.1f} - {mapa.get('maxim', 0):.1f}</span>
-               </div>
-               <div class="metric">
-                   <span class="metric-label">Qualificació</span>
-                   <span class="badge badge-{mapa.get('estat', 'info')}">{mapa.get('nota', 'N/A')}</span>
-               </div>
-           </div>
-       </div>
-
-       <!-- Anàlisi Comparativa Avançada -->
-       <div class="card full-width">
-           <div class="card-header">
-               <div class="card-icon">⚖️</div>
-               <div class="card-title">Anàlisi Comparativa d'Estadístiques</div>
-           </div>
-           <div class="stat-comparison-container">
-               <div class="stat-comparison-content">
-                   <div class="chart-container">
-                       <canvas id="statsComparisonChart"></canvas>
-                   </div>
-               </div>
-           </div>
-       </div>
-
-       <!-- Demografia -->
-       <div class="card full-width">
-           <div class="card-header">
-               <div class="card-icon">👥</div>
-               <div class="card-title">Perfil Demogràfic dels Participants</div>
-           </div>
-           <div class="demographic-grid">
-               <div class="chart-container-small">
-                   <h4 style="text-align: center; margin-bottom: 15px;">Distribució per Edat 👨🏻‍👧🏻</h4>
-                   <canvas id="edatChart"></canvas>
-               </div>
-               <div class="chart-container-small">
-                   <h4 style="text-align: center; margin-bottom: 15px;">Familiaritat Tecnològica 💻</h4>
-                   <canvas id="tecnologiaChart"></canvas>
-               </div>
-               <div class="chart-container-small">
-                   <h4 style="text-align: center; margin-bottom: 15px;">Experiència UAB 🎓</h4>
-                   <canvas id="uabChart"></canvas>
-               </div>
-           </div>
-           <div style="text-align: center; margin-top: 20px; padding: 20px; background: #f8f9fa; border-radius: 10px;">
-               <h4>📈 Resum Demogràfic</h4>
-               <p><strong>Total de participants:</strong> {demo.get('total_respostes', 0)}</p>
-               <p><strong>Familiaritat tecnològica mitjana:</strong> {demo.get('familiaritat_tec_mitja', 0):.1f}/5</p>
-               <p><strong>Amb experiència UAB:</strong> {demo.get('experiencia_uab_si', 0)} | <strong>Sense experiència:</strong> {demo.get('experiencia_uab_no', 0)}</p>
-           </div>
-       </div>
-
-       <!-- Recomanacions -->
-       <div class="card full-width">
-           <div class="card-header">
-               <div class="card-icon">💡</div>
-               <div class="card-title">Recomanacions i Pròxims Passos</div>
-           </div>
-           {self._generar_recomanacions_html(recomanacions)}
-       </div>
-
-       {seccio_base_dades}
-
-       <!-- Botons d'Exportació -->
-       <div class="export-buttons">
-           <button onclick="exportToJSON()" class="btn">📄 Exportar JSON</button>
-           <button onclick="exportToCSV()" class="btn">📊 Exportar CSV</button>
-       </div>
-</div>
-   </div>
-
-   <script>
-       // Dades del gràfic
-       const puntuacioGaleria = {puntuacio_galeria_js:.1f};
-       const puntuacioMapa = {puntuacio_mapa_js:.1f};
-       
-       // Dades demogràfiques
-       const dadesEdat = {json.dumps(dades_demografia['edats'])};
-       const dadesTecnologia = {json.dumps(dades_demografia['tecnologia'])};
-       const dadesUab = {json.dumps(dades_demografia['uab'])};
-       
-       // Dades estadístiques comparatives
-       const dadesComparatives = {json.dumps(dades_comparatives)};
-       
-       // Configuració del gràfic
-       Chart.defaults.font.family = "'Segoe UI', Tahoma, Geneva, Verdana, sans-serif";
-       Chart.defaults.font.size = 12;
-       
-       // Gràfic de comparació SUS
-       if (document.getElementById('susChart')) {{
-           new Chart(document.getElementById('susChart'), {{
-               type: 'bar',
-               data: {{
-                   labels: ['🖼️ Galeria Botànica', '🗺️ Mapa Botànic'],
-                   datasets: [{{
-                       label: 'Puntuació SUS',
-                       data: [puntuacioGaleria, puntuacioMapa],
-                       backgroundColor: [
-                           'rgba(142, 68, 173, 0.8)',
-                           'rgba(230, 126, 34, 0.8)'
-                       ],
-                       borderColor: [
-                           'rgba(142, 68, 173, 1)',
-                           'rgba(230, 126, 34, 1)'
-                       ],
-                       borderWidth: 3,
-                       borderRadius: 15
-                   }}]
-               }},
-               options: {{
-                   responsive: true,
-                   maintainAspectRatio: false,
-                   scales: {{
-                       y: {{
-                           beginAtZero: true,
-                           max: 100,
-                           ticks: {{
-                               callback: function(value) {{
-                                   return value + ' pts';
-                               }}
-                           }}
-                       }}
-                   }},
-                   plugins: {{
-                       legend: {{
-                           display: false
-                       }},
-                       tooltip: {{
-                           callbacks: {{
-                               label: function(context) {{
-                                   const percentage = ((context.parsed.y / 100) * 100).toFixed(1);
-                                   return context.label + ': ' + context.parsed.y + ' pts (' + percentage + '%)';
-                               }}
-                           }}
-                       }}
-                   }}
-               }}
-           }});
-       }}
-       
-       // Gràfic comparatiu d'estadístiques amb fons de colors
-       if (document.getElementById('statsComparisonChart')) {{
-           new Chart(document.getElementById('statsComparisonChart'), {{
-               type: 'radar',
-               data: {{
-                   labels: ['Mediana', 'Desviació Típica', 'Rang'],
-                   datasets: [{{
-                       label: '🖼️ Galeria',
-                       data: [
-                           dadesComparatives.galeria.mediana,
-                           dadesComparatives.galeria.desviacio,
-                           dadesComparatives.galeria.rang
-                       ],
-                       borderColor: 'rgba(142, 68, 173, 1)',
-                       backgroundColor: 'rgba(142, 68, 173, 0.2)',
-                       borderWidth: 3,
-                       pointBackgroundColor: 'rgba(142, 68, 173, 1)',
-                       pointBorderColor: '#fff',
-                       pointBorderWidth: 2,
-                       pointRadius: 6
-                   }}, {{
-                       label: '🗺️ Mapa',
-                       data: [
-                           dadesComparatives.mapa.mediana,
-                           dadesComparatives.mapa.desviacio,
-                           dadesComparatives.mapa.rang
-                       ],
-                       borderColor: 'rgba(230, 126, 34, 1)',
-                       backgroundColor: 'rgba(230, 126, 34, 0.2)',
-                       borderWidth: 3,
-                       pointBackgroundColor: 'rgba(230, 126, 34, 1)',
-                       pointBorderColor: '#fff',
-                       pointBorderWidth: 2,
-                       pointRadius: 6
-                   }}]
-               }},
-               options: {{
-                   responsive: true,
-                   maintainAspectRatio: false,
-                   scales: {{
-                       r: {{
-                           beginAtZero: true,
-                           max: 100,
-                           ticks: {{
-                               stepSize: 20,
-                               callback: function(value) {{
-                                   if (value <= 50) return value + ' (Inacceptable)';
-                                   if (value <= 68) return value + ' (Acceptable)';
-                                   return value + ' (Bo/Excel·lent)';
-                               }}
-                           }},
-                           grid: {{
-                               color: function(context) {{
-                                   const value = context.tick.value;
-                                   if (value <= 50) return 'rgba(220, 53, 69, 0.3)';
-                                   if (value <= 68) return 'rgba(255, 193, 7, 0.3)';
-                                   return 'rgba(40, 167, 69, 0.3)';
-                               }}
-                           }},
-                           angleLines: {{
-                               color: 'rgba(0, 0, 0, 0.1)'
-                           }}
-                       }}
-                   }},
-                   plugins: {{
-                       legend: {{
-                           position: 'top',
-                           labels: {{
-                               padding: 20,
-                               usePointStyle: true
-                           }}
-                       }},
-                       tooltip: {{
-                           callbacks: {{
-                               label: function(context) {{
-                                   return context.dataset.label + ': ' + context.parsed.r.toFixed(1);
-                               }}
-                           }}
-                       }}
-                   }}
-               }}
-           }});
-       }}
-       
-       // Gràfic de formatge per edat
-       if (document.getElementById('edatChart') && dadesEdat.values.length > 0) {{
-           new Chart(document.getElementById('edatChart'), {{
-               type: 'pie',
-               data: {{
-                   labels: dadesEdat.labels,
-                   datasets: [{{
-                       data: dadesEdat.values,
-                       backgroundColor: dadesEdat.colors,
-                       borderWidth: 2,
-                       borderColor: '#fff'
-                   }}]
-               }},
-               options: {{
-                   responsive: true,
-                   maintainAspectRatio: false,
-                   plugins: {{
-                       legend: {{
-                           position: 'bottom',
-                           labels: {{
-                               padding: 20,
-                               usePointStyle: true
-                           }}
-                       }},
-                       tooltip: {{
-                           callbacks: {{
-                               label: function(context) {{
-                                   const total = context.dataset.data.reduce((a, b) => a + b, 0);
-                                   const percentage = ((context.parsed * 100) / total).toFixed(1);
-                                   return context.label + ': ' + context.parsed + ' (' + percentage + '%)';
-                               }}
-                           }}
-                       }}
-                   }}
-               }}
-           }});
-       }}
-       
-       // Gràfic de formatge per familiaritat tecnològica
-       if (document.getElementById('tecnologiaChart') && dadesTecnologia.values.length > 0) {{
-           new Chart(document.getElementById('tecnologiaChart'), {{
-               type: 'pie',
-               data: {{
-                   labels: dadesTecnologia.labels,
-                   datasets: [{{
-                       data: dadesTecnologia.values,
-                       backgroundColor: dadesTecnologia.colors,
-                       borderWidth: 2,
-                       borderColor: '#fff'
-                   }}]
-               }},
-               options: {{
-                   responsive: true,
-                   maintainAspectRatio: false,
-                   plugins: {{
-                       legend: {{
-                           position: 'bottom',
-                           labels: {{
-                               padding: 20,
-                               usePointStyle: true
-                           }}
-                       }},
-                       tooltip: {{
-                           callbacks: {{
-                               label: function(context) {{
-                                   const total = context.dataset.data.reduce((a, b) => a + b, 0);
-                                   const percentage = ((context.parsed * 100) / total).toFixed(1);
-                                   return context.label + ': ' + context.parsed + ' (' + percentage + '%)';
-                               }}
-                           }}
-                       }}
-                   }}
-               }}
-           }});
-       }}
-       
-       // Gràfic de formatge per experiència UAB
-       if (document.getElementById('uabChart') && dadesUab.values.length > 0) {{
-           new Chart(document.getElementById('uabChart'), {{
-               type: 'pie',
-               data: {{
-                   labels: dadesUab.labels,
-                   datasets: [{{
-                       data: dadesUab.values,
-                       backgroundColor: dadesUab.colors,
-                       borderWidth: 2,
-                       borderColor: '#fff'
-                   }}]
-               }},
-               options: {{
-                   responsive: true,
-                   maintainAspectRatio: false,
-                   plugins: {{
-                       legend: {{
-                           position: 'bottom',
-                           labels: {{
-                               padding: 20,
-                               usePointStyle: true
-                           }}
-                       }},
-                       tooltip: {{
-                           callbacks: {{
-                               label: function(context) {{
-                                   const total = context.dataset.data.reduce((a, b) => a + b, 0);
-                                   const percentage = ((context.parsed * 100) / total).toFixed(1);
-                                   return context.label + ': ' + context.parsed + ' (' + percentage + '%)';
-                               }}
-                           }}
-                       }}
-                   }}
-               }}
-           }});
-       }}
-       
-       // Funcions d'exportació
-       function exportToJSON() {{
-           const dades = {{
-               galeria: {json.dumps(galeria, default=str)},
-               mapa: {json.dumps(mapa, default=str)},
-               demografia: {json.dumps(demo, default=str)},
-               generat_el: new Date().toISOString()
-           }};
-           
-           const blob = new Blob([JSON.stringify(dades, null, 2)], {{type: 'application/json'}});
-           const url = URL.createObjectURL(blob);
-           const a = document.createElement('a');
-           a.href = url;
-           a.download = 'informe_sus.json';
-           a.click();
-           URL.revokeObjectURL(url);
-       }}
-       
-       function exportToCSV() {{
-           const contingutCSV = "data:text/csv;charset=utf-8," +
-               "Eina,Puntuació SUS,Interpretació,Nota\\n" +
-               "Galeria Botànica,{galeria.get('mitjana', 0):.1f},{galeria.get('interpretacio', 'Sense dades')},{galeria.get('nota', 'N/A')}\\n" +
-               "Mapa Botànic,{mapa.get('mitjana', 0):.1f},{mapa.get('interpretacio', 'Sense dades')},{mapa.get('nota', 'N/A')}";
-           
-           const uriCodificat = encodeURI(contingutCSV);
-           const enllaç = document.createElement("a");
-           enllaç.setAttribute("href", uriCodificat);
-           enllaç.setAttribute("download", "informe_sus.csv");
-           enllaç.click();
-       }}
-       
-       // Animacions d'entrada
-       window.addEventListener('load', function() {{
-           const cartes = document.querySelectorAll('.card');
-           cartes.forEach((carta, index) => {{
-               carta.style.opacity = '0';
-               carta.style.transform = 'translateY(20px)';
-               setTimeout(() => {{
-                   carta.style.transition = 'all 0.6s ease';
-                   carta.style.opacity = '1';
-                   carta.style.transform = 'translateY(0)';
-               }}, index * 100);
-           }});
-       }});
-   </script>
-</body>
-</html>
-        """
+        # Només s'omplen els fragments dinàmics; la resta de la plantilla es compila una vegada per procés.
+        # L'informe estàtic no porta cap <script>: ni Chart.js, ni la illa de dades, ni els botons d'exportació
+        interactiu = self.grafics == 'interactiu'
+        contingut_html = self.plantilla(sense_blocs=() if interactiu else ('javascript',)).omplir(
+            titol=esquema.titol,
+            actius=self.actius.capcalera(amb_chartjs=interactiu),
+            subtitol=' vs '.join(instrument['titol'] for instrument in esquema),
+            data_generacio=datetime.now().strftime('%d/%m/%Y %H:%M'),
+            resum_executiu=self._generar_resum_executiu(instruments),
+            targetes_estadistiques=self._generar_targetes_estadistiques(instruments),
+            seccio_diferencies=self._generar_seccio_diferencies(resultats.get('diferencies')),
+            seccio_proves=self._generar_seccio_proves(resultats.get('proves_aparellades')),
+            seccio_segments=self._generar_seccio_segments(resultats.get('segments'), esquema),
+            total_respostes=demo.get('total_respostes', 0),
+            familiaritat_tec_mitja=f"{demo.get('familiaritat_tec_mitja', 0):.1f}",
+            experiencia_uab_si=demo.get('experiencia_uab_si', 0),
+            experiencia_uab_no=demo.get('experiencia_uab_no', 0),
+            recomanacions=self._generar_recomanacions_html(recomanacions),
+            seccio_base_dades=seccio_base_dades,
+            **self._generar_grafics(instruments, dades_demografia, dades_comparatives),
+            dades_informe=self._generar_illa_dades(instruments, demo, dades_demografia, dades_comparatives) if interactiu else ''
+        )
        
         return contingut_html
    
+    def desar_informe(self, resultats, ruta, url_base_dades=None):
+        """Generar l'informe, escriure'l a `ruta` i deixar-hi al costat els actius compartits si cal"""
+        contingut_html = self.generar_informe_html(resultats, url_base_dades)
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.write(contingut_html)
+        for ruta_actiu in self.actius.desar(os.path.dirname(os.path.abspath(ruta)), amb_chartjs=self.grafics == 'interactiu'):
+            print(f"📦 Actiu compartit: {ruta_actiu}")
+        return contingut_html
+    
     def _generar_recomanacions_html(self, recomanacions):
        """Generar HTML per recomanacions"""
        if not recomanacions:
@@ -1455,75 +3244,1064 @@ class GeneradorInformeHTML:
        
        return html
 
-def main():
+class ExportadorJSON:
+    """Exportació JSON dels resultats escrita per seccions, sense construir el document sencer en memòria
+    
+    El document té quatre seccions: `metadades`, `instruments` (estadístiques de cada
+    instrument sense la llista de puntuacions, que ja són a les respostes), `resultats`
+    (esquema, diferències, proves, segments, demografia i recomanacions) i `respostes`
+    (els noms de columna una sola vegada i una llista per respondent). Les respostes es
+    codifiquen per fragments amb el codificador en C de la biblioteca estàndard; NaN i
+    infinits surten com a null i els escalars de NumPy com a nombres. En format 'ndjson'
+    les respostes s'escriuen a un fitxer a part, un objecte per línia.
+    """
+    
+    FORMATS = ('json', 'ndjson')
+    FITXER_RESPOSTES = 'respostes_sus.ndjson'
+    VERSIO = 2
+    
+    def __init__(self, format_respostes='json', mida_fragment=10_000):
+        if format_respostes not in self.FORMATS:
+            raise ValueError(f"Format de respostes desconegut: {format_respostes}")
+        self.format_respostes = format_respostes
+        self.mida_fragment = mida_fragment
+        self.codificador = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(',', ':'),
+                                            default=self._per_defecte)
+    
+    @staticmethod
+    def _per_defecte(valor):
+        """Valors que el codificador no coneix: escalars de NumPy, dates i, si no, el seu text"""
+        if isinstance(valor, np.generic):
+            valor = valor.item()
+            return None if isinstance(valor, float) and not math.isfinite(valor) else valor
+        if isinstance(valor, datetime):
+            return valor.isoformat()
+        return str(valor)
+    
+    @staticmethod
+    def _valors_columna(serie):
+        """Valors d'una columna com a llista de tipus Python, amb els buits (NaN, NaT, NA) com a None"""
+        valors = serie.to_numpy()
+        if valors.dtype.kind in 'biu':
+            return valors.tolist()
+        if valors.dtype.kind == 'f':
+            llista = valors.tolist()
+            for i in np.flatnonzero(~np.isfinite(valors)):
+                llista[i] = None
+            return llista
+        valors = serie.to_numpy(dtype=object)
+        buits = pd.isna(valors)
+        return (np.where(buits, None, valors) if buits.any() else valors).tolist()
+    
+    def _fragments(self, df):
+        """Files del DataFrame com a tuples de valors Python, per fragments de `mida_fragment` files"""
+        for inici in range(0, len(df), self.mida_fragment):
+            fragment = df.iloc[inici:inici + self.mida_fragment]
+            yield list(zip(*(self._valors_columna(fragment.iloc[:, j]) for j in range(fragment.shape[1]))))
+    
+    def escriure(self, resultats, f, url_full=None):
+        """Escriure el document JSON a un flux de text (en format 'ndjson', sense les respostes)"""
+        claus_instruments = {instrument['clau'] for instrument in resultats['esquema']['instruments']}
+        metadades = {
+            'generat_el': datetime.now().isoformat(),
+            'metodologia': 'System Usability Scale (SUS)',
+            'versio_format': self.VERSIO,
+            'mida_mostra': resultats['demografia']['total_respostes'],
+            'url_full': url_full,
+            'format_respostes': self.format_respostes,
+            'fitxer_respostes': self.FITXER_RESPOSTES if self.format_respostes == 'ndjson' else None
+        }
+        instruments = {nom: estadistiques and {clau: valor for clau, valor in estadistiques.items() if clau != 'puntuacions'}
+                       for nom, estadistiques in resultats['instruments'].items()}
+        generals = {clau: valor for clau, valor in resultats.items()
+                    if clau not in claus_instruments and clau not in ('instruments', 'dades_en_brut')}
+        
+        codificar = self.codificador.encode
+        f.write(f'{{"metadades":{codificar(GeneradorInformeHTML._json_compatible(metadades))}')
+        f.write(f',"instruments":{codificar(GeneradorInformeHTML._json_compatible(instruments))}')
+        f.write(f',"resultats":{codificar(GeneradorInformeHTML._json_compatible(generals))}')
+        if self.format_respostes == 'ndjson':
+            f.write('}\n')
+            return
+        df = AnalitzadorSUS.expandir_puntuacions(resultats['dades_en_brut'])
+        f.write(f',"respostes":{{"columnes":{codificar([str(col) for col in df.columns])},"files":[')
+        separador = ''
+        for files in self._fragments(df):
+            if files:
+                # La llista codificada sense els claudàtors exteriors
+                f.write(separador + codificar(files)[1:-1])
+                separador = ','
+        f.write(']}}\n')
+    
+    def escriure_respostes(self, resultats, f):
+        """Escriure les respostes en NDJSON: un objecte per respondent i línia"""
+        df = AnalitzadorSUS.expandir_puntuacions(resultats['dades_en_brut'])
+        columnes = [str(col) for col in df.columns]
+        codificar = self.codificador.encode
+        for files in self._fragments(df):
+            f.write(''.join(codificar(dict(zip(columnes, fila))) + '\n' for fila in files))
+    
+    def desar(self, resultats, ruta, url_full=None):
+        with open(ruta, 'w', encoding='utf-8', newline='\n') as f:
+            self.escriure(resultats, f, url_full)
+    
+    def desar_respostes(self, resultats, ruta):
+        with open(ruta, 'w', encoding='utf-8', newline='\n') as f:
+            self.escriure_respostes(resultats, f)
+
+class ExportadorDades:
+    """Exportació de les dades processades en diversos formats, escrita per fragments
+    
+    Les puntuacions compactes s'expandeixen fragment a fragment mentre s'escriuen, de
+    manera que no cal cap segona còpia del DataFrame sencer. Formats: CSV (pla, gzip o
+    zstd), Parquet i Feather (amb pyarrow) i NumPy .npz amb les matrius de respostes
+    (N, 10) de cada instrument en uint8 (0 = no vàlida) i la de puntuacions (N, K).
+    Els fitxers comprimits no porten data ni nom, de manera que unes mateixes dades
+    donen sempre els mateixos bytes.
+    """
+    
+    FITXERS = {
+        'csv': 'dades_sus.csv',
+        'csv.gz': 'dades_sus.csv.gz',
+        'csv.zst': 'dades_sus.csv.zst',
+        'parquet': 'dades_sus.parquet',
+        'feather': 'dades_sus.feather',
+        'npz': 'dades_sus.npz'
+    }
+    FORMATS = tuple(FITXERS)
+    # Paquet opcional que necessita cada format i si està instal·lat
+    DEPENDENCIES = {'csv.zst': ('zstandard', ZSTANDARD_DISPONIBLE),
+                    'parquet': ('pyarrow', PYARROW_DISPONIBLE),
+                    'feather': ('pyarrow', PYARROW_DISPONIBLE)}
+    
+    def __init__(self, mida_fragment=100_000, nivell_gzip=6, nivell_zstd=3):
+        self.mida_fragment = mida_fragment
+        self.nivell_gzip = nivell_gzip
+        self.nivell_zstd = nivell_zstd
+    
+    @classmethod
+    def disponible(cls, format_dades):
+        return cls.DEPENDENCIES.get(format_dades, (None, True))[1]
+    
+    def fragments(self, df, dates_com_text=True):
+        """Fragments consecutius del DataFrame amb les puntuacions expandides (almenys un, encara que sigui buit)"""
+        for inici in range(0, max(len(df), 1), self.mida_fragment):
+            yield AnalitzadorSUS.expandir_puntuacions(df.iloc[inici:inici + self.mida_fragment], dates_com_text)
+    
+    def desar(self, resultats, ruta, format_dades='csv'):
+        """Escriure les dades processades de `resultats` a `ruta` en el format indicat"""
+        if format_dades not in self.FITXERS:
+            raise ValueError(f"Format de dades desconegut: {format_dades}")
+        if not self.disponible(format_dades):
+            raise ImportError(f"El format {format_dades} necessita el paquet {self.DEPENDENCIES[format_dades][0]}")
+        df = resultats['dades_en_brut']
+        if format_dades == 'npz':
+            self._desar_npz(df, EsquemaQuestionari(**resultats['esquema']), ruta)
+        elif format_dades in ('parquet', 'feather'):
+            self._desar_arrow(df, ruta, format_dades)
+        else:
+            self._desar_csv(df, ruta, {'csv': None, 'csv.gz': 'gzip', 'csv.zst': 'zstd'}[format_dades])
+    
+    @contextlib.contextmanager
+    def _obrir_text(self, ruta, compressio=None):
+        """Flux de text UTF-8 cap a `ruta`, opcionalment comprimit amb gzip o zstd"""
+        with open(ruta, 'wb') as cru:
+            if compressio == 'gzip':
+                binari = gzip.GzipFile(filename='', mode='wb', compresslevel=self.nivell_gzip, fileobj=cru, mtime=0)
+            elif compressio == 'zstd':
+                import zstandard
+                binari = zstandard.ZstdCompressor(level=self.nivell_zstd).stream_writer(cru, closefd=False)
+            else:
+                binari = cru
+            with io.TextIOWrapper(binari, encoding='utf-8', newline='') as f:
+                yield f
+    
+    def _desar_csv(self, df, ruta, compressio=None):
+        with self._obrir_text(ruta, compressio) as f:
+            for i, fragment in enumerate(self.fragments(df)):
+                fragment.to_csv(f, header=i == 0, index=False)
+    
+    def _desar_arrow(self, df, ruta, format_dades):
+        """Parquet o Feather (fitxer IPC d'Arrow): un grup de files o lot per fragment amb l'esquema del primer
+        
+        La marca temporal es desa com a data, no com a text.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        with open(ruta, 'wb') as f:
+            escriptor, esquema = None, None
+            try:
+                for fragment in self.fragments(df, dates_com_text=False):
+                    taula = pa.Table.from_pandas(fragment, schema=esquema, preserve_index=False)
+                    if escriptor is None:
+                        esquema = taula.schema
+                        if format_dades == 'parquet':
+                            escriptor = pq.ParquetWriter(f, esquema)
+                        else:
+                            compressio = 'lz4' if pa.Codec.is_available('lz4') else None
+                            escriptor = pa.ipc.new_file(f, esquema, options=pa.ipc.IpcWriteOptions(compression=compressio))
+                    escriptor.write_table(taula)
+            finally:
+                if escriptor is not None:
+                    escriptor.close()
+    
+    def _desar_npz(self, df, esquema, ruta):
+        """Matrius de respostes de cada instrument i de puntuacions, escrites per fragments dins el .npz
+        
+        Cada matriu és una entrada .npy del zip: la capçalera es coneix per endavant (N files)
+        i les dades s'hi afegeixen fragment a fragment.
+        """
+        columnes = {nom: columnes_instrument for nom, columnes_instrument in zip(esquema.noms, esquema.detectar(df.columns))
+                    if len(columnes_instrument) == 10}
+        with zipfile.ZipFile(ruta, 'w') as arxiu:
+            with arxiu.open(self._info_zip('instruments'), 'w') as f:
+                np.lib.format.write_array(f, np.array(esquema.noms, dtype=str), allow_pickle=False)
+            for nom, columnes_instrument in columnes.items():
+                with self._entrada_npy(arxiu, f'respostes_{nom}', np.uint8, (len(df), 10)) as f:
+                    for inici in range(0, len(df), self.mida_fragment):
+                        respostes = df.iloc[inici:inici + self.mida_fragment][columnes_instrument].to_numpy(
+                            dtype=np.float64, na_value=np.nan)
+                        valides = MotorPuntuacioSUS.respostes_valides(respostes)
+                        f.write(np.where(valides, respostes, 0).astype(np.uint8).tobytes())
+            # Només cal expandir les columnes de puntuació (i les màscares de validesa de les compactes)
+            columnes_puntuacio = [col for col in df.columns if str(col).startswith(('SUS_', 'Valides_'))]
+            with self._entrada_npy(arxiu, 'puntuacions', np.float64, (len(df), len(esquema))) as f:
+                for inici in range(0, len(df), self.mida_fragment):
+                    fragment = AnalitzadorSUS.expandir_puntuacions(
+                        df.iloc[inici:inici + self.mida_fragment][columnes_puntuacio])
+                    puntuacions = np.column_stack([
+                        fragment[f'SUS_{nom}'].to_numpy(dtype=np.float64, na_value=np.nan) if f'SUS_{nom}' in fragment
+                        else np.full(len(fragment), np.nan) for nom in esquema.noms])
+                    f.write(puntuacions.astype('<f8').tobytes())
+    
+    @staticmethod
+    def _info_zip(nom):
+        """Entrada `nom`.npy amb data fixa (1980-01-01): el .npz no canvia si les dades no canvien"""
+        return zipfile.ZipInfo(f'{nom}.npy')
+    
+    @classmethod
+    @contextlib.contextmanager
+    def _entrada_npy(cls, arxiu, nom, tipus, forma):
+        """Entrada `nom`.npy d'un zip amb la capçalera escrita; les dades (ordre C) s'hi escriuen a continuació"""
+        with arxiu.open(cls._info_zip(nom), 'w', force_zip64=True) as f:
+            np.lib.format.write_array_header_1_0(f, {'descr': np.lib.format.dtype_to_descr(np.dtype(tipus).newbyteorder('<')),
+                                                     'fortran_order': False, 'shape': forma})
+            yield f
+
+def exportar_resultats(resultats, directori='.', url_full=None, manifest=None, clau=None, format_respostes='json',
+                       formats_dades=('csv',)):
+    """Escriure resultats_sus.json i les dades processades a `directori` i retornar-ne les rutes
+    
+    Amb `format_respostes='ndjson'` les respostes van a respostes_sus.ndjson i el JSON només
+    hi fa referència. Les dades processades s'escriuen en cada un dels `formats_dades`
+    (vegeu ExportadorDades); els formats sense el paquet opcional que necessiten s'ometen
+    amb un avís. Amb un ManifestConstruccio, cada fitxer és una etapa amb clau `clau`
+    (derivada del hash dels resultats): s'omet si ja és vigent i el destí només se substitueix
+    si els bytes canvien.
+    """
+    exportador = ExportadorJSON(format_respostes)
+    exportador_dades = ExportadorDades()
+    exportacions = [('json', os.path.join(directori, 'resultats_sus.json'),
+                     lambda ruta: exportador.desar(resultats, ruta, url_full))]
+    if format_respostes == 'ndjson':
+        exportacions.append(('ndjson', os.path.join(directori, ExportadorJSON.FITXER_RESPOSTES),
+                             lambda ruta: exportador.desar_respostes(resultats, ruta)))
+    for format_dades in formats_dades:
+        if not ExportadorDades.disponible(format_dades):
+            print(f"⚠️ {ExportadorDades.FITXERS[format_dades]}: cal el paquet "
+                  f"{ExportadorDades.DEPENDENCIES[format_dades][0]}, s'omet")
+            continue
+        exportacions.append((format_dades, os.path.join(directori, ExportadorDades.FITXERS[format_dades]),
+                             lambda ruta, format_dades=format_dades: exportador_dades.desar(resultats, ruta, format_dades)))
+    for etapa, ruta, desar in exportacions:
+        if manifest is None:
+            desar(ruta)
+        else:
+            manifest.construir(etapa, ManifestConstruccio.empremta(clau, etapa, format_respostes), ruta, desar)
+    return [ruta for _, ruta, _ in exportacions]
+
+class GeneradorLots:
+    """Un informe per partició (seu, semestre, cohort demogràfica...) repartit en un grup de processos
+    
+    Les dades netes es parteixen per una o més claus i cada partició s'analitza i
+    s'informa en un procés treballador. Les particions viatgen com a arrays compactes
+    (enters petits i codis de categoria); les categories, l'esquema i les opcions
+    s'envien una sola vegada a cada treballador. La sortida és un arbre
+    clau=valor/ amb l'informe i les exportacions de cada partició i una pàgina índex.
+    """
+    
+    CLAUS_DERIVADES = ('semestre',)
+    
+    def __init__(self, esquema=None, resolutor=None, bootstrap=None, proves=None, compacte=False,
+                 actius=None, grafics='interactiu', processos=None, url_full=None, format_respostes='json',
+                 formats_dades=('csv',)):
+        self.esquema = esquema or EsquemaQuestionari.per_defecte()
+        self.resolutor = resolutor or ResolutorColumnes(self.esquema)
+        self.bootstrap = bootstrap
+        self.proves = proves
+        self.compacte = compacte
+        self.actius = actius or ActiusInforme()
+        self.grafics = grafics
+        self.processos = processos or os.cpu_count() or 1
+        self.url_full = url_full
+        # Exportacions de cada partició, com les de l'anàlisi principal
+        self.format_respostes = format_respostes
+        self.formats_dades = tuple(formats_dades)
+    
+    @staticmethod
+    def codificar(df):
+        """Columnes del DataFrame com a arrays compactes i descriptors per reconstruir-les"""
+        arrays, descriptors = {}, {}
+        for col in df.columns:
+            serie = df[col]
+            if pd.api.types.is_bool_dtype(serie) or pd.api.types.is_datetime64_any_dtype(serie):
+                arrays[col], descriptors[col] = serie.to_numpy(), ('valors', serie.dtype)
+            elif pd.api.types.is_numeric_dtype(serie) and not isinstance(serie.dtype, pd.CategoricalDtype):
+                valors = serie.to_numpy(dtype=np.float64, na_value=np.nan)
+                # Respostes Likert i altres enters petits: un byte per valor
+                if len(valors) and np.isfinite(valors).all() and (valors == np.rint(valors)).all() \
+                        and valors.min() >= 0 and valors.max() <= 255:
+                    arrays[col], descriptors[col] = valors.astype(np.uint8), ('valors', serie.dtype)
+                else:
+                    arrays[col], descriptors[col] = serie.to_numpy(), ('valors', serie.dtype)
+            else:
+                codis, categories = pd.factorize(serie)
+                tipus = np.int8 if len(categories) < 2**7 else np.int16 if len(categories) < 2**15 else np.int32
+                arrays[col], descriptors[col] = codis.astype(tipus), ('categories', serie.dtype, np.asarray(categories, dtype=object))
+        return arrays, descriptors
+    
+    @staticmethod
+    def descodificar(arrays, descriptors):
+        """DataFrame reconstruït a partir dels arrays compactes"""
+        columnes = {}
+        for col, descriptor in descriptors.items():
+            if descriptor[0] == 'categories':
+                _, tipus, categories = descriptor
+                valors = pd.Categorical.from_codes(arrays[col].astype(np.int32), categories=pd.Index(categories, dtype=object))
+                columnes[col] = pd.Series(valors).astype(tipus)
+            else:
+                columnes[col] = pd.Series(arrays[col]).astype(descriptor[1])
+        return pd.DataFrame(columnes)
+    
+    def _valors_clau(self, df, clau):
+        """Sèrie amb el valor de partició de cada fila: rol del resolutor, clau derivada o nom de columna"""
+        rols = self.resolutor.resoldre(df.columns)
+        if clau == 'semestre':
+            columna = rols.get('marca_temporal')
+            if columna is None:
+                raise ValueError("La clau 'semestre' necessita una columna de marca temporal")
+            dates = pd.to_datetime(df[columna], format='%d/%m/%Y %H:%M:%S', errors='coerce')
+            return pd.Series(np.where(dates.isna(), None, dates.dt.year.astype('Int64').astype(str) + '-S'
+                                      + np.where(dates.dt.month <= 6, '1', '2')), index=df.index)
+        columna = rols.get(clau) if clau in self.resolutor.sinonims else clau
+        if columna is None or columna not in df.columns:
+            raise ValueError(f"Clau de partició desconeguda: {clau} (rols: {', '.join(self.resolutor.sinonims)}, "
+                             f"derivades: {', '.join(self.CLAUS_DERIVADES)} o nom de columna)")
+        return df[columna]
+    
+    def particionar(self, df, claus):
+        """Ordre de les files i límits de cada partició, amb els valors de clau de cadascuna"""
+        codis, nivells = [], []
+        for clau in claus:
+            codi, nivell = pd.factorize(self._valors_clau(df, clau), sort=True)
+            codis.append(np.where(codi < 0, len(nivell), codi))
+            nivells.append(nivell.tolist() + [AnalitzadorSUS.SENSE_RESPOSTA])
+        # Índex compacte de les combinacions observades, ordenades com els nivells
+        combinacions, cella = np.unique(np.column_stack(codis), axis=0, return_inverse=True)
+        cella = cella.reshape(-1)
+        
+        # Una ordenació estable i un bincount: cada partició és un tram contigu
+        ordre = np.argsort(cella, kind='stable')
+        comptatges = np.bincount(cella, minlength=len(combinacions))
+        limits = np.concatenate([[0], np.cumsum(comptatges)])
+        particions = []
+        for posicio, combinacio in enumerate(combinacions):
+            valors = [nivell[i] for nivell, i in zip(nivells, combinacio)]
+            particions.append((dict(zip(claus, valors)), int(limits[posicio]), int(limits[posicio + 1])))
+        return ordre, particions
+    
+    @staticmethod
+    def directori_particio(particio):
+        """Camí relatiu clau=valor/... amb caràcters segurs per al sistema de fitxers"""
+        segur = lambda text: re.sub(r'[^\w .=+-]', '_', str(text)).strip(' .') or '_'
+        return os.path.join(*(segur(f'{clau}={valor}') for clau, valor in particio.items()))
+    
+    # Context compartit de cada procés treballador (esquema, opcions i descriptors de columna)
+    _context = None
+    
+    @staticmethod
+    def _iniciar_treballador(context):
+        GeneradorLots._context = context
+    
+    @staticmethod
+    def _generar_particio(particio, arrays):
+        """Analitzar una partició i escriure'n l'informe i les exportacions (s'executa al treballador)"""
+        context = GeneradorLots._context
+        directori_relatiu = GeneradorLots.directori_particio(particio)
+        directori = os.path.join(context['directori'], directori_relatiu)
+        resum = {'particio': particio, 'directori': directori_relatiu.replace(os.sep, '/'), 'error': None}
+        inici = time.perf_counter()
+        try:
+            os.makedirs(directori, exist_ok=True)
+            with contextlib.redirect_stdout(io.StringIO()):
+                esquema = EsquemaQuestionari(**context['esquema'])
+                df = GeneradorLots.descodificar(arrays, context['descriptors'])
+                analitzador = AnalitzadorSUS(df, *context['columnes_instruments'], compacte=context['compacte'],
+                                             esquema=esquema, bootstrap=context['bootstrap'], proves=context['proves'],
+                                             resolutor=ResolutorColumnes(esquema, context['sinonims']))
+                resultats = analitzador.analitzar()
+                # Els actius compartits són a l'arrel de l'arbre, tants nivells amunt com claus
+                actius = ActiusInforme(context['actius'], directori_actius='../' * len(particio) + 'actius')
+                generador = GeneradorInformeHTML(actius, context['grafics'])
+                generador.desar_informe(resultats, os.path.join(directori, 'informe_sus.html'), context['url_full'])
+                exportar_resultats(resultats, directori, context['url_full'], format_respostes=context['format_respostes'],
+                                   formats_dades=context['formats_dades'])
+            resum['respostes'] = resultats['demografia']['total_respostes']
+            resum['mitjanes'] = {nom: (estadistiques['mitjana'] if estadistiques else None)
+                                 for nom, estadistiques in resultats['instruments'].items()}
+        except Exception as e:
+            resum['error'] = f'{type(e).__name__}: {e}'
+        resum['segons'] = time.perf_counter() - inici
+        return resum
+    
+    def generar(self, df, claus, directori='informes'):
+        """Generar l'arbre d'informes per les claus donades i retornar el resum de cada partició"""
+        inici = time.perf_counter()
+        columnes_instruments = list(self.resolutor.resoldre(df.columns)['instruments'].values())
+        ordre, particions = self.particionar(df, claus)
+        arrays, descriptors = self.codificar(df)
+        ordenats = {col: array[ordre] for col, array in arrays.items()}
+        
+        context = {
+            'directori': directori, 'descriptors': descriptors, 'columnes_instruments': columnes_instruments,
+            'esquema': self.esquema.descripcio(), 'sinonims': self.resolutor.sinonims, 'compacte': self.compacte,
+            'bootstrap': self.bootstrap, 'proves': self.proves, 'actius': self.actius.mode,
+            'grafics': self.grafics, 'url_full': self.url_full, 'format_respostes': self.format_respostes,
+            'formats_dades': self.formats_dades
+        }
+        if self.bootstrap is not None:
+            # Cada treballador ja és un procés: el bootstrap s'hi executa en sèrie
+            context['bootstrap'] = BootstrapSUS(self.bootstrap.replicats, self.bootstrap.nivell, self.bootstrap.llavor,
+                                                self.bootstrap.mida_lot, processos=1)
+        tasques = [(particio, {col: array[primer:ultim] for col, array in ordenats.items()})
+                   for particio, primer, ultim in particions]
+        
+        processos = max(1, min(self.processos, len(tasques)))
+        print(f"🗂️ {len(tasques)} particions per {', '.join(claus)} amb {processos} processos...")
+        os.makedirs(directori, exist_ok=True)
+        if processos == 1:
+            self._iniciar_treballador(context)
+            resums = [self._generar_particio(*tasca) for tasca in tasques]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=processos, initializer=self._iniciar_treballador,
+                                     initargs=(context,)) as executor:
+                resums = list(executor.map(self._generar_particio, *zip(*tasques), chunksize=max(1, len(tasques) // (4 * processos))))
+        
+        for ruta_actiu in self.actius.desar(directori, amb_chartjs=self.grafics == 'interactiu'):
+            print(f"📦 Actiu compartit: {ruta_actiu}")
+        self._desar_index(resums, claus, directori)
+        errors = [resum for resum in resums if resum['error']]
+        for resum in errors:
+            print(f"⚠️ Partició {resum['directori']}: {resum['error']}")
+        segons = time.perf_counter() - inici
+        print(f"✅ {len(resums) - len(errors)} informes a {directori}/ en {segons:.1f} s "
+              f"({len(resums) / segons:.1f} informes/s)")
+        return resums
+    
+    def _desar_index(self, resums, claus, directori):
+        """index.html amb una fila per partició i index.json amb el mateix resum"""
+        from urllib.parse import quote
+        with open(os.path.join(directori, 'index.json'), 'w', encoding='utf-8') as f:
+            json.dump({'claus': claus, 'generat_el': datetime.now().isoformat(), 'particions': resums},
+                      f, indent=2, ensure_ascii=False, default=str)
+        
+        capcalera = ''.join(f'<th>{html.escape(str(clau))}</th>' for clau in claus) + '<th>n</th>' + ''.join(
+            f'<th>{instrument["icona"]} {html.escape(instrument["nom"])}</th>' for instrument in self.esquema) + '<th></th>'
+        files = ''
+        for resum in resums:
+            celles = ''.join(f'<td>{html.escape(str(valor))}</td>' for valor in resum['particio'].values())
+            if resum['error']:
+                celles += f'<td colspan="{len(self.esquema) + 1}">⚠️ {html.escape(resum["error"])}</td><td></td>'
+            else:
+                celles += f'<td>{resum["respostes"]}</td>' + ''.join(
+                    '<td>—</td>' if resum['mitjanes'].get(nom) is None else f'<td>{resum["mitjanes"][nom]:.1f}</td>'
+                    for nom in self.esquema.noms)
+                celles += f'<td><a href="{quote(resum["directori"])}/informe_sus.html">Informe</a></td>'
+            files += f"""
+                       <tr>{celles}</tr>"""
+        
+        contingut = f"""<!DOCTYPE html>
+<html lang="ca">
+<head>
+   <meta charset="UTF-8">
+   <meta name="viewport" content="width=device-width, initial-scale=1.0">
+   <title>Informes SUS - {html.escape(self.esquema.titol)}</title>
+   {self.actius.capcalera(amb_chartjs=False)}
+</head>
+<body>
+   <div class="container">
+       <div class="header">
+           <h1>🗂️ Informes SUS per {html.escape(', '.join(claus))}</h1>
+           <p>{html.escape(self.esquema.titol)}</p>
+           <p>Generat el {datetime.now().strftime('%d/%m/%Y %H:%M')}</p>
+       </div>
+       <div class="card full-width">
+           <div class="segment-scroll">
+               <table class="segment-table">
+                   <thead><tr>{capcalera}</tr></thead>
+                   <tbody>{files}
+                   </tbody>
+               </table>
+           </div>
+       </div>
+   </div>
+</body>
+</html>
+"""
+        with open(os.path.join(directori, 'index.html'), 'w', encoding='utf-8') as f:
+            f.write(contingut)
+
+class CacheMemoria:
+    """Memòria cau en procés amb caducitat (TTL) i expulsió de les entrades menys usades (LRU)
+    
+    Segura entre fils. `obtenir` calcula cada clau una sola vegada encara que arribin
+    diverses peticions alhora: les altres esperen el resultat en lloc de repetir el càlcul.
+    """
+    
+    def __init__(self, capacitat=128, ttl=300.0):
+        self.capacitat = capacitat
+        self.ttl = ttl
+        self._entrades = OrderedDict()  # clau -> (caducitat, valor), de la menys a la més usada
+        self._calculs = {}  # clau -> bloqueig del càlcul en curs
+        self._bloqueig = threading.Lock()
+        self.encerts = 0
+        self.errades = 0
+    
+    def _consultar(self, clau):
+        """Entrada vigent d'una clau (marcada com a usada recentment) o None"""
+        with self._bloqueig:
+            entrada = self._entrades.get(clau)
+            if entrada is None:
+                return None
+            if entrada[0] < time.monotonic():
+                del self._entrades[clau]
+                return None
+            self._entrades.move_to_end(clau)
+            return entrada
+    
+    def obtenir(self, clau, calcular):
+        """Valor d'una clau; si no hi és o ha caducat, es calcula amb `calcular()` i es desa"""
+        entrada = self._consultar(clau)
+        if entrada is not None:
+            self.encerts += 1
+            return entrada[1]
+        with self._bloqueig:
+            bloqueig_calcul = self._calculs.setdefault(clau, threading.Lock())
+        with bloqueig_calcul:
+            # Un altre fil el pot haver calculat mentre s'esperava
+            entrada = self._consultar(clau)
+            if entrada is not None:
+                self.encerts += 1
+                return entrada[1]
+            self.errades += 1
+            try:
+                valor = calcular()
+                self.posar(clau, valor)
+            finally:
+                with self._bloqueig:
+                    self._calculs.pop(clau, None)
+        return valor
+    
+    def posar(self, clau, valor):
+        with self._bloqueig:
+            self._entrades[clau] = (time.monotonic() + self.ttl, valor)
+            self._entrades.move_to_end(clau)
+            while len(self._entrades) > self.capacitat:
+                self._entrades.popitem(last=False)
+    
+    def consultar(self, clau, defecte=None):
+        """Valor vigent d'una clau sense calcular-lo"""
+        entrada = self._consultar(clau)
+        return defecte if entrada is None else entrada[1]
+    
+    def buidar(self):
+        with self._bloqueig:
+            self._entrades.clear()
+    
+    def __len__(self):
+        return len(self._entrades)
+
+class ServidorInformes:
+    """Servidor HTTP local (http.server) de diversos taulers SUS amb una API JSON
+    
+    Rutes de cada tauler `nom` (si només n'hi ha un, també directament a l'arrel):
+    - /nom/                    informe HTML
+    - /nom/api/results         resultats (estadístiques, proves, demografia...) en JSON
+    - /nom/api/segments        taules de segmentació demogràfica en JSON
+    - /nom/resultats_sus.json, /nom/respostes_sus.ndjson i /nom/dades_sus.csv: descàrregues
+    Les dades netes, els resultats i cada resposta ja codificada (amb la versió gzip i
+    l'ETag) es guarden a una CacheMemoria: una petició repetida només copia bytes.
+    """
+    
+    RECURSOS = {
+        'informe_sus.html': 'text/html; charset=utf-8',
+        'api/results': 'application/json; charset=utf-8',
+        'api/segments': 'application/json; charset=utf-8',
+        'resultats_sus.json': 'application/json; charset=utf-8',
+        'respostes_sus.ndjson': 'application/x-ndjson; charset=utf-8',
+        'dades_sus.csv': 'text/csv; charset=utf-8'
+    }
+    TIPUS_ACTIUS = {'.css': 'text/css; charset=utf-8', '.js': 'text/javascript; charset=utf-8'}
+    MIDA_MINIMA_GZIP = 1024
+    
+    def __init__(self, taulers, esquema=None, resolutor=None, bootstrap=None, proves=None, actius=None,
+                 grafics='interactiu', cache=None, opcions_extraccio=None):
+        if not taulers:
+            raise ValueError("Cal almenys un tauler (nom=font)")
+        self.taulers = dict(taulers)  # nom -> font (URL o fitxer CSV)
+        self.esquema = esquema or EsquemaQuestionari.per_defecte()
+        self.resolutor = resolutor or ResolutorColumnes(self.esquema)
+        self.bootstrap = bootstrap
+        self.proves = proves
+        self.actius = actius or ActiusInforme()
+        self.grafics = grafics
+        self.cache = cache or CacheMemoria()
+        self.opcions_extraccio = opcions_extraccio or {}
+    
+    @classmethod
+    def de_definicions(cls, definicions, font_per_defecte=None, **opcions):
+        """Servidor a partir de parells nom=font; sense cap definició, un sol tauler 'informe'"""
+        taulers = {}
+        for definicio in definicions or []:
+            nom, separador, font = definicio.partition('=')
+            if not separador:
+                nom, font = os.path.splitext(os.path.basename(definicio))[0], definicio
+            taulers[nom] = font
+        return cls(taulers or {'informe': font_per_defecte}, **opcions)
+    
+    def _dades(self, nom):
+        def extreure():
+            extractor = ExtractorDades(self.taulers[nom], esquema=self.esquema, resolutor=self.resolutor,
+                                       **self.opcions_extraccio)
+            return extractor.obtenir_dades()
+        return self.cache.obtenir(('dades', nom), extreure)
+    
+    def resultats(self, nom):
+        """Resultats de l'anàlisi d'un tauler, des de la memòria cau si encara són vigents"""
+        def analitzar():
+            df, *columnes_instruments = self._dades(nom)
+            return AnalitzadorSUS(df, *columnes_instruments, esquema=self.esquema, bootstrap=self.bootstrap,
+                                  proves=self.proves, resolutor=self.resolutor).analitzar()
+        return self.cache.obtenir(('resultats', nom), analitzar)
+    
+    def _generar(self, nom, recurs):
+        """Cos (bytes) d'un recurs d'un tauler"""
+        if recurs == 'informe_sus.html':
+            generador = GeneradorInformeHTML(self.actius, self.grafics)
+            return generador.generar_informe_html(self.resultats(nom), self.taulers[nom]).encode('utf-8')
+        if recurs == 'api/results':
+            resultats = {clau: valor for clau, valor in self.resultats(nom).items() if clau != 'dades_en_brut'}
+            return json.dumps(GeneradorInformeHTML._json_compatible(resultats), ensure_ascii=False).encode('utf-8')
+        if recurs == 'api/segments':
+            segments = self.resultats(nom)['segments']
+            return json.dumps(GeneradorInformeHTML._json_compatible(segments), ensure_ascii=False).encode('utf-8')
+        if recurs == 'resultats_sus.json':
+            text = io.StringIO()
+            ExportadorJSON().escriure(self.resultats(nom), text, self.taulers[nom])
+            return text.getvalue().encode('utf-8')
+        if recurs == 'respostes_sus.ndjson':
+            text = io.StringIO()
+            ExportadorJSON('ndjson').escriure_respostes(self.resultats(nom), text)
+            return text.getvalue().encode('utf-8')
+        if recurs == 'dades_sus.csv':
+            df = AnalitzadorSUS.expandir_puntuacions(self.resultats(nom)['dades_en_brut'])
+            return df.to_csv(index=False).encode('utf-8')
+        raise KeyError(recurs)
+    
+    def _generar_index(self):
+        files = ''.join(f'<li><a href="{html.escape(urllib.parse.quote(nom))}/">{html.escape(nom)}</a> '
+                        f'(<a href="{html.escape(urllib.parse.quote(nom))}/api/results">API</a>)</li>'
+                        for nom in self.taulers)
+        return (f'<!DOCTYPE html><html lang="ca"><head><meta charset="UTF-8"><title>Taulers SUS</title></head>'
+                f'<body><h1>📊 Taulers SUS</h1><ul>{files}</ul></body></html>').encode('utf-8')
+    
+    @classmethod
+    def _codificar(cls, cos, tipus):
+        """Resposta preparada: cos, versió gzip (si surt a compte) i ETag del contingut"""
+        comprimit = None
+        if len(cos) >= cls.MIDA_MINIMA_GZIP:
+            comprimit = gzip.compress(cos, compresslevel=6, mtime=0)
+            if len(comprimit) >= len(cos):
+                comprimit = None
+        etag = f'"{hashlib.sha256(cos).hexdigest()[:24]}"'
+        return {'cos': cos, 'gzip': comprimit, 'etag': etag, 'tipus': tipus}
+    
+    def resposta(self, ruta):
+        """Resposta preparada per a una ruta; KeyError si la ruta no existeix"""
+        parts = [urllib.parse.unquote(part) for part in ruta.split('/') if part]
+        if len(parts) >= 2 and parts[-2] == 'actius':
+            # Actius compartits: el nom porta el hash del contingut, són iguals per a tots els taulers
+            nom_actiu = parts[-1]
+            return self.cache.obtenir(('actiu', nom_actiu), lambda: self._codificar(
+                self.actius.fitxers_compartits(amb_chartjs=self.grafics == 'interactiu')[nom_actiu], self.TIPUS_ACTIUS[os.path.splitext(nom_actiu)[1]]))
+        if parts and parts[0] in self.taulers:
+            nom = parts.pop(0)
+        elif len(self.taulers) == 1:
+            nom = next(iter(self.taulers))
+        elif not parts:
+            return self.cache.obtenir(('index',), lambda: self._codificar(self._generar_index(), self.RECURSOS['informe_sus.html']))
+        else:
+            raise KeyError(ruta)
+        recurs = '/'.join(parts)
+        if recurs in ('', 'index.html'):
+            recurs = 'informe_sus.html'
+        tipus = self.RECURSOS[recurs]
+        return self.cache.obtenir(('resposta', nom, recurs), lambda: self._codificar(self._generar(nom, recurs), tipus))
+    
+    @staticmethod
+    def coincideix_etag(etag, if_none_match):
+        """Si la capçalera If-None-Match (llista separada per comes, '*' o cap) inclou `etag`
+        
+        La comparació és feble, com demana la RFC 9110 per a If-None-Match: el prefix W/
+        s'ignora i un ETag només coincideix sencer, mai com a subcadena d'un altre.
+        """
+        if not if_none_match:
+            return False
+        etiquetes = {etiqueta.strip().removeprefix('W/') for etiqueta in if_none_match.split(',')}
+        return '*' in etiquetes or etag.removeprefix('W/') in etiquetes
+    
+    def _atendre(self, peticio, amb_cos=True):
+        """Respondre una petició GET o HEAD amb la resposta preparada"""
+        try:
+            resposta = self.resposta(urllib.parse.urlsplit(peticio.path).path)
+        except KeyError:
+            peticio.send_error(404, "Recurs no trobat")
+            return
+        except Exception as e:
+            peticio.send_error(500, f"Error generant el recurs: {e}")
+            return
+        
+        if self.coincideix_etag(resposta['etag'], peticio.headers.get('If-None-Match')):
+            peticio.send_response(304)
+            peticio.send_header('ETag', resposta['etag'])
+            peticio.send_header('Content-Length', '0')
+            peticio.end_headers()
+            return
+        
+        cos = resposta['cos']
+        comprimit = resposta['gzip'] is not None and 'gzip' in peticio.headers.get('Accept-Encoding', '')
+        if comprimit:
+            cos = resposta['gzip']
+        peticio.send_response(200)
+        peticio.send_header('Content-Type', resposta['tipus'])
+        peticio.send_header('Content-Length', str(len(cos)))
+        peticio.send_header('ETag', resposta['etag'])
+        peticio.send_header('Cache-Control', 'no-cache')  # El navegador revalida amb l'ETag
+        peticio.send_header('Vary', 'Accept-Encoding')
+        if comprimit:
+            peticio.send_header('Content-Encoding', 'gzip')
+        peticio.end_headers()
+        if amb_cos:
+            peticio.wfile.write(cos)
+    
+    def gestor(self):
+        """Classe de gestor de peticions lligada a aquest servidor"""
+        servidor = self
+        
+        class GestorPeticions(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Connexions persistents
+            # Capçaleres i cos s'escriuen per separat: sense TCP_NODELAY, Nagle i l'ACK retardat
+            # afegeixen ~40 ms a cada resposta d'una connexió persistent
+            disable_nagle_algorithm = True
+            
+            def do_GET(self):
+                servidor._atendre(self)
+            
+            def do_HEAD(self):
+                servidor._atendre(self, amb_cos=False)
+            
+            def log_message(self, format, *args):
+                print(f"🌐 {self.address_string()} {format % args}")
+        
+        return GestorPeticions
+    
+    def crear(self, host='127.0.0.1', port=8000):
+        """Servidor HTTP amb un fil per petició, sense engegar"""
+        servidor_http = http.server.ThreadingHTTPServer((host, port), self.gestor())
+        servidor_http.daemon_threads = True
+        return servidor_http
+    
+    def servir(self, host='127.0.0.1', port=8000):
+        """Atendre peticions fins a Ctrl+C"""
+        with self.crear(host, port) as servidor_http:
+            adreca = f"http://{host}:{servidor_http.server_address[1]}/"
+            print(f"🌐 Servint {len(self.taulers)} tauler(s) a {adreca}")
+            for nom in self.taulers:
+                print(f"   📊 {adreca}{urllib.parse.quote(nom)}/ · {adreca}{urllib.parse.quote(nom)}/api/results")
+            try:
+                servidor_http.serve_forever()
+            except KeyboardInterrupt:
+                print("\n⏹️ Servidor aturat")
+
+def analitzar_arguments(argv=None):
+   """Analitzar els arguments de la línia d'ordres"""
+   import argparse
+   
+   parser = argparse.ArgumentParser(description="Sistema d'anàlisi SUS - Galeria vs Mapa Botànic")
+   parser.add_argument('--url', default=None,
+                       help="URL de Google Sheets, URL d'un CSV o fitxer CSV local")
+   parser.add_argument('--fonts', nargs='+', default=None,
+                       help="Diverses fonts (URLs o fitxers CSV) a extreure en paral·lel i combinar")
+   parser.add_argument('--fils', type=int, default=4,
+                       help="Fils per a l'extracció de múltiples fonts (per defecte 4)")
+   parser.add_argument('--esquema', default=None,
+                       help="Fitxer JSON amb l'esquema d'instruments del qüestionari (per defecte Galeria i Mapa)")
+   parser.add_argument('--instruments', nargs='+', default=None, metavar='PREFIX=NOM',
+                       help="Instruments definits per prefix de pregunta, p. ex. G=Galeria M=Mapa T=Tauler")
+   parser.add_argument('--sinonims', nargs='+', default=None, metavar='ROL=SINÒNIM,...',
+                       help="Sinònims (regex) dels rols de columna: marca_temporal, tecnologia, uab, edat; "
+                            "p. ex. edat=edat,age,anys")
+   parser.add_argument('--actius', choices=ActiusInforme.MODES, default='cdn',
+                       help="Estils i Chart.js de l'informe: des del CDN, compartits (actius/ amb hash) o incrustats")
+   parser.add_argument('--grafics', choices=GeneradorInformeHTML.MODES_GRAFICS, default='interactiu',
+                       help="Gràfics amb Chart.js al navegador o SVG estàtics (sense JavaScript, PDF immediat)")
+   parser.add_argument('--format-respostes', choices=ExportadorJSON.FORMATS, default='json',
+                       help="Respostes dins resultats_sus.json (json) o a part, una per línia, a respostes_sus.ndjson (ndjson)")
+   parser.add_argument('--formats-dades', nargs='+', choices=ExportadorDades.FORMATS, default=['csv'], metavar='FORMAT',
+                       help=f"Formats de les dades processades (per defecte csv): {', '.join(ExportadorDades.FORMATS)}")
+   parser.add_argument('--compacte', action='store_true',
+                       help="Guardar respostes com a uint8, puntuacions com a sumes enteres i demografia categòrica")
+   parser.add_argument('--replicats', type=int, default=10_000,
+                       help="Rèpliques bootstrap per als intervals de confiança (0 per desactivar-los; per defecte 10000)")
+   parser.add_argument('--nivell-confianca', type=float, default=0.95,
+                       help="Nivell de confiança dels intervals bootstrap (per defecte 0.95)")
+   parser.add_argument('--llavor', type=int, default=0,
+                       help="Llavor del generador aleatori del bootstrap (per defecte 0)")
+   parser.add_argument('--processos', type=int, default=None,
+                       help="Processos per al bootstrap amb moltes rèpliques (per defecte tots els nuclis)")
+   parser.add_argument('--lots', nargs='+', default=None, metavar='CLAU',
+                       help="Un informe per partició segons aquestes claus: rol (edat, tecnologia, uab), "
+                            "'semestre' o nom de columna (p. ex. Font)")
+   parser.add_argument('--directori-lots', default='informes',
+                       help="Directori de l'arbre d'informes per partició (per defecte informes/)")
+   parser.add_argument('--processos-lots', type=int, default=None,
+                       help="Processos per generar els informes per partició (per defecte tots els nuclis)")
+   parser.add_argument('--alfa', type=float, default=0.05,
+                       help="Nivell de significació de les proves aparellades (per defecte 0.05)")
+   parser.add_argument('--permutacions', type=int, default=10_000,
+                       help="Permutacions Monte Carlo de la prova de canvi de signe (per defecte 10000)")
+   parser.add_argument('--streaming', action='store_true',
+                       help="Llegir i puntuar les dades per fragments amb memòria acotada")
+   parser.add_argument('--mida-fragment', type=int, default=50_000,
+                       help="Files per fragment en mode streaming (per defecte 50000)")
+   parser.add_argument('--vigilar', type=float, default=None, metavar='SEGONS',
+                       help="Consultar la font cada SEGONS i actualitzar l'informe només amb les respostes noves; "
+                            "si s'edita o s'esborra una resposta ja comptada, els agregats es reconstrueixen. "
+                            "Només es desen agregats: les dades per resposta (--formats-dades) no s'exporten")
+   parser.add_argument('--max-consultes', type=int, default=None,
+                       help="Nombre màxim de consultes en mode vigilància (per defecte, fins a Ctrl+C)")
+   parser.add_argument('--servir', type=int, default=None, metavar='PORT',
+                       help="Servir els informes i l'API JSON per HTTP en aquest port en lloc d'escriure fitxers")
+   parser.add_argument('--host', default='127.0.0.1',
+                       help="Adreça on escolta el servidor (per defecte 127.0.0.1)")
+   parser.add_argument('--taulers', nargs='+', default=None, metavar='NOM=FONT',
+                       help="Taulers servits amb --servir, p. ex. seu1=full1.csv seu2=<URL> (per defecte la font de --url)")
+   parser.add_argument('--ttl', type=float, default=300.0,
+                       help="Segons de validesa de les dades i respostes en memòria amb --servir (per defecte 300)")
+   parser.add_argument('--mida-cache', type=int, default=128,
+                       help="Entrades màximes de la memòria cau en procés amb --servir (per defecte 128)")
+   parser.add_argument('--sense-cache', action='store_true',
+                       help="No usar la memòria cau local (descàrregues i dades netes)")
+   parser.add_argument('--directori-cache', default='.cache_sus',
+                       help="Directori de la memòria cau de descàrregues (per defecte .cache_sus)")
+   parser.add_argument('--forcar', action='store_true',
+                       help="Tornar a executar totes les etapes encara que les entrades no hagin canviat")
+   parser.add_argument('--reintents', type=int, default=3,
+                       help="Reintents per petició HTTP amb espera exponencial (per defecte 3)")
+   parser.add_argument('--competir', action='store_true',
+                       help="Consultar els dos endpoints d'exportació en paral·lel i usar el primer CSV vàlid")
+   parser.add_argument('--retard-cobertura', type=float, default=0.0,
+                       help="Segons d'espera abans de llançar el segon endpoint amb --competir (per defecte 0)")
+   return parser.parse_args(argv)
+
+def vigilar_font(arguments, url_full, esquema, resolutor, bootstrap=None, proves=None):
+   """Mode vigilància: consultar la font periòdicament i regenerar l'informe quan hi ha respostes noves"""
+   print(f"\n👀 MODE VIGILÀNCIA: consulta cada {arguments.vigilar:g} s")
+   print("-" * 40)
+   extractor = ExtractorDades(url_full, reintents=arguments.reintents, esquema=esquema, resolutor=resolutor)
+   analitzador = AnalitzadorSUSIncremental(extractor, os.path.join(arguments.directori_cache, 'vigilancia.pkl'),
+                                           arguments.mida_fragment, bootstrap=bootstrap, proves=proves)
+   generador_html = GeneradorInformeHTML(ActiusInforme(arguments.actius), arguments.grafics)
+   manifest = ManifestConstruccio(os.path.join(arguments.directori_cache, 'manifest.json'),
+                                  os.path.join(arguments.directori_cache, 'resultats'))
+   
+   def regenerar(resultats):
+       clau = ManifestConstruccio.empremta(analitzador.empremta_agregats(), ManifestConstruccio.versio_codi(),
+                                           arguments.actius, arguments.grafics, url_full)
+       manifest.construir('informe', clau, 'informe_sus.html',
+                          lambda ruta: generador_html.desar_informe(resultats, ruta, url_full))
+       # L'estat de vigilància només conserva agregats: no hi ha dades per resposta per exportar
+       exportar_resultats(resultats, url_full=url_full, manifest=manifest, clau=clau,
+                          format_respostes=arguments.format_respostes, formats_dades=())
+       manifest.desar()
+   
+   return analitzador.vigilar(arguments.vigilar, regenerar, arguments.max_consultes)
+
+def main(argv=None):
    """Funció principal del sistema d'anàlisi SUS"""
    
    print("🚀 SISTEMA D'ANÀLISI SUS - GALERIA vs MAPA BOTÀNIC")
    print("=" * 60)
    
+   arguments = analitzar_arguments(argv)
+   
    # URL per defecte de Google Sheet - es pot canviar aquí
    url_full_defecte = "https://docs.google.com/spreadsheets/d/1HRiTEf8T8RSsMsaZESj56y-9GuxvvFtM8iO7qmVdFCQ/edit?usp=sharing"
    
    # Permetre entrada d'URL personalitzada
    # url_personalitzat = input(f"📝 Introdueix URL de Google Sheets (o prem Enter per usar per defecte): ").strip()
-   url_personalitzat = "https://docs.google.com/spreadsheets/d/1HRiTEf8T8RSsMsaZESj56y-9GuxvvFtM8iO7qmVdFCQ/edit?usp=sharing"
+   url_personalitzat = arguments.url or (arguments.fonts[0] if arguments.fonts else None)
    url_full = url_personalitzat if url_personalitzat else url_full_defecte
    
+   # Esquema d'instruments del qüestionari
+   if arguments.esquema:
+       esquema = EsquemaQuestionari.de_fitxer(arguments.esquema)
+   elif arguments.instruments:
+       esquema = EsquemaQuestionari.de_prefixos(arguments.instruments)
+   else:
+       esquema = EsquemaQuestionari.per_defecte()
+   resolutor = ResolutorColumnes.de_definicions(arguments.sinonims or [], esquema)
+   
+   # Intervals de confiança bootstrap
+   bootstrap = None
+   if arguments.replicats > 0:
+       bootstrap = BootstrapSUS(arguments.replicats, arguments.nivell_confianca, arguments.llavor,
+                                processos=arguments.processos)
+   proves = ProvesAparellades(arguments.alfa, arguments.permutacions, arguments.llavor)
+   
+   # Manifest de construcció: cada etapa s'omet si les seves entrades no han canviat
+   manifest = ManifestConstruccio(os.path.join(arguments.directori_cache, 'manifest.json'),
+                                  os.path.join(arguments.directori_cache, 'resultats'), forcar=arguments.forcar)
+   # Opcions que afecten els resultats de l'anàlisi
+   configuracio_analisi = (ManifestConstruccio.versio_codi(), esquema.descripcio(), arguments.sinonims,
+                           arguments.compacte, arguments.replicats, arguments.nivell_confianca, arguments.llavor,
+                           arguments.alfa, arguments.permutacions)
+   
+   if arguments.vigilar:
+       return vigilar_font(arguments, url_full, esquema, resolutor, bootstrap, proves)
+   
+   if arguments.servir is not None:
+       cache = None if arguments.sense_cache else CacheHTTP(arguments.directori_cache)
+       servidor = ServidorInformes.de_definicions(
+           arguments.taulers, url_full, esquema=esquema, resolutor=resolutor, bootstrap=bootstrap, proves=proves,
+           actius=ActiusInforme(arguments.actius), grafics=arguments.grafics,
+           cache=CacheMemoria(arguments.mida_cache, arguments.ttl),
+           opcions_extraccio=dict(cache=cache, reintents=arguments.reintents))
+       servidor.servir(arguments.host, arguments.servir)
+       # Resultats del primer tauler, si algú els ha demanat mentre el servidor estava engegat
+       return servidor.cache.consultar(('resultats', next(iter(servidor.taulers))))
+   
    try:
-       # 1. Extracció de dades
-       print("\n📥 FASE 1: EXTRACCIÓ DE DADES")
-       print("-" * 40)
-       extractor = ExtractorDades(url_full)
-       df, columnes_galeria, columnes_mapa = extractor.obtenir_dades()
-       
-       # 2. Anàlisi SUS
-       print("\n🧮 FASE 2: ANÀLISI SUS")
-       print("-" * 40)
-       analitzador = AnalitzadorSUS(df, columnes_galeria, columnes_mapa)
-       resultats = analitzador.analitzar()
+       if arguments.streaming:
+           # 1-2. Extracció i anàlisi per fragments
+           print("\n📥 FASE 1-2: EXTRACCIÓ I ANÀLISI PER FRAGMENTS")
+           print("-" * 40)
+           extractor = ExtractorDades(url_full, reintents=arguments.reintents, esquema=esquema, resolutor=resolutor)
+           analitzador = AnalitzadorSUSStreaming(extractor, arguments.mida_fragment, bootstrap=bootstrap, proves=proves)
+           resultats = analitzador.analitzar()
+           # Sense hash de l'entrada abans de llegir-la: l'anàlisi es repeteix, però si els
+           # resultats coincideixen les etapes següents s'ometen igualment
+           clau_analisi = ManifestConstruccio.empremta('streaming', url_full, arguments.mida_fragment, *configuracio_analisi)
+           empremta_resultats = manifest.desar_resultats(clau_analisi, resultats)
+       else:
+           # 1. Extracció de dades
+           print("\n📥 FASE 1: EXTRACCIÓ DE DADES")
+           print("-" * 40)
+           cache = None if arguments.sense_cache else CacheHTTP(arguments.directori_cache)
+           cache_dades = None if arguments.sense_cache else CacheDadesNetes(os.path.join(arguments.directori_cache, 'dades'))
+           opcions_extraccio = dict(cache=cache, cache_dades=cache_dades, reintents=arguments.reintents,
+                                    competir=arguments.competir, retard_cobertura=arguments.retard_cobertura,
+                                    esquema=esquema, resolutor=resolutor)
+           if arguments.fonts:
+               extractor = ExtractorMultiFont(arguments.fonts, max_fils=arguments.fils, **opcions_extraccio)
+           else:
+               extractor = ExtractorDades(url_full, **opcions_extraccio)
+           df, *columnes_instruments = extractor.obtenir_dades()
+           
+           # 2. Anàlisi SUS
+           print("\n🧮 FASE 2: ANÀLISI SUS")
+           print("-" * 40)
+           # Hash del contingut en brut si es coneix (fitxer o descàrrega), si no de les dades validades
+           empremta_entrada = df.attrs.get('empremta') or ManifestConstruccio.empremta_dades(df)
+           clau_analisi = ManifestConstruccio.empremta(empremta_entrada, extractor.regles_validacio, *configuracio_analisi)
+           resultats = manifest.carregar_resultats(clau_analisi)
+           if resultats is not None:
+               empremta_resultats = manifest.valor('analisi', 'resultats')
+               print(f"♻️ Entrada sense canvis ({empremta_entrada[:12]}): resultats recuperats sense tornar a analitzar")
+           else:
+               analitzador = AnalitzadorSUS(df, *columnes_instruments, compacte=arguments.compacte, esquema=esquema,
+                                            bootstrap=bootstrap, proves=proves, resolutor=resolutor)
+               resultats = analitzador.analitzar()
+               empremta_resultats = manifest.desar_resultats(clau_analisi, resultats)
        
        # 3. Generació d'informe HTML
        print("\n🎨 FASE 3: GENERACIÓ D'INFORME HTML")
        print("-" * 40)
-       generador_html = GeneradorInformeHTML()
-       contingut_html = generador_html.generar_informe_html(resultats, url_full)
+       generador_html = GeneradorInformeHTML(ActiusInforme(arguments.actius), arguments.grafics)
        
        # 4. Guardar informe
        nom_fitxer_informe = 'informe_sus.html'
-       with open(nom_fitxer_informe, 'w', encoding='utf-8') as f:
-           f.write(contingut_html)
+       clau_informe = ManifestConstruccio.empremta(empremta_resultats, ManifestConstruccio.versio_codi(),
+                                                   arguments.actius, arguments.grafics, url_full)
+       manifest.construir('informe', clau_informe, nom_fitxer_informe,
+                          lambda ruta: generador_html.desar_informe(resultats, ruta, url_full))
        
        # 5. Exportar resultats
        print("\n💾 FASE 4: EXPORTANT RESULTATS")
        print("-" * 40)
        
-       # JSON complet
-       dades_exportacio = {
-           'metadades': {
-               'generat_el': datetime.now().isoformat(),
-               'metodologia': 'System Usability Scale (SUS)',
-               'mida_mostra': resultats['demografia']['total_respostes'],
-               'url_full': url_full
-           },
-           'resultats': resultats
-       }
+       # JSON complet i dades processades (CSV i els altres formats demanats)
+       exportar_resultats(resultats, url_full=url_full, manifest=manifest,
+                          clau=ManifestConstruccio.empremta(empremta_resultats, ManifestConstruccio.versio_codi(), url_full),
+                          format_respostes=arguments.format_respostes, formats_dades=arguments.formats_dades)
        
-       with open('resultats_sus.json', 'w', encoding='utf-8') as f:
-           json.dump(dades_exportacio, f, indent=2, ensure_ascii=False, default=str)
+       # Informes per partició
+       if arguments.lots:
+           print("\n🗂️ FASE 5: INFORMES PER PARTICIÓ")
+           print("-" * 40)
+           if arguments.streaming:
+               print("⚠️ Els informes per partició necessiten les dades completes: no es generen en mode streaming")
+           else:
+               clau_lots = ManifestConstruccio.empremta(empremta_resultats, *configuracio_analisi, arguments.lots,
+                                                        arguments.actius, arguments.grafics, url_full,
+                                                        arguments.format_respostes, arguments.formats_dades)
+               index_lots = [os.path.join(arguments.directori_lots, nom) for nom in ('index.json', 'index.html')]
+               if manifest.vigent('lots', clau_lots):
+                   print(f"⏭️ {arguments.directori_lots}/: entrades sense canvis, s'omet")
+               else:
+                   lots = GeneradorLots(esquema, resolutor, bootstrap, proves, compacte=arguments.compacte,
+                                        actius=ActiusInforme(arguments.actius), grafics=arguments.grafics,
+                                        processos=arguments.processos_lots, url_full=url_full,
+                                        format_respostes=arguments.format_respostes, formats_dades=arguments.formats_dades)
+                   lots.generar(df, arguments.lots, arguments.directori_lots)
+                   for ruta in index_lots:
+                       manifest.registrar_fitxer(ruta)
+                   manifest.registrar('lots', clau_lots, index_lots)
        
-       # CSV amb dades processades
-       df = resultats['dades_en_brut']
-       df.to_csv('dades_sus.csv', index=False, encoding='utf-8')
+       manifest.desar()
        
        # 6. Resum final
        print("\n🎯 RESUM FINAL:")
        print("=" * 60)
        print(f"✅ Analitzades {resultats['demografia']['total_respostes']} respostes")
        
-       if resultats['galeria'] and resultats['mapa']:
-           print(f"🖼️ Galeria: {resultats['galeria']['mitjana']:.1f} punts ({resultats['galeria']['interpretacio']})")
-           print(f"🗺️ Mapa: {resultats['mapa']['mitjana']:.1f} punts ({resultats['mapa']['interpretacio']})")
-           print(f"⚖️ Diferència: {abs(resultats['galeria']['mitjana'] - resultats['mapa']['mitjana']):.1f} punts")
+       if all(resultats['instruments'].values()):
+           for instrument in esquema:
+               estadistiques = resultats['instruments'][instrument['nom']]
+               print(f"{instrument['icona']} {instrument['nom']}: {estadistiques['mitjana']:.1f} punts ({estadistiques['interpretacio']})")
+           mitjanes = [estadistiques['mitjana'] for estadistiques in resultats['instruments'].values()]
+           print(f"⚖️ Diferència: {max(mitjanes) - min(mitjanes):.1f} punts")
        else:
            print("⚠️ Anàlisi incompleta a causa de problemes amb les dades")
            
@@ -1531,7 +4309,13 @@ def main():
        print("\n📄 Fitxers generats:")
        print(f"   🌐 {nom_fitxer_informe} - Informe visual interactiu")
        print("   📄 resultats_sus.json - Dades completes")
-       print("   📊 dades_sus.csv - Dades processades")
+       if arguments.format_respostes == 'ndjson':
+           print(f"   🧾 {ExportadorJSON.FITXER_RESPOSTES} - Respostes, una per línia")
+       for format_dades in arguments.formats_dades:
+           if ExportadorDades.disponible(format_dades):
+               print(f"   📊 {ExportadorDades.FITXERS[format_dades]} - Dades processades")
+       if arguments.lots and not arguments.streaming:
+           print(f"   🗂️ {arguments.directori_lots}/index.html - Índex dels informes per partició")
        print(f"\n🌐 Obre '{nom_fitxer_informe}' al teu navegador per veure l'informe complet!")
        
        # Opció per obrir l'informe automàticament
@@ -1558,17 +4342,15 @@ def main():
            print("\n🎭 EXECUTANT EN MODE DEMOSTRACIÓ...")
            try:
                extractor = ExtractorDades(None)  # Sense URL = usar dades de mostra
-               df, columnes_galeria, columnes_mapa = extractor.obtenir_dades()
+               df, *columnes_instruments = extractor.obtenir_dades()
                
-               analitzador = AnalitzadorSUS(df, columnes_galeria, columnes_mapa)
+               analitzador = AnalitzadorSUS(df, *columnes_instruments, bootstrap=bootstrap, proves=proves)
                resultats_demo = analitzador.analitzar()
                
-               generador_html = GeneradorInformeHTML()
-               contingut_html = generador_html.generar_informe_html(resultats_demo, url_full)
+               generador_html = GeneradorInformeHTML(ActiusInforme(arguments.actius), arguments.grafics)
                
                nom_fitxer_demo = 'informe_sus_demo.html'
-               with open(nom_fitxer_demo, 'w', encoding='utf-8') as f:
-                   f.write(contingut_html)
+               generador_html.desar_informe(resultats_demo, nom_fitxer_demo, url_full)
                
                print(f"✅ Informe de demostració generat: '{nom_fitxer_demo}'")
                
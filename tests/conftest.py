@@ -0,0 +1,56 @@
+"""Configuració compartida de les proves: importació de main, servidor HTTP local i còpia de Chart.js absent"""
+import http.server
+import os
+import sys
+import threading
+import types
+import urllib.parse
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def servidor():
+    """Servidor HTTP local: `respostes[ruta](peticio)` retorna (estat, capçaleres, cos)
+
+    Cada petició queda registrada a `peticions` com a (ruta, capçaleres).
+    """
+    peticions = []
+    respostes = {}
+
+    class Gestor(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            ruta = urllib.parse.urlsplit(self.path).path
+            peticions.append((ruta, dict(self.headers)))
+            estat, capcaleres, cos = respostes[ruta](self) if ruta in respostes else (404, {}, b'')
+            self.send_response(estat)
+            for nom, valor in capcaleres.items():
+                self.send_header(nom, valor)
+            self.send_header('Content-Length', str(len(cos)))
+            self.end_headers()
+            self.wfile.write(cos)
+
+        def log_message(self, *args):
+            pass
+
+    servidor_http = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Gestor)
+    threading.Thread(target=servidor_http.serve_forever, daemon=True).start()
+    try:
+        yield types.SimpleNamespace(url=f'http://127.0.0.1:{servidor_http.server_port}',
+                                    peticions=peticions, respostes=respostes)
+    finally:
+        servidor_http.shutdown()
+        servidor_http.server_close()
+
+
+@pytest.fixture
+def sense_vendor(tmp_path, monkeypatch):
+    """Còpia local de Chart.js inexistent: ni la carpeta vendor/ no hi és"""
+    from main import ActiusInforme
+    ruta_chartjs = tmp_path / 'vendor' / 'chart.min.js'
+    monkeypatch.setattr(ActiusInforme, 'RUTA_CHARTJS', str(ruta_chartjs))
+    return ruta_chartjs
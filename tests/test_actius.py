@@ -0,0 +1,83 @@
+"""ActiusInforme: Chart.js només de la còpia local (o del CDN), paquets compartits i informes estàtics"""
+import contextlib
+import io
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+from main import ActiusInforme, ProvesAparellades, ServidorInformes
+
+COLUMNES_SUS = [f'G{i:02d}' for i in range(1, 11)] + [f'M{i:02d}' for i in range(1, 11)]
+
+
+@pytest.fixture
+def dades(tmp_path):
+    rng = np.random.default_rng(0)
+    fitxer = tmp_path / 'dades.csv'
+    pd.DataFrame(rng.integers(1, 6, size=(40, 20)), columns=COLUMNES_SUS).to_csv(fitxer, index=False)
+    return fitxer
+
+
+def test_sense_copia_local_es_carrega_del_cdn_sense_descarregar(sense_vendor, capsys):
+    actius = ActiusInforme('incrustat')
+
+    capcalera = actius.capcalera()
+    actius.capcalera()
+
+    assert f'<script src="{ActiusInforme.URL_CHARTJS}"></script>' in capcalera
+    assert capsys.readouterr().out.count('No es troba la còpia local de Chart.js') == 1
+    assert not sense_vendor.parent.exists()
+
+
+def test_compartits_sense_copia_local_enllacen_el_css_i_el_cdn(sense_vendor, tmp_path):
+    actius = ActiusInforme('compartits')
+    with contextlib.redirect_stdout(io.StringIO()):
+        capcalera = actius.capcalera()
+        escrits = actius.desar(str(tmp_path / 'informes'))
+
+    assert [os.path.splitext(ruta)[1] for ruta in escrits] == ['.css']
+    assert f'href="actius/{os.path.basename(escrits[0])}"' in capcalera
+    assert ActiusInforme.URL_CHARTJS in capcalera
+
+
+def test_compartits_i_estatic_sense_vendor(sense_vendor, dades, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+
+    main.main(['--url', str(dades), '--actius', 'compartits', '--grafics', 'estatic'])
+
+    assert 'Chart.js' not in capsys.readouterr().out
+    actius = os.listdir(tmp_path / 'actius')
+    assert len(actius) == 1 and actius[0].endswith('.css')
+    informe = (tmp_path / 'informe_sus.html').read_text(encoding='utf-8')
+    assert f'href="actius/{actius[0]}"' in informe
+    assert not sense_vendor.parent.exists()
+
+
+def test_index_de_lots_i_actius_del_servidor_sense_vendor(sense_vendor, dades):
+    actius = ActiusInforme('compartits')
+    assert actius.capcalera(amb_chartjs=False).startswith('<link rel="stylesheet"')
+
+    servidor = ServidorInformes({'prova': str(dades)}, proves=ProvesAparellades(permutacions=100),
+                                actius=actius, grafics='estatic')
+    with contextlib.redirect_stdout(io.StringIO()):
+        informe = servidor.resposta('/prova/')['cos'].decode('utf-8')
+        nom_css = re.search(r'href="actius/([^"]+\.css)"', informe).group(1)
+        assert servidor.resposta(f'/prova/actius/{nom_css}')['tipus'].startswith('text/css')
+
+
+def test_lots_concurrents_escriuen_els_mateixos_actius(tmp_path):
+    ruta_chartjs = tmp_path / 'chart.min.js'
+    ruta_chartjs.write_text('window.Chart = function () {};\n', encoding='utf-8')
+    informes = tmp_path / 'informes'
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda _: ActiusInforme('compartits', ruta_chartjs=str(ruta_chartjs)).desar(str(informes)),
+                          range(32)))
+
+    noms = sorted(os.listdir(informes / 'actius'))
+    assert noms == sorted(ActiusInforme('compartits', ruta_chartjs=str(ruta_chartjs)).fitxers_compartits())
@@ -0,0 +1,69 @@
+"""AcumuladorSUS: estadístiques de l'histograma de 41 valors iguals a les de NumPy sobre les puntuacions"""
+import numpy as np
+import pytest
+
+from main import AcumuladorSUS
+
+
+def puntuacions(n, llavor=0):
+    return np.random.default_rng(llavor).integers(0, 41, n) * 2.5
+
+
+@pytest.mark.parametrize('n', [1, 2, 3, 10, 101, 5000])
+def test_estadistiques_iguals_que_numpy(n):
+    valors = puntuacions(n, llavor=n)
+
+    acumulador = AcumuladorSUS().actualitzar(valors)
+
+    assert acumulador.comptatge == n
+    assert acumulador.mitjana() == pytest.approx(np.mean(valors), rel=1e-12)
+    assert acumulador.desviacio_tipica() == pytest.approx(np.std(valors, ddof=1) if n > 1 else 0, rel=1e-12)
+    assert acumulador.mediana() == np.median(valors)
+    for q in (0, 0.1, 0.25, 0.33, 0.75, 0.9, 1):
+        assert acumulador.quantil(q) == pytest.approx(np.quantile(valors, q), rel=1e-12)
+    assert acumulador.minim() == valors.min()
+    assert acumulador.maxim() == valors.max()
+
+
+def test_desviacio_exacta_amb_mitjana_gran():
+    # Tots els valors a 100 excepte un: la fórmula en enters no perd precisió per cancel·lació
+    valors = np.full(1_000_001, 100.0)
+    valors[0] = 97.5
+
+    assert AcumuladorSUS().actualitzar(valors).desviacio_tipica() == pytest.approx(np.std(valors, ddof=1), rel=1e-9)
+
+
+def test_fragments_combinats_igual_que_tot_alhora():
+    valors = puntuacions(1000)
+    parts = [AcumuladorSUS().actualitzar(fragment) for fragment in np.array_split(valors, 7)]
+
+    combinat = AcumuladorSUS()
+    for part in parts:
+        combinat.combinar(part)
+
+    np.testing.assert_array_equal(combinat.comptatges, AcumuladorSUS().actualitzar(valors).comptatges)
+
+
+def test_sumes_enteres_igual_que_puntuacions():
+    sumes = np.random.default_rng(1).integers(0, 41, 500)
+
+    np.testing.assert_array_equal(AcumuladorSUS().actualitzar_sumes(sumes).comptatges,
+                                  AcumuladorSUS().actualitzar(sumes * 2.5).comptatges)
+
+
+def test_nan_ignorats_i_valors_impossibles_rebutjats():
+    acumulador = AcumuladorSUS().actualitzar([50.0, np.nan, 75.0])
+    assert acumulador.comptatge == 2
+
+    for valor in (51.0, -2.5, 102.5):
+        with pytest.raises(ValueError, match='múltiples de 2.5'):
+            AcumuladorSUS().actualitzar([valor])
+
+
+def test_acumulador_buit():
+    acumulador = AcumuladorSUS()
+
+    assert acumulador.comptatge == 0
+    assert np.isnan(acumulador.mitjana()) and np.isnan(acumulador.mediana())
+    assert np.isnan(acumulador.minim()) and np.isnan(acumulador.maxim())
+    assert acumulador.desviacio_tipica() == 0
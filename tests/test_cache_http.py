@@ -0,0 +1,70 @@
+"""CacheHTTP: peticions condicionals i expulsió contra un servidor local"""
+import json
+import os
+import time
+
+from main import CacheHTTP
+
+ETAG = '"v1"'
+LAST_MODIFIED = 'Wed, 21 Oct 2025 07:28:00 GMT'
+
+
+def respondre_condicional(cos):
+    """Resposta amb ETag i Last-Modified; 304 si la petició porta l'ETag vigent"""
+    def respondre(peticio):
+        if peticio.headers.get('If-None-Match') == ETAG:
+            return 304, {'ETag': ETAG}, b''
+        return 200, {'ETag': ETAG, 'Last-Modified': LAST_MODIFIED, 'Content-Type': 'text/csv; charset=utf-8'}, cos
+    return respondre
+
+
+def llegir(cache, url, clau):
+    flux, _, origen = cache.obtenir(url, clau)
+    with flux:
+        return flux.read(), origen
+
+
+def test_304_reutilitza_el_cos_desat(servidor, tmp_path):
+    cos = b'G01,G02\n5,1\n4,2\n'
+    servidor.respostes['/full.csv'] = respondre_condicional(cos)
+    cache = CacheHTTP(str(tmp_path))
+
+    assert llegir(cache, f'{servidor.url}/full.csv', 'full') == (cos, 'xarxa')
+    assert llegir(cache, f'{servidor.url}/full.csv', 'full') == (cos, 'cache')
+
+    (_, primera), (_, segona) = servidor.peticions
+    assert 'If-None-Match' not in primera and 'If-Modified-Since' not in primera
+    assert segona['If-None-Match'] == ETAG
+    assert segona['If-Modified-Since'] == LAST_MODIFIED
+
+
+def test_expulsa_les_entrades_caducades(servidor, tmp_path):
+    servidor.respostes['/full.csv'] = respondre_condicional(b'G01\n5\n')
+    cache = CacheHTTP(str(tmp_path), edat_maxima=60)
+    llegir(cache, f'{servidor.url}/full.csv', 'full')
+
+    _, ruta_metadades = cache._rutes('full')
+    with open(ruta_metadades, encoding='utf-8') as f:
+        metadades = json.load(f)
+    metadades['ultim_us'] = time.time() - 3600
+    with open(ruta_metadades, 'w', encoding='utf-8') as f:
+        json.dump(metadades, f)
+    cache.expulsar()
+
+    assert os.listdir(tmp_path) == []
+    assert llegir(cache, f'{servidor.url}/full.csv', 'full')[1] == 'xarxa'
+    assert 'If-None-Match' not in servidor.peticions[-1][1]
+
+
+def test_expulsa_les_menys_usades_per_mida(servidor, tmp_path):
+    for nom in ('a', 'b'):
+        servidor.respostes[f'/{nom}.csv'] = respondre_condicional(nom.encode('ascii') * 100)
+    cache = CacheHTTP(str(tmp_path), mida_maxima=150)
+
+    llegir(cache, f'{servidor.url}/a.csv', 'a')
+    time.sleep(0.01)
+    llegir(cache, f'{servidor.url}/b.csv', 'b')
+
+    assert not os.path.exists(cache._rutes('a')[0])
+    assert os.path.exists(cache._rutes('b')[0])
+    assert llegir(cache, f'{servidor.url}/b.csv', 'b') == (b'b' * 100, 'cache')
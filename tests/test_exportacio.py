@@ -0,0 +1,103 @@
+"""Exportacions: JSON, NDJSON, CSV i .npz es rellegeixen amb les mateixes dades que s'han exportat"""
+import contextlib
+import gzip
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import AnalitzadorSUS, ExportadorDades, ExportadorJSON, MotorPuntuacioSUS
+
+COLUMNES_GALERIA = [f'G{i:02d}' for i in range(1, 11)]
+COLUMNES_MAPA = [f'M{i:02d}' for i in range(1, 11)]
+
+
+@pytest.fixture(params=[False, True], ids=['ample', 'compacte'])
+def resultats(request):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.integers(1, 6, size=(25, 20)), columns=COLUMNES_GALERIA + COLUMNES_MAPA)
+    df.insert(0, 'Edat:', ['18 a 23', None, '24 a 28', 'Més de 28 "cometes", coma'] * 6 + ['ñ'])
+    # Una resposta fora de rang: la puntuació de la Galeria d'aquesta fila és buida
+    df.loc[2, 'G03'] = 7
+    with contextlib.redirect_stdout(io.StringIO()):
+        return AnalitzadorSUS(df, COLUMNES_GALERIA, COLUMNES_MAPA, compacte=request.param).analitzar()
+
+
+def files(df):
+    """Files com a llistes de valors Python, amb None per als buits"""
+    return [[None if pd.isna(valor) else valor.item() if isinstance(valor, np.generic) else valor for valor in fila]
+            for fila in df.astype(object).itertuples(index=False)]
+
+
+def referencia(resultats):
+    return AnalitzadorSUS.expandir_puntuacions(resultats['dades_en_brut'])
+
+
+def test_json_amb_respostes(resultats, tmp_path):
+    ruta = tmp_path / 'resultats_sus.json'
+    ExportadorJSON(mida_fragment=7).desar(resultats, str(ruta), 'https://exemple.cat/full')
+
+    text = ruta.read_text(encoding='utf-8')
+    document = json.loads(text)
+    esperat = referencia(resultats)
+    assert 'NaN' not in text
+    assert list(document) == ['metadades', 'instruments', 'resultats', 'respostes']
+    assert document['metadades']['url_full'] == 'https://exemple.cat/full'
+    assert document['metadades']['fitxer_respostes'] is None
+    assert document['respostes']['columnes'] == list(esperat.columns)
+    assert document['respostes']['files'] == files(esperat)
+    assert document['respostes']['files'][2][-2] is None
+    for nom, estadistiques in document['instruments'].items():
+        assert 'puntuacions' not in estadistiques
+        assert estadistiques['mitjana'] == pytest.approx(resultats['instruments'][nom]['mitjana'])
+
+
+def test_ndjson_fora_del_json(resultats, tmp_path):
+    exportador = ExportadorJSON('ndjson', mida_fragment=7)
+    exportador.desar(resultats, str(tmp_path / 'resultats_sus.json'))
+    exportador.desar_respostes(resultats, str(tmp_path / ExportadorJSON.FITXER_RESPOSTES))
+
+    document = json.loads((tmp_path / 'resultats_sus.json').read_text(encoding='utf-8'))
+    linies = (tmp_path / ExportadorJSON.FITXER_RESPOSTES).read_text(encoding='utf-8').splitlines()
+    esperat = referencia(resultats)
+    assert 'respostes' not in document
+    assert document['metadades']['fitxer_respostes'] == ExportadorJSON.FITXER_RESPOSTES
+    assert [json.loads(linia) for linia in linies] == [dict(zip(esperat.columns, fila)) for fila in files(esperat)]
+
+
+@pytest.mark.parametrize('format_dades, obrir', [('csv', open), ('csv.gz', gzip.open)])
+def test_csv_per_fragments(resultats, tmp_path, format_dades, obrir):
+    ruta = tmp_path / ExportadorDades.FITXERS[format_dades]
+    ExportadorDades(mida_fragment=7).desar(resultats, str(ruta), format_dades)
+
+    with obrir(ruta, 'rt', encoding='utf-8', newline='') as f:
+        llegit = pd.read_csv(f)
+    esperat = referencia(resultats)
+    assert list(llegit.columns) == list(esperat.columns)
+    assert files(llegit) == files(esperat)
+
+
+def test_csv_gz_sempre_amb_els_mateixos_bytes(resultats, tmp_path):
+    exportador = ExportadorDades(mida_fragment=7)
+    exportador.desar(resultats, str(tmp_path / 'a.csv.gz'), 'csv.gz')
+    exportador.desar(resultats, str(tmp_path / 'b.csv.gz'), 'csv.gz')
+
+    assert (tmp_path / 'a.csv.gz').read_bytes() == (tmp_path / 'b.csv.gz').read_bytes()
+
+
+def test_npz_per_fragments(resultats, tmp_path):
+    ruta = tmp_path / 'dades_sus.npz'
+    ExportadorDades(mida_fragment=7).desar(resultats, str(ruta), 'npz')
+
+    esperat = referencia(resultats)
+    with np.load(ruta) as dades:
+        assert dades['instruments'].tolist() == ['Galeria', 'Mapa']
+        for nom, columnes in (('Galeria', COLUMNES_GALERIA), ('Mapa', COLUMNES_MAPA)):
+            respostes = esperat[columnes].to_numpy(dtype=np.float64)
+            assert dades[f'respostes_{nom}'].dtype == np.uint8
+            np.testing.assert_array_equal(dades[f'respostes_{nom}'],
+                                          np.where(MotorPuntuacioSUS.respostes_valides(respostes), respostes, 0))
+        np.testing.assert_array_equal(dades['puntuacions'], esperat[['SUS_Galeria', 'SUS_Mapa']].to_numpy())
+        assert dades['respostes_Galeria'][2, 2] == 0
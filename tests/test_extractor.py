@@ -0,0 +1,38 @@
+"""Lectura per fragments de l'ExtractorDades contra un servidor local"""
+import pandas as pd
+import pytest
+
+from main import ExtractorDades
+
+URL_FULL = 'https://docs.google.com/spreadsheets/d/prova/edit'
+
+
+def csv_respostes(files, fila_malmesa=None):
+    linies = ['G01,G02,G03'] + [f'{i % 5 + 1},{i % 4 + 1},{i % 3 + 1}' for i in range(files)]
+    if fila_malmesa is not None:
+        linies.insert(fila_malmesa + 1, '1,2,3,4,5')
+    return ('\n'.join(linies) + '\n').encode('utf-8')
+
+
+def test_primer_endpoint_fallit_passa_al_seguent(servidor):
+    servidor.respostes['/spreadsheets/d/prova/gviz/tq'] = lambda peticio: (200, {}, csv_respostes(25))
+    extractor = ExtractorDades(URL_FULL, url_base=servidor.url, reintents=0)
+
+    fragments = list(extractor.llegir_fragments(mida_fragment=10))
+
+    assert sum(len(fragment) for fragment in fragments) == 25
+    assert [ruta for ruta, _ in servidor.peticions] == ['/spreadsheets/d/prova/export', '/spreadsheets/d/prova/gviz/tq']
+
+
+def test_error_a_mig_flux_no_torna_a_llegir_les_files(servidor):
+    servidor.respostes['/spreadsheets/d/prova/export'] = lambda peticio: (200, {}, csv_respostes(50, fila_malmesa=35))
+    servidor.respostes['/spreadsheets/d/prova/gviz/tq'] = lambda peticio: (200, {}, csv_respostes(50))
+    extractor = ExtractorDades(URL_FULL, url_base=servidor.url, reintents=0)
+
+    rebudes = 0
+    with pytest.raises(pd.errors.ParserError):
+        for fragment in extractor.llegir_fragments(mida_fragment=10):
+            rebudes += len(fragment)
+
+    assert 0 < rebudes < 50
+    assert [ruta for ruta, _ in servidor.peticions] == ['/spreadsheets/d/prova/export']
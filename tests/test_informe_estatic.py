@@ -0,0 +1,52 @@
+"""Informe estàtic (--grafics estatic): gràfics SVG, cap <script> i cap dependència de Chart.js"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+from main import ActiusInforme
+
+COLUMNES_SUS = [f'G{i:02d}' for i in range(1, 11)] + [f'M{i:02d}' for i in range(1, 11)]
+
+
+@pytest.fixture
+def dades(tmp_path):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.integers(1, 6, size=(40, 20)), columns=COLUMNES_SUS)
+    df.insert(0, 'Edat:', rng.choice(['18 a 23', '24 a 28'], 40))
+    fitxer = tmp_path / 'dades.csv'
+    df.to_csv(fitxer, index=False)
+    return fitxer
+
+
+def generar(dades, directori, *opcions):
+    main.main(['--url', str(dades), *opcions])
+    return (directori / 'informe_sus.html').read_text(encoding='utf-8')
+
+
+@pytest.mark.parametrize('actius', ActiusInforme.MODES)
+def test_informe_estatic_sense_javascript(actius, dades, sense_vendor, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+
+    informe = generar(dades, tmp_path, '--actius', actius, '--grafics', 'estatic')
+
+    assert '<script' not in informe
+    assert 'onclick' not in informe
+    assert '<svg' in informe
+    assert 'chart.min.js' not in informe.lower() and ActiusInforme.URL_CHARTJS not in informe
+    assert 'Chart.js' not in capsys.readouterr().out
+    assert not sense_vendor.parent.exists()
+    if actius == 'compartits':
+        assert [os.path.splitext(nom)[1] for nom in os.listdir(tmp_path / 'actius')] == ['.css']
+
+
+def test_informe_interactiu_conserva_els_scripts(dades, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    informe = generar(dades, tmp_path, '--grafics', 'interactiu')
+
+    assert '<script type="application/json" id="dades-informe">' in informe
+    assert 'onclick="exportToJSON()"' in informe
+    assert 'bloc:javascript' not in informe
@@ -0,0 +1,53 @@
+"""GeneradorLots: particions de les combinacions observades i exportacions de cada partició"""
+import contextlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from main import AnalitzadorSUS, GeneradorLots, ProvesAparellades
+
+COLUMNES_SUS = [f'G{i:02d}' for i in range(1, 11)] + [f'M{i:02d}' for i in range(1, 11)]
+
+
+def enquesta(n, llavor=0):
+    rng = np.random.default_rng(llavor)
+    df = pd.DataFrame(rng.integers(1, 6, size=(n, 20)), columns=COLUMNES_SUS)
+    df.insert(0, 'Edat:', rng.choice(['18 a 23', '24 a 28'], n))
+    df.insert(1, 'Has estat alumne/treballador de la UAB?', rng.choice(['SI', 'NO'], n))
+    return df
+
+
+def test_particions_de_les_combinacions_observades():
+    # Dues claus amb un valor diferent per fila: n particions, no n² celles
+    n = 5000
+    df = pd.DataFrame({'a': [f'a{i}' for i in range(n)], 'b': [f'b{i}' for i in range(n)]})
+
+    ordre, particions = GeneradorLots().particionar(df, ['a', 'b'])
+
+    assert len(particions) == n
+    assert sorted(ordre.tolist()) == list(range(n))
+    assert all(ultim - primer == 1 for _, primer, ultim in particions)
+    assert all(df['a'].iloc[ordre[primer]] == particio['a'] for particio, primer, _ in particions)
+
+
+def test_particions_amb_valors_mancants():
+    df = pd.DataFrame({'a': ['x', None, 'x', 'y']})
+
+    _, particions = GeneradorLots().particionar(df, ['a'])
+
+    assert [(particio['a'], ultim - primer) for particio, primer, ultim in particions] == [
+        ('x', 2), ('y', 1), (AnalitzadorSUS.SENSE_RESPOSTA, 1)]
+
+
+def test_exportacions_de_cada_particio_segueixen_les_opcions(tmp_path):
+    lots = GeneradorLots(proves=ProvesAparellades(permutacions=100), processos=1, grafics='estatic',
+                         format_respostes='ndjson', formats_dades=('csv', 'npz'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        resums = lots.generar(enquesta(200), ['uab'], str(tmp_path))
+
+    assert [resum['error'] for resum in resums] == [None] * len(resums)
+    for resum in resums:
+        fitxers = set(os.listdir(tmp_path / resum['directori']))
+        assert {'resultats_sus.json', 'respostes_sus.ndjson', 'dades_sus.csv', 'dades_sus.npz'} <= fitxers
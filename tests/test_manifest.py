@@ -0,0 +1,145 @@
+"""ManifestConstruccio: les etapes sense canvis s'ometen i no toquen cap fitxer"""
+import contextlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main
+from main import ManifestConstruccio
+
+COLUMNES_SUS = [f'G{i:02d}' for i in range(1, 11)] + [f'M{i:02d}' for i in range(1, 11)]
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    def obrir(forcar=False):
+        return ManifestConstruccio(str(tmp_path / 'cache' / 'manifest.json'), str(tmp_path / 'cache' / 'resultats'),
+                                   forcar=forcar)
+    return obrir
+
+
+def generador(contingut):
+    """Funció `generar` que escriu `contingut` i compta les crides"""
+    def generar(ruta):
+        generar.crides += 1
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.write(contingut)
+    generar.crides = 0
+    return generar
+
+
+def construir(manifest, clau, ruta, generar):
+    with contextlib.redirect_stdout(io.StringIO()):
+        executada = manifest.construir('informe', clau, str(ruta), generar)
+        manifest.desar()
+    return executada
+
+
+def test_etapa_sense_canvis_s_omet_entre_execucions(manifest, tmp_path):
+    ruta = tmp_path / 'informe.html'
+    generar = generador('<html>1</html>')
+    assert construir(manifest(), 'a', ruta, generar)
+    estat = os.stat(ruta)
+    estat_manifest = os.stat(tmp_path / 'cache' / 'manifest.json')
+
+    assert not construir(manifest(), 'a', ruta, generar)
+
+    assert generar.crides == 1
+    assert os.stat(ruta).st_mtime_ns == estat.st_mtime_ns
+    assert os.stat(tmp_path / 'cache' / 'manifest.json').st_mtime_ns == estat_manifest.st_mtime_ns
+
+
+def test_clau_nova_amb_el_mateix_contingut_no_reescriu_el_fitxer(manifest, tmp_path):
+    ruta = tmp_path / 'informe.html'
+    construir(manifest(), 'a', ruta, generador('<html>1</html>'))
+    mtime = os.stat(ruta).st_mtime_ns
+
+    generar = generador('<html>1</html>')
+    assert construir(manifest(), 'b', ruta, generar)
+
+    assert generar.crides == 1
+    assert os.stat(ruta).st_mtime_ns == mtime
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_clau_nova_amb_contingut_diferent_substitueix_el_fitxer(manifest, tmp_path):
+    ruta = tmp_path / 'informe.html'
+    construir(manifest(), 'a', ruta, generador('<html>1</html>'))
+
+    assert construir(manifest(), 'b', ruta, generador('<html>2</html>'))
+
+    assert ruta.read_text(encoding='utf-8') == '<html>2</html>'
+
+
+@pytest.mark.parametrize('alterar', [
+    lambda ruta: ruta.write_text('<html>editat</html>', encoding='utf-8'),
+    lambda ruta: ruta.unlink(),
+])
+def test_fitxer_alterat_o_esborrat_torna_a_generar(manifest, tmp_path, alterar):
+    ruta = tmp_path / 'informe.html'
+    construir(manifest(), 'a', ruta, generador('<html>1</html>'))
+    alterar(ruta)
+
+    generar = generador('<html>1</html>')
+    assert construir(manifest(), 'a', ruta, generar)
+
+    assert generar.crides == 1
+    assert ruta.read_text(encoding='utf-8') == '<html>1</html>'
+
+
+def test_data_canviada_amb_el_mateix_contingut_es_vigent(manifest, tmp_path):
+    ruta = tmp_path / 'informe.html'
+    construir(manifest(), 'a', ruta, generador('<html>1</html>'))
+    os.utime(ruta, ns=(0, 0))
+
+    generar = generador('<html>1</html>')
+    assert not construir(manifest(), 'a', ruta, generar)
+    assert generar.crides == 0
+
+
+def test_forcar_executa_l_etapa(manifest, tmp_path):
+    ruta = tmp_path / 'informe.html'
+    construir(manifest(), 'a', ruta, generador('<html>1</html>'))
+
+    generar = generador('<html>1</html>')
+    assert construir(manifest(forcar=True), 'a', ruta, generar)
+    assert generar.crides == 1
+
+
+def test_resultats_desats_es_recuperen_per_clau(manifest):
+    primer = manifest()
+    with contextlib.redirect_stdout(io.StringIO()):
+        empremta = primer.desar_resultats('clau', {'mitjana': 72.5})
+    primer.desar()
+
+    segon = manifest()
+    assert segon.carregar_resultats('clau') == {'mitjana': 72.5}
+    assert segon.valor('analisi', 'resultats') == empremta
+    assert segon.carregar_resultats('una altra') is None
+
+
+def test_segona_execucio_sense_canvis_no_toca_cap_sortida(tmp_path, monkeypatch, sense_vendor):
+    monkeypatch.chdir(tmp_path)
+    fitxer = tmp_path / 'dades.csv'
+    pd.DataFrame(np.random.default_rng(0).integers(1, 6, size=(40, 20)), columns=COLUMNES_SUS).to_csv(fitxer, index=False)
+    arguments = ['--url', str(fitxer), '--grafics', 'estatic', '--formats-dades', 'csv']
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        main.main(arguments)
+    sortides = sorted(ruta for ruta in tmp_path.rglob('*') if ruta.is_file() and ruta != fitxer)
+    dates = {ruta: os.stat(ruta).st_mtime_ns for ruta in sortides}
+    manifest_desat = json.loads((tmp_path / '.cache_sus' / 'manifest.json').read_text(encoding='utf-8'))
+
+    sortida = io.StringIO()
+    with contextlib.redirect_stdout(sortida):
+        main.main(arguments)
+
+    assert sorted(ruta for ruta in tmp_path.rglob('*') if ruta.is_file() and ruta != fitxer) == sortides
+    assert {ruta: os.stat(ruta).st_mtime_ns for ruta in sortides} == dates
+    assert "informe_sus.html: entrades sense canvis, s'omet" in sortida.getvalue()
+    assert {'informe_sus.html', 'resultats_sus.json', 'dades_sus.csv'} <= {ruta.name for ruta in sortides}
+    assert set(manifest_desat['etapes']) >= {'analisi', 'informe'}
@@ -0,0 +1,78 @@
+"""Validació en bloc: mateix informe i mateixes files que la neteja per columnes original"""
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+
+from main import AnalitzadorSUSStreaming, ExtractorDades
+
+COLUMNES_SUS = [f'G{i:02d}' for i in range(1, 11)] + [f'M{i:02d}' for i in range(1, 11)]
+
+
+def enquesta(n=300, llavor=0):
+    rng = np.random.default_rng(llavor)
+    df = pd.DataFrame(rng.integers(1, 6, size=(n, 20)), columns=COLUMNES_SUS).astype(object)
+    df.iloc[rng.integers(0, n, 10), rng.integers(0, 20, 10)] = 7
+    df.iloc[rng.integers(0, n, 5), 3] = 'x'
+    df.iloc[rng.integers(0, n, 5), 12] = np.nan
+    return df
+
+
+def netejar_per_columnes(df):
+    """Neteja original: bucle per columna, rang 1-5, avís per columna i eliminació de files incompletes"""
+    avisos = []
+    for col in COLUMNES_SUS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+        mascara_valida = (df[col] >= 1) & (df[col] <= 5)
+        comptatge_invalid = (~mascara_valida & df[col].notna()).sum()
+        if comptatge_invalid > 0:
+            avisos.append(f"⚠️ Avís: {comptatge_invalid} valors no vàlids a {col} (fora del rang 1-5)")
+            df.loc[~mascara_valida, col] = np.nan
+    return df.dropna(subset=COLUMNES_SUS), avisos
+
+
+def validar(df):
+    sortida = io.StringIO()
+    with contextlib.redirect_stdout(sortida):
+        net = ExtractorDades()._validar_i_netejar(df)[0]
+    return net, [linia for linia in sortida.getvalue().splitlines() if linia.startswith('⚠️')]
+
+
+def test_mateix_informe_i_files_que_la_neteja_original():
+    referencia, avisos_referencia = netejar_per_columnes(enquesta())
+
+    net, avisos = validar(enquesta())
+
+    assert avisos == avisos_referencia
+    assert net.index.equals(referencia.index)
+    np.testing.assert_array_equal(net[COLUMNES_SUS].to_numpy(np.float64), referencia[COLUMNES_SUS].to_numpy(np.float64))
+
+
+def test_els_valors_no_enters_es_descarten_amb_un_avis_propi():
+    df = enquesta()
+    df.loc[0, 'G02'] = 2.5
+    df.loc[1, 'G02'] = '3.5'
+    _, avisos_referencia = netejar_per_columnes(enquesta())
+
+    net, avisos = validar(df)
+
+    assert avisos == avisos_referencia + ["⚠️ Avís: 2 valors no vàlids a G02 (no són enters)"]
+    assert 0 not in net.index and 1 not in net.index
+
+
+def test_el_mode_streaming_dona_el_mateix_informe(tmp_path):
+    df = enquesta()
+    # El primer fragment només té valors no vàlids a les últimes columnes
+    df.iloc[:70] = df.iloc[:70].where(df.iloc[:70].isin([1, 2, 3, 4, 5]), 3)
+    df.loc[5, 'M10'], df.loc[100, 'G01'] = 9, 9
+    df.loc[150, 'G02'] = 2.5
+    fitxer = tmp_path / 'respostes.csv'
+    df.to_csv(fitxer, index=False)
+    _, avisos_esperats = validar(df.copy())
+
+    sortida = io.StringIO()
+    with contextlib.redirect_stdout(sortida):
+        AnalitzadorSUSStreaming(ExtractorDades(str(fitxer)), mida_fragment=70, conservar_puntuacions=False).analitzar()
+
+    assert [linia for linia in sortida.getvalue().splitlines() if linia.startswith('⚠️')] == avisos_esperats
@@ -0,0 +1,153 @@
+"""ProvesAparellades: p de la t aparellada, de Wilcoxon i de la permutació contra valors de referència"""
+import itertools
+import math
+from statistics import NormalDist
+
+import numpy as np
+import pytest
+
+from main import ProvesAparellades
+
+
+def diferencies_amb_t(t, graus):
+    """Diferències amb mitjana t/√n i desviació 1, de manera que l'estadístic és exactament t"""
+    n = graus + 1
+    z = np.random.default_rng(graus).standard_normal(n)
+    z = (z - z.mean()) / z.std(ddof=1)
+    return z + t / math.sqrt(n)
+
+
+# p bilateral de Student en forma tancada per a 1, 2 i 3 graus de llibertat
+P_T_TANCADA = {
+    1: lambda t: 1 - 2 / math.pi * math.atan(abs(t)),
+    2: lambda t: 1 - abs(t) / math.sqrt(2 + t * t),
+    3: lambda t: 1 - 2 / math.pi * (math.atan(abs(t) / math.sqrt(3)) + abs(t) / math.sqrt(3) / (1 + t * t / 3)),
+}
+
+
+@pytest.mark.parametrize('graus', [1, 2, 3])
+@pytest.mark.parametrize('t', [0.1, 1.0, 2.5, -4.0, 12.0])
+def test_t_aparellada_igual_que_la_forma_tancada(t, graus):
+    resultat = ProvesAparellades().prova_t(diferencies_amb_t(t, graus))
+
+    assert resultat['estadistic'] == pytest.approx(t, rel=1e-12)
+    assert resultat['graus_llibertat'] == graus
+    assert resultat['p'] == pytest.approx(P_T_TANCADA[graus](t), rel=1e-10)
+
+
+@pytest.mark.parametrize('t, graus, p', [
+    # Valors de taula de Student (bilaterals)
+    (2.228138851986, 10, 0.05),
+    (2.763262455461, 28, 0.01),
+    (1.983971518523, 100, 0.05),
+])
+def test_t_aparellada_valors_de_taula(t, graus, p):
+    assert ProvesAparellades().prova_t(diferencies_amb_t(t, graus))['p'] == pytest.approx(p, rel=1e-8)
+
+
+def test_t_aparellada_sense_variacio():
+    proves = ProvesAparellades()
+
+    assert proves.prova_t(np.zeros(5))['p'] == 1.0
+    assert proves.prova_t(np.full(5, 2.5))['p'] == 0.0
+
+
+def wilcoxon_per_enumeracio(diferencies):
+    """p exacta bilateral recorrent els 2^n signes dels rangs 1..n (sense empats)"""
+    n = len(diferencies)
+    rangs = np.argsort(np.argsort(np.abs(diferencies))) + 1
+    w_positiu = rangs[diferencies > 0].sum()
+    observat = min(w_positiu, n * (n + 1) // 2 - w_positiu)
+    extrems = sum(min(w, n * (n + 1) // 2 - w) <= observat
+                  for w in (sum(r for r, s in zip(range(1, n + 1), signes) if s)
+                            for signes in itertools.product((0, 1), repeat=n)))
+    return observat, extrems / 2 ** n
+
+
+@pytest.mark.parametrize('llavor', range(6))
+def test_wilcoxon_exacte_igual_que_l_enumeracio(llavor):
+    rng = np.random.default_rng(llavor)
+    diferencies = rng.permutation(np.arange(1, 13)) * rng.choice([-1, 1], 12) + rng.uniform(0, 0.5, 12)
+
+    resultat = ProvesAparellades().prova_wilcoxon(diferencies)
+    estadistic, p = wilcoxon_per_enumeracio(diferencies)
+
+    assert resultat['metode'] == 'exacte'
+    assert resultat['estadistic'] == estadistic
+    assert resultat['p'] == pytest.approx(p, rel=1e-12)
+
+
+def test_wilcoxon_exacte_valor_de_taula():
+    # n = 10, W = 8: P(W ≤ 8) = 25/1024, bilateral 50/1024
+    diferencies = np.array([-1, -3, -4, 2, 5, 6, 7, 8, 9, 10], dtype=float)
+
+    resultat = ProvesAparellades().prova_wilcoxon(diferencies)
+
+    assert resultat['estadistic'] == 8
+    assert resultat['p'] == pytest.approx(50 / 1024, rel=1e-12)
+
+
+def test_wilcoxon_amb_empats_i_zeros():
+    # |d| = 1,1,1 → rang 2; 2,2,2 → 5; 3 → 7; 4,4 → 8.5; 5 → 10. W- = 7 + 2 = 9.
+    # Var = 10·11·21/24 − (24 + 24 + 6)/48 = 95.125; els zeros s'ignoren.
+    diferencies = np.array([1, 1, 2, 2, 2, -3, 4, 4, 5, -1, 0, 0], dtype=float)
+
+    resultat = ProvesAparellades().prova_wilcoxon(diferencies)
+
+    z = (9 - 27.5) / math.sqrt(95.125)
+    assert resultat['metode'] == 'normal'
+    assert resultat['estadistic'] == 9
+    assert resultat['z'] == pytest.approx(z, rel=1e-12)
+    assert resultat['p'] == pytest.approx(2 * NormalDist().cdf(z), rel=1e-12)
+    assert resultat['p'] == pytest.approx(0.05786, abs=1e-5)
+
+
+def permutacio_per_enumeracio(diferencies):
+    diferencies = diferencies[diferencies != 0]
+    observat = abs(diferencies.sum())
+    sumes = [abs(np.dot(signes, diferencies)) for signes in itertools.product((-1, 1), repeat=len(diferencies))]
+    return sum(s >= observat - 1e-9 for s in sumes) / len(sumes)
+
+
+def test_permutacio_exacta_valor_de_referencia():
+    # ±1 ±2 ±3: només +6 i −6 arriben a |6|
+    assert ProvesAparellades().prova_permutacio(np.array([1.0, 2.0, 3.0])) == {
+        'p': 0.25, 'metode': 'exacte', 'permutacions': 8}
+
+
+@pytest.mark.parametrize('maxim_elements', [1, 7, 2**22])
+def test_permutacio_exacta_igual_que_l_enumeracio_per_qualsevol_bloc(maxim_elements):
+    rng = np.random.default_rng(3)
+    diferencies = rng.integers(-3, 6, 14) * 2.5
+
+    resultat = ProvesAparellades(maxim_elements=maxim_elements).prova_permutacio(diferencies)
+
+    assert resultat['metode'] == 'exacte'
+    assert resultat['permutacions'] == 2 ** np.count_nonzero(diferencies)
+    assert resultat['p'] == pytest.approx(permutacio_per_enumeracio(diferencies), rel=1e-12)
+
+
+def test_permutacio_monte_carlo_a_prop_de_l_exacta():
+    diferencies = np.random.default_rng(5).normal(0.4, 1.0, 18)
+    exacta = ProvesAparellades().prova_permutacio(diferencies)['p']
+
+    resultat = ProvesAparellades(maxim_exacte=10, permutacions=40_000).prova_permutacio(diferencies)
+
+    assert resultat['metode'] == 'monte_carlo'
+    assert resultat['permutacions'] == 40_000
+    # Quatre errors estàndard de la proporció
+    assert abs(resultat['p'] - exacta) < 4 * math.sqrt(exacta * (1 - exacta) / 40_000)
+
+
+def test_comparar_parells_ajust_de_holm():
+    rng = np.random.default_rng(1)
+    diferencies = {('A', 'B'): rng.normal(1.0, 1, 12), ('A', 'C'): rng.normal(0.2, 1, 12),
+                   ('B', 'C'): rng.normal(0.6, 1, 12)}
+
+    comparacions = ProvesAparellades().comparar_parells(diferencies)
+
+    p = np.array([comparacio['p'] for comparacio in comparacions])
+    ordre = np.argsort(p)
+    esperades = np.maximum.accumulate(np.minimum(1, (3 - np.arange(3)) * p[ordre]))
+    assert [comparacions[i]['p_ajustada'] for i in ordre] == pytest.approx(esperades, rel=1e-12)
+    assert [comparacio['nom'] for comparacio in comparacions] == ['A − B', 'A − C', 'B − C']
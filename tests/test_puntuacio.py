@@ -0,0 +1,57 @@
+"""Puntuació SUS: el càlcul fila a fila i el vectoritzat coincideixen, també amb respostes no vàlides"""
+import numpy as np
+import pandas as pd
+
+from main import AcumuladorSUS, AnalitzadorSUS, MotorPuntuacioSUS
+
+
+def respostes_amb_casos_limit(n=200, llavor=0):
+    rng = np.random.default_rng(llavor)
+    respostes = rng.integers(1, 6, size=(n, 10)).astype(np.float64)
+    respostes[0] = [3] * 10                    # 50
+    respostes[1] = [5, 1] * 5                  # 100
+    respostes[2] = [1, 5] * 5                  # 0
+    respostes[3, 4] = np.nan                   # Mancant
+    respostes[4, 0] = 6                        # Fora de rang
+    respostes[5, 9] = 0
+    respostes[6, 2] = 3.5                      # No enter
+    respostes[7, 7] = -np.inf
+    return respostes
+
+
+def test_puntuacions_de_referencia():
+    puntuacions = MotorPuntuacioSUS().puntuar(respostes_amb_casos_limit()[:3])
+    assert puntuacions.tolist() == [50.0, 100.0, 0.0]
+
+
+def test_vectoritzat_igual_que_fila_a_fila():
+    respostes = respostes_amb_casos_limit()
+    analitzador = AnalitzadorSUS(pd.DataFrame())
+
+    vectoritzades = MotorPuntuacioSUS().puntuar(respostes)
+    fila_a_fila = [analitzador.calcular_puntuacio_sus(list(fila))[0] for fila in respostes]
+
+    assert np.isnan(vectoritzades[3:8]).all()
+    assert fila_a_fila[3:8] == [None] * 5
+    esperades = np.array([np.nan if puntuacio is None else puntuacio for puntuacio in fila_a_fila])
+    np.testing.assert_array_equal(vectoritzades, esperades)
+
+
+def test_tensor_puntua_cada_instrument_com_una_matriu():
+    galeria, mapa = respostes_amb_casos_limit(llavor=1), respostes_amb_casos_limit(llavor=2)
+    motor = MotorPuntuacioSUS()
+
+    tensor = motor.puntuar(np.stack([galeria, mapa], axis=1))
+
+    np.testing.assert_array_equal(tensor, np.column_stack([motor.puntuar(galeria), motor.puntuar(mapa)]))
+
+
+def test_puntuacions_vectoritzades_sempre_caben_a_l_acumulador():
+    # Una resposta no entera donava 51.25, que l'acumulador rebutja
+    respostes = np.full((1, 10), 3.0)
+    respostes[0, 0] = 3.5
+
+    puntuacions = MotorPuntuacioSUS().puntuar(respostes)
+
+    assert np.isnan(puntuacions).all()
+    assert AcumuladorSUS().actualitzar(puntuacions).comptatge == 0
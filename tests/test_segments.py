@@ -0,0 +1,61 @@
+"""Segmentació demogràfica: celles observades i text dels enquestats escapat a l'informe"""
+import contextlib
+import io
+import re
+
+import numpy as np
+import pandas as pd
+
+from main import AnalitzadorSUS, GeneradorInformeHTML
+
+COLUMNES_GALERIA = [f'G{i:02d}' for i in range(1, 11)]
+COLUMNES_MAPA = [f'M{i:02d}' for i in range(1, 11)]
+
+
+def enquesta(edats, tecnologia, uab, llavor=0):
+    rng = np.random.default_rng(llavor)
+    df = pd.DataFrame(rng.integers(1, 6, size=(len(edats), 20)), columns=COLUMNES_GALERIA + COLUMNES_MAPA)
+    df.insert(0, 'Edat:', edats)
+    df.insert(1, "Familiaritat amb l'ús de la tecnologia:", tecnologia)
+    df.insert(2, 'Has estat alumne/treballador de la UAB?', uab)
+    return df
+
+
+def analitzar(df):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return AnalitzadorSUS(df, COLUMNES_GALERIA, COLUMNES_MAPA).analitzar()
+
+
+def test_celles_nomes_de_les_combinacions_observades():
+    # Tres columnes de text lliure amb un valor diferent per resposta: el producte de nivells
+    # (2000³ celles) no cabria en memòria
+    n = 2000
+    df = enquesta([f'edat {i}' for i in range(n)], [f'tec {i}' for i in range(n)], [f'uab {i}' for i in range(n)])
+
+    segments = analitzar(df)['segments']
+
+    assert len(segments['edat × tecnologia']) == n
+    assert sum(fila['comptatge'] for fila in segments['tecnologia × uab']) == n
+
+
+def test_comptatges_per_segment():
+    df = enquesta(['18 a 23', '24 a 28', '18 a 23', None], [1, 2, 1, 2], ['SI', 'NO', 'NO', 'SI'])
+
+    segments = analitzar(df)['segments']
+
+    assert {fila['segment']['edat']: fila['comptatge'] for fila in segments['edat']} == {
+        '18 a 23': 2, '24 a 28': 1, AnalitzadorSUS.SENSE_RESPOSTA: 1}
+    assert sum(fila['comptatge'] for fila in segments['edat × uab']) == 4
+
+
+def test_text_dels_segments_escapat_a_l_informe():
+    injectat = '<img src=x onerror=alert(1)>'
+    df = enquesta([injectat, '18 a 23', injectat, '18 a 23'], [1, 2, 1, 2], ['SI', 'NO', 'NO', 'SI'])
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        informe = GeneradorInformeHTML().generar_informe_html(analitzar(df))
+
+    # Dins la illa JSON del <script> el text és dada, no marcatge
+    marcatge = re.sub(r'<script\b.*?</script>', '', informe, flags=re.S)
+    assert injectat not in marcatge
+    assert '<td>&lt;img src=x onerror=alert(1)&gt;</td>' in informe
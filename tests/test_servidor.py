@@ -0,0 +1,58 @@
+"""ServidorInformes: revalidació amb If-None-Match"""
+import contextlib
+import http.client
+import io
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import ProvesAparellades, ServidorInformes
+
+ETAG = '"0123456789abcdef01234567"'
+
+
+@pytest.mark.parametrize('capcalera, coincideix', [
+    (None, False),
+    ('', False),
+    (ETAG, True),
+    (f'W/{ETAG}', True),
+    (f'"altre", {ETAG}', True),
+    (f'"altre",W/{ETAG} , "un-altre"', True),
+    ('*', True),
+    ('"0123456789abcdef"', False),  # Prefix de l'ETag: no és el mateix
+    (f'"x{ETAG[1:]}', False),
+    (f'"{ETAG}"', False),
+])
+def test_coincideix_etag(capcalera, coincideix):
+    assert ServidorInformes.coincideix_etag(ETAG, capcalera) is coincideix
+
+
+@pytest.fixture
+def connexio(tmp_path):
+    rng = np.random.default_rng(0)
+    fitxer = tmp_path / 'respostes.csv'
+    columnes = [f'G{i:02d}' for i in range(1, 11)] + [f'M{i:02d}' for i in range(1, 11)]
+    pd.DataFrame(rng.integers(1, 6, size=(30, 20)), columns=columnes).to_csv(fitxer, index=False)
+    servidor = ServidorInformes({'prova': str(fitxer)}, proves=ProvesAparellades(permutacions=100))
+    with servidor.crear(port=0) as servidor_http, contextlib.redirect_stdout(io.StringIO()):
+        threading.Thread(target=servidor_http.serve_forever, daemon=True).start()
+        yield http.client.HTTPConnection('127.0.0.1', servidor_http.server_address[1])
+        servidor_http.shutdown()
+
+
+def demanar(connexio, capcaleres=None):
+    connexio.request('GET', '/prova/api/results', headers=capcaleres or {})
+    resposta = connexio.getresponse()
+    resposta.read()
+    return resposta.status, resposta.getheader('ETag')
+
+
+def test_revalidacio(connexio):
+    estat, etag = demanar(connexio)
+    assert estat == 200
+
+    assert demanar(connexio, {'If-None-Match': f'"altre", W/{etag}'})[0] == 304
+    assert demanar(connexio, {'If-None-Match': '*'})[0] == 304
+    assert demanar(connexio, {'If-None-Match': etag[:-5] + '"'})[0] == 200
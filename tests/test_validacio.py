@@ -0,0 +1,64 @@
+"""Una sola regla de validesa de les respostes: neteja, puntuació, representació compacta i exportació .npz"""
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import AnalitzadorSUS, ExportadorDades, ExtractorDades, MotorPuntuacioSUS
+
+COLUMNES_GALERIA = [f'G{i:02d}' for i in range(1, 11)]
+COLUMNES_MAPA = [f'M{i:02d}' for i in range(1, 11)]
+
+
+def enquesta():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.integers(1, 6, size=(6, 20)), columns=COLUMNES_GALERIA + COLUMNES_MAPA).astype(np.float64)
+    # Fora de rang, no enter, mancant, enter escrit com a float: només l'últim és vàlid
+    df.loc[0, 'G01'], df.loc[1, 'G02'], df.loc[2, 'M03'], df.loc[3, 'M04'] = 6, 2.5, np.nan, 4.0
+    return df
+
+
+def test_regla_de_validesa():
+    valors = np.array([0, 1, 2.5, 3, 5, 5.5, np.nan])
+    assert MotorPuntuacioSUS.respostes_valides(valors).tolist() == [False, True, False, True, True, False, False]
+
+
+def test_la_neteja_descarta_les_mateixes_respostes_que_la_representacio_compacta():
+    df = enquesta()
+    with contextlib.redirect_stdout(io.StringIO()):
+        net, _, _ = ExtractorDades()._validar_i_netejar(df.copy())
+        compacte = AnalitzadorSUS(df, COLUMNES_GALERIA, COLUMNES_MAPA, compacte=True).df
+
+    completes = (compacte['Valides_Galeria'] == 0x3FF) & (compacte['Valides_Mapa'] == 0x3FF)
+    assert net.index.tolist() == compacte.index[completes].tolist() == [3, 4, 5]
+
+
+def test_l_exportacio_npz_segueix_la_mateixa_regla(tmp_path):
+    df = enquesta()
+    ruta = tmp_path / 'dades_sus.npz'
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultats = AnalitzadorSUS(df.loc[[3, 4, 5]], COLUMNES_GALERIA, COLUMNES_MAPA).analitzar()
+    # Dades en brut amb els valors no vàlids originals: l'exportació els ha de marcar com a 0
+    resultats['dades_en_brut'] = pd.concat([df[COLUMNES_GALERIA + COLUMNES_MAPA],
+                                            resultats['dades_en_brut'].filter(like='SUS_')], axis=1)
+    ExportadorDades().desar(resultats, str(ruta), 'npz')
+
+    with np.load(ruta) as dades:
+        respostes = dades['respostes_Galeria']
+    valides = MotorPuntuacioSUS.respostes_valides(df[COLUMNES_GALERIA].to_numpy())
+    assert ((respostes != 0) == valides).all()
+
+
+@pytest.mark.parametrize('compacte', [False, True])
+def test_l_analisi_sense_netejar_descarta_les_mateixes_files_amb_i_sense_representacio_compacta(compacte):
+    df = enquesta()
+    with contextlib.redirect_stdout(io.StringIO()):
+        estadistiques = AnalitzadorSUS(df, COLUMNES_GALERIA, COLUMNES_MAPA, compacte=compacte).analitzar()
+
+    for nom, columnes in (('galeria', COLUMNES_GALERIA), ('mapa', COLUMNES_MAPA)):
+        valides = MotorPuntuacioSUS.respostes_valides(df[columnes].to_numpy()).all(axis=1)
+        assert estadistiques[nom]['comptatge'] == valides.sum()
+        assert estadistiques[nom]['mitjana'] == pytest.approx(
+            np.mean(MotorPuntuacioSUS().puntuar(df[columnes].to_numpy())[valides]))
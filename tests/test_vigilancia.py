@@ -0,0 +1,103 @@
+"""AnalitzadorSUSIncremental: només s'afegeixen les files noves i l'estat desat no creix amb la font"""
+import contextlib
+import io
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from main import AnalitzadorSUSIncremental, ExtractorDades
+
+COLUMNES_SUS = [f'G{i:02d}' for i in range(1, 11)] + [f'M{i:02d}' for i in range(1, 11)]
+
+
+def enquesta(n, llavor=0, marques=True):
+    rng = np.random.default_rng(llavor)
+    df = pd.DataFrame(rng.integers(1, 6, size=(n, 20)), columns=COLUMNES_SUS)
+    df.insert(0, 'Edat:', rng.choice(['18 a 23', '24 a 28'], n))
+    if marques:
+        # Moltes files comparteixen segon, de manera que els talls cauen enmig d'un mateix segon
+        segons = pd.to_timedelta(np.arange(n) // 7, unit='s')
+        df.insert(0, 'Marca temporal', (pd.Timestamp('2025-05-22 17:00:00') + segons).strftime('%d/%m/%Y %H:%M:%S'))
+    return df
+
+
+def actualitzar(fitxer, ruta_estat):
+    with contextlib.redirect_stdout(io.StringIO()):
+        analitzador = AnalitzadorSUSIncremental(ExtractorDades(str(fitxer)), str(ruta_estat), mida_fragment=40)
+        afegides = analitzador.actualitzar()
+    return analitzador, afegides
+
+
+def agregats_de_zero(fitxer, tmp_path):
+    analitzador, _ = actualitzar(fitxer, tmp_path / 'de_zero.pkl')
+    return analitzador.empremta_agregats()
+
+
+@pytest.mark.parametrize('marques', [True, False])
+def test_consultes_successives_sumen_nomes_les_files_noves(tmp_path, marques):
+    df = enquesta(300, marques=marques)
+    fitxer, ruta_estat = tmp_path / 'respostes.csv', tmp_path / 'estat.pkl'
+    for n in (103, 250, 250, 300):
+        df.iloc[:n].to_csv(fitxer, index=False)
+        analitzador, _ = actualitzar(fitxer, ruta_estat)
+        assert analitzador.estat['demografia']['total_respostes'] == n
+        assert analitzador.empremta_agregats() == agregats_de_zero(fitxer, tmp_path)
+
+
+def test_respostes_identiques_al_mateix_segon_es_compten_totes(tmp_path):
+    df = enquesta(20)
+    fitxer, ruta_estat = tmp_path / 'respostes.csv', tmp_path / 'estat.pkl'
+    df.to_csv(fitxer, index=False)
+    actualitzar(fitxer, ruta_estat)
+
+    pd.concat([df, df.iloc[[-1, -1]]]).to_csv(fitxer, index=False)
+    analitzador, afegides = actualitzar(fitxer, ruta_estat)
+
+    assert afegides == 2
+    assert analitzador.estat['demografia']['total_respostes'] == 22
+
+
+@pytest.mark.parametrize('marques', [True, False])
+def test_una_resposta_editada_reconstrueix_els_agregats(tmp_path, marques):
+    df = enquesta(200, marques=marques)
+    fitxer, ruta_estat = tmp_path / 'respostes.csv', tmp_path / 'estat.pkl'
+    df.to_csv(fitxer, index=False)
+    actualitzar(fitxer, ruta_estat)
+
+    df.loc[10, 'G01'] = 6 - df.loc[10, 'G01']
+    df.to_csv(fitxer, index=False)
+    analitzador, _ = actualitzar(fitxer, ruta_estat)
+
+    assert analitzador.estat['demografia']['total_respostes'] == 200
+    assert analitzador.empremta_agregats() == agregats_de_zero(fitxer, tmp_path)
+
+
+def test_una_resposta_esborrada_reconstrueix_els_agregats(tmp_path):
+    df = enquesta(200)
+    fitxer, ruta_estat = tmp_path / 'respostes.csv', tmp_path / 'estat.pkl'
+    df.to_csv(fitxer, index=False)
+    actualitzar(fitxer, ruta_estat)
+
+    # Una fila esborrada i una de nova: el nombre de files no canvia
+    pd.concat([df.drop(index=10), enquesta(201, llavor=1).iloc[[-1]]]).to_csv(fitxer, index=False)
+    analitzador, _ = actualitzar(fitxer, ruta_estat)
+
+    assert analitzador.estat['demografia']['total_respostes'] == 200
+    assert analitzador.empremta_agregats() == agregats_de_zero(fitxer, tmp_path)
+
+
+def test_l_estat_desat_no_creix_amb_la_font(tmp_path):
+    fitxer = tmp_path / 'respostes.csv'
+    mides = {}
+    for n in (500, 5000):
+        enquesta(n).to_csv(fitxer, index=False)
+        ruta_estat = tmp_path / f'estat_{n}.pkl'
+        actualitzar(fitxer, ruta_estat)
+        with open(ruta_estat, 'rb') as f:
+            estat = pickle.load(f)
+        assert estat['fragments_puntuacions'] == []
+        assert len(estat['empremtes_frontera']) <= 7
+        mides[n] = ruta_estat.stat().st_size
+    assert mides[5000] < mides[500] * 1.2